@@ -0,0 +1,68 @@
+"""
+Cached actor-name index for resolving actor searches to actor ids.
+
+The actor table is tiny (about 200 rows in sakila), so it is loaded once
+and matched in memory. Film searches then filter film_actor by actor_id
+instead of computing CONCAT(first_name, ' ', last_name) for every joined row.
+
+Classes:
+    ActorIndex -- in-memory list of lowercase full actor names.
+"""
+
+
+import time
+from typing import Iterable, List, Tuple
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ActorIndex:
+    """
+    In-memory actor-name index.
+
+    Attributes:
+        names (List[Tuple[int, str]]): (actor_id, lowercase "first last") pairs.
+        loaded_at (float): Monotonic time when the index was built.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        """
+        Build the index from (actor_id, first_name, last_name) rows.
+
+        Args:
+            rows: Rows as returned by sql_queries.QUERY_ALL_ACTORS.
+        """
+        self.names: List[Tuple[int, str]] = [
+            (actor_id, f"{first_name} {last_name}".lower())
+            for actor_id, first_name, last_name in rows
+        ]
+        self.loaded_at = time.monotonic()
+        logger.info("Actor index built for %d actors", len(self.names))
+
+    def is_stale(self, ttl: float) -> bool:
+        """
+        Tell whether the index is older than ttl seconds.
+
+        Args:
+            ttl (float): Max age of the index in seconds.
+
+        Returns:
+            bool: True if the index should be reloaded.
+        """
+        return time.monotonic() - self.loaded_at > ttl
+
+    def resolve(self, name: str) -> List[int]:
+        """
+        Return ids of actors whose full name contains the given text.
+
+        Args:
+            name (str): Full or partial actor name (case-insensitive).
+
+        Returns:
+            List[int]: Matching actor ids.
+        """
+        name = name.lower()
+        return [actor_id for actor_id, full_name in self.names if name in full_name]
@@ -0,0 +1,174 @@
+"""
+asyncio interface to the movie database and the search log.
+
+pymysql and pymongo are blocking and no async driver is a dependency of
+this project, so the async API runs the existing MovieDB and mongo_log
+code in worker threads (asyncio.to_thread). It therefore shares their SQL
+templates, connection pool, result cache and search log writer. A
+semaphore sized to the MySQL pool bounds the calls in flight, so awaiting
+coroutines queue on the event loop instead of blocking threads on pool
+checkout.
+
+Classes:
+    AsyncMovieDB -- async versions of the MovieDB searches and metadata queries.
+
+Functions:
+- log_create(query_type: str, query_str: str) -> None (async)
+- get_top_queries(n: int = 5, window: str = "all") -> List[Dict[str, Any]] (async)
+- flush() -> None (async)
+"""
+
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from catalog import CatalogSnapshot
+from db import MovieDB
+from logger import get_logger
+from pagination import Page
+from query_builder import SearchCriteria
+import mongo_log
+import settings
+
+
+logger = get_logger(__name__)
+
+
+class AsyncMovieDB:
+    """
+    Async facade of a MovieDB.
+
+    Attributes:
+        movie_db (MovieDB): Blocking MovieDB doing the work.
+        max_concurrency (int): Max number of calls running at once.
+    """
+
+    def __init__(self, movie_db: MovieDB, max_concurrency: Optional[int] = None) -> None:
+        """
+        Args:
+            movie_db: MovieDB to wrap.
+            max_concurrency: Max calls in flight; the pool max_size by default.
+        """
+        self.movie_db = movie_db
+        self.max_concurrency = max_concurrency or movie_db.pool.max_size
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking MovieDB call in a worker thread, within the concurrency limit.
+
+        Args:
+            func: Blocking function.
+            *args: Its arguments.
+
+        Returns:
+            Result of func.
+        """
+        # Created lazily so that it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args)
+
+    async def search_film_by_name(self, film_name: str, cursor: Optional[str] = None) -> Page:
+        """Search films by part of the title (see MovieDB.search_film_by_name)."""
+        return await self._run(self.movie_db.search_film_by_name, film_name, cursor)
+
+    async def search_film_by_fuzzy_name(self, film_name: str,
+                                        cursor: Optional[str] = None) -> Page:
+        """Search films by misspelled title (see MovieDB.search_film_by_fuzzy_name)."""
+        return await self._run(self.movie_db.search_film_by_fuzzy_name, film_name, cursor)
+
+    async def search_film_by_actor(self, actor_name: str, cursor: Optional[str] = None) -> Page:
+        """Search films by actor name (see MovieDB.search_film_by_actor)."""
+        return await self._run(self.movie_db.search_film_by_actor, actor_name, cursor)
+
+    async def search_film_by_description(self, description_text: str,
+                                         cursor: Optional[str] = None) -> Page:
+        """Search films by description text (see MovieDB.search_film_by_description)."""
+        return await self._run(self.movie_db.search_film_by_description,
+                               description_text, cursor)
+
+    async def search_film_by_genre_and_year(self, genre: str, year_min: int, year_max: int,
+                                            cursor: Optional[str] = None) -> Page:
+        """Search films by genre and year range (see MovieDB.search_film_by_genre_and_year)."""
+        return await self._run(self.movie_db.search_film_by_genre_and_year,
+                               genre, year_min, year_max, cursor)
+
+    async def search(self, criteria: SearchCriteria, cursor: Optional[str] = None) -> Page:
+        """Search films matching combined criteria (see MovieDB.search)."""
+        return await self._run(self.movie_db.search, criteria, cursor)
+
+    async def count_matches(self, kind: str, args: Tuple[Any, ...]) -> Optional[int]:
+        """Return the number of results of a search (see MovieDB.count_matches)."""
+        return await self._run(self.movie_db.count_matches, kind, args)
+
+    async def page_cursor(self, kind: str, args: Tuple[Any, ...], number: int) -> Optional[str]:
+        """Return the cursor of a page number of a search (see MovieDB.page_cursor)."""
+        return await self._run(self.movie_db.page_cursor, kind, args, number)
+
+    async def search_everything(self, text: str) -> Dict[str, Page]:
+        """
+        Run the title, actor and description searches concurrently.
+
+        Args:
+            text: Text searched in titles, actor names and descriptions.
+
+        Returns:
+            Dict[str, Page]: First page of each search, keyed "name", "actor"
+                and "description".
+        """
+        pages = await asyncio.gather(
+            self.search_film_by_name(text),
+            self.search_film_by_actor(text),
+            self.search_film_by_description(text),
+        )
+        return dict(zip(("name", "actor", "description"), pages))
+
+    async def catalog(self) -> CatalogSnapshot:
+        """Return the catalog metadata snapshot (see MovieDB.catalog)."""
+        return await self._run(self.movie_db.catalog)
+
+    async def query_all_genres(self) -> Dict[str, str]:
+        """Return lowercase genre names mapped to their original case."""
+        return await self._run(self.movie_db.query_all_genres)
+
+    async def query_min_max_year(self) -> Tuple[Optional[int], Optional[int]]:
+        """Return the (min_year, max_year) of the films."""
+        return await self._run(self.movie_db.query_min_max_year)
+
+
+async def log_create(query_type: str, query_str: str) -> None:
+    """
+    Queue a search log document without blocking the event loop.
+
+    Queuing is immediate unless the log queue is full with the "block"
+    overflow policy; only then is the call moved to a worker thread.
+
+    Args:
+        query_type (str): The type/category of the query.
+        query_str (str): The query string that was searched.
+    """
+    if settings.MONGO_LOG_OVERFLOW == "block":
+        await asyncio.to_thread(mongo_log.log_create, query_type, query_str)
+    else:
+        mongo_log.log_create(query_type, query_str)
+
+
+async def get_top_queries(n: int = 5, window: str = "all") -> List[Dict[str, Any]]:
+    """
+    Retrieve the top n most frequent queries (see mongo_log.get_top_queries).
+
+    Args:
+        n (int): Number of top queries to retrieve.
+        window (str): "hour", "day", "week" or "all".
+
+    Returns:
+        List[Dict[str, Any]]: Counter documents, most frequent first.
+    """
+    return await asyncio.to_thread(mongo_log.get_top_queries, n, window)
+
+
+async def flush() -> None:
+    """Write every queued search log document to MongoDB."""
+    await asyncio.to_thread(mongo_log.flush)
@@ -0,0 +1,228 @@
+"""
+Batch search mode: run many searches from a JSON lines file concurrently.
+
+Each input line is one search request:
+    {"id": "q1", "type": "name", "params": {"text": "ace"}}
+    {"type": "actor", "params": {"text": "guiness"}}
+    {"type": "fuzzy_name", "params": {"text": "acadmy dinosuar"}}
+    {"type": "description", "params": {"text": "drama", "cursor": "..."}}
+    {"type": "genre_and_year", "params": {"genre": "Comedy", "year_min": 2000, "year_max": 2006}}
+
+Requests run on a thread pool whose workers share a connection pool of the
+same size, so every worker holds at most one MySQL connection. Results are
+written as JSON lines in input order, with the page rows, the cursor of the
+next page and the request latency; a failed request gets an "error" field
+instead of aborting the batch. Logging to MongoDB is optional and goes
+through the batched write-behind log writer.
+
+Classes:
+    BatchStats -- number of requests, errors, duration, throughput and latency.
+
+Functions:
+- parse_request(request: Any) -> Tuple[str, Tuple[Any, ...], Optional[str]]
+- run_request(movie_db, index, line) -> Dict[str, Any]
+- run_batch(movie_db, lines, out, workers) -> BatchStats
+- run_file(in_path, out_path, workers, log_searches) -> BatchStats
+"""
+
+
+import json
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, IO, Iterable, NamedTuple, Optional, Tuple
+
+from connections import registry
+from logger import get_logger
+import db
+import export
+import metrics
+import mongo_log
+
+
+logger = get_logger(__name__)
+
+# Parameters of each search type, in MovieDB search method order
+SEARCH_PARAMS = {
+    "name": ("text",),
+    "fuzzy_name": ("text",),
+    "actor": ("text",),
+    "description": ("text",),
+    "genre_and_year": ("genre", "year_min", "year_max"),
+}
+
+# Expected JSON type of each search parameter
+PARAM_TYPES = {"text": str, "genre": str, "year_min": int, "year_max": int}
+
+# Requests submitted ahead of the one being written, per worker
+PENDING_PER_WORKER = 4
+
+
+class BatchStats(NamedTuple):
+    """
+    Result of a batch.
+
+    Attributes:
+        requests (int): Number of requests run.
+        errors (int): Number of failed requests.
+        seconds (float): Wall-clock duration of the batch.
+        requests_per_sec (float): Throughput.
+        latency (Dict[str, float]): Per-request latency summary (metrics.summarize).
+    """
+    requests: int
+    errors: int
+    seconds: float
+    requests_per_sec: float
+    latency: Dict[str, float]
+
+
+def parse_request(request: Any) -> Tuple[str, Tuple[Any, ...], Optional[str]]:
+    """
+    Validate one decoded search request.
+
+    Args:
+        request (Any): Decoded JSON object with "type" and "params".
+
+    Raises:
+        ValueError: If the request is malformed.
+
+    Returns:
+        Tuple[str, Tuple[Any, ...], Optional[str]]: Search type, search arguments
+            and page cursor (None for the first page).
+    """
+    if not isinstance(request, dict):
+        raise ValueError("Request must be a JSON object")
+    kind = request.get("type")
+    if kind not in SEARCH_PARAMS:
+        raise ValueError(f"Unknown search type: {kind!r}")
+    params = request.get("params") or {}
+    if not isinstance(params, dict):
+        raise ValueError("Request params must be a JSON object")
+    missing = [name for name in SEARCH_PARAMS[kind] if name not in params]
+    if missing:
+        raise ValueError(f"Missing parameters for {kind} search: {', '.join(missing)}")
+    for name in SEARCH_PARAMS[kind]:
+        expected = PARAM_TYPES[name]
+        # bool is an int subclass, but true/false is no year
+        if not isinstance(params[name], expected) or isinstance(params[name], bool):
+            raise ValueError(
+                f"Parameter {name} of {kind} search must be of type {expected.__name__}"
+            )
+    cursor = params.get("cursor")
+    if cursor is not None and not isinstance(cursor, str):
+        raise ValueError("Parameter cursor must be of type str")
+    return kind, tuple(params[name] for name in SEARCH_PARAMS[kind]), cursor
+
+
+def run_request(movie_db: db.MovieDB, index: int, line: str) -> Dict[str, Any]:
+    """
+    Run one search request.
+
+    Args:
+        movie_db (db.MovieDB): MovieDB used for the search.
+        index (int): Position of the request in the input.
+        line (str): Request as a JSON line.
+
+    Returns:
+        Dict[str, Any]: Result record with index, id, type, rows, next_cursor
+            and latency_ms, or error if the request failed; no error is raised,
+            so one bad request cannot abort the batch.
+    """
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"index": index}
+    try:
+        request = json.loads(line)
+        kind, args, cursor = parse_request(request)
+        if "id" in request:
+            result["id"] = request["id"]
+        result["type"] = kind
+        search = getattr(movie_db, f"search_film_by_{kind}")
+        page = search(*args, cursor)
+        result["rows"] = [export.row_record(row) for row in page.rows]
+        result["next_cursor"] = page.next_cursor
+    except ValueError as e:
+        result["error"] = str(e)
+        logger.warning("Batch request %d failed: %s", index, e)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        logger.exception("Batch request %d failed", index)
+    result["latency_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def run_batch(movie_db: db.MovieDB, lines: Iterable[str], out: IO[str], workers: int) -> BatchStats:
+    """
+    Run search requests concurrently and write their results in input order.
+
+    At most workers * PENDING_PER_WORKER requests are in flight, so memory
+    does not grow with the size of the input.
+
+    Args:
+        movie_db (db.MovieDB): MovieDB shared by the workers.
+        lines (Iterable[str]): Requests as JSON lines; blank lines are skipped.
+        out (IO[str]): Target text file for the JSON lines results.
+        workers (int): Number of worker threads.
+
+    Returns:
+        BatchStats: Requests, errors, duration, throughput and latency summary.
+    """
+    latencies = []
+    errors = 0
+
+    def write(future: Future) -> None:
+        nonlocal errors
+        result = future.result()
+        latencies.append(result["latency_ms"] / 1000)
+        errors += "error" in result
+        out.write(json.dumps(result, ensure_ascii=False))
+        out.write("\n")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+        pending: Deque[Future] = deque()
+        index = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            pending.append(executor.submit(run_request, movie_db, index, line))
+            index += 1
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                write(pending.popleft())
+        while pending:
+            write(pending.popleft())
+    seconds = time.perf_counter() - started
+
+    return BatchStats(len(latencies), errors, seconds,
+                      len(latencies) / seconds if seconds else 0.0,
+                      metrics.summarize(latencies))
+
+
+def run_file(in_path: str, out_path: str, workers: int, log_searches: bool = False) -> BatchStats:
+    """
+    Run the search requests of a JSON lines file.
+
+    Args:
+        in_path (str): Input file with one request per line.
+        out_path (str): Output file receiving one result per line.
+        workers (int): Number of worker threads and pooled MySQL connections.
+        log_searches (bool): Log first-page searches to MongoDB.
+
+    Returns:
+        BatchStats: Requests, errors, duration, throughput and latency summary.
+    """
+    mysql_pool = registry.create_mysql_pool(max_size=workers)
+    movie_db = db.create_movie_db(mysql_pool, log_searches=log_searches)
+    logger.info("Batch %s -> %s with %d workers", in_path, out_path, workers)
+    try:
+        with open(in_path, encoding="utf-8") as f_in, \
+                open(out_path, "w", encoding="utf-8") as f_out:
+            stats = run_batch(movie_db, f_in, f_out, workers)
+    finally:
+        mysql_pool.close()
+        if log_searches:
+            mongo_log.flush()
+    logger.info("Batch finished: %d requests (%d errors) in %.2f s (%.1f req/s), "
+                "p50=%.1f ms p95=%.1f ms p99=%.1f ms",
+                stats.requests, stats.errors, stats.seconds, stats.requests_per_sec,
+                stats.latency["p50_ms"], stats.latency["p95_ms"], stats.latency["p99_ms"])
+    return stats
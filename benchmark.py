@@ -0,0 +1,265 @@
+"""
+Reproducible benchmark suite for movie searches, top queries and the table renderer.
+
+Runs the real MovieDB, mongo_log and table code against local stand-ins
+(standins.py): a seeded sakila-shaped SQLite dataset behind the MovieDB
+interface and an in-process fake MongoDB collection. For every dataset
+scale factor it reports throughput and p50/p95/p99 latency of:
+- the four search types at several page depths,
+- the top queries statistics (all time, and last week from the rollups),
+- the table renderer,
+and writes machine-readable JSON results that can be compared across runs.
+
+Usage:
+    python benchmark.py [--scales 1 10 100] [--depths 1 5] [--iterations 100]
+                        [--seed 42] [--out bench_results.json]
+                        [--compare previous.json] [--threshold 10]
+"""
+
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from connections import registry
+import db
+import metrics
+import mongo_log
+import settings
+import standins
+import table
+
+
+BENCHMARK_SEARCHES = ["search_by_name", "search_by_actor", "search_by_description",
+                      "search_by_genre_and_year"]
+
+
+def search_params(kind: str, rng: random.Random) -> List[Any]:
+    """
+    Pick random arguments for a search, using vocabulary of the stand-in dataset.
+
+    Args:
+        kind (str): One of BENCHMARK_SEARCHES.
+        rng (random.Random): Seeded random generator.
+
+    Returns:
+        List[Any]: Positional arguments of the MovieDB search method (without cursor).
+    """
+    match kind:
+        case "search_by_name":
+            return [rng.choice(standins.TITLE_WORDS)[:4].lower()]
+        case "search_by_actor":
+            return [rng.choice(standins.LAST_NAMES).lower()]
+        case "search_by_description":
+            return [rng.choice(standins.NOUNS).lower()]
+        case _:
+            year_min = rng.randint(1990, 2005)
+            return [rng.choice(standins.SAKILA_CATEGORIES), year_min, year_min + 5]
+
+
+def search_func(movie_db: db.MovieDB, kind: str) -> Callable[..., Any]:
+    """Return the MovieDB method running a search kind."""
+    return {
+        "search_by_name": movie_db.search_film_by_name,
+        "search_by_actor": movie_db.search_film_by_actor,
+        "search_by_description": movie_db.search_film_by_description,
+        "search_by_genre_and_year": movie_db.search_film_by_genre_and_year,
+    }[kind]
+
+
+def bench_search(movie_db: db.MovieDB, kind: str, depth: int, iterations: int,
+                 rng: random.Random) -> List[float]:
+    """
+    Measure the latency of fetching page depth of random searches of one kind.
+
+    Pages before depth are fetched untimed to obtain the cursor; searches
+    with fewer pages are timed on their last page.
+
+    Args:
+        movie_db (db.MovieDB): MovieDB over the stand-in pool, without result cache.
+        kind (str): Search kind.
+        depth (int): 1-based page number to time.
+        iterations (int): Number of searches.
+        rng (random.Random): Seeded random generator.
+
+    Returns:
+        List[float]: Latencies in seconds.
+    """
+    func = search_func(movie_db, kind)
+    samples = []
+    for _ in range(iterations):
+        args = search_params(kind, rng)
+        cursor = None
+        for _ in range(depth - 1):
+            page = func(*args, cursor)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        started = time.perf_counter()
+        func(*args, cursor)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_top_queries(iterations: int, window: str = "all") -> List[float]:
+    """Measure the latency of the top 5 queries statistics of a window."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        mongo_log.get_top_queries(5, window)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_renderer(rows: List[tuple], iterations: int) -> List[float]:
+    """Measure the latency of rendering one result page with table.show_results."""
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            started = time.perf_counter()
+            table.show_results(rows)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def run(scales: List[int], depths: List[int], iterations: int, seed: int) -> Dict[str, Any]:
+    """
+    Run the whole suite.
+
+    Args:
+        scales (List[int]): Dataset scale factors.
+        depths (List[int]): Page depths of the search benchmarks.
+        iterations (int): Operations per benchmark.
+        seed (int): Random seed of datasets and search parameters.
+
+    Returns:
+        Dict[str, Any]: {"meta": {...}, "results": [...]} with one result per
+            benchmark, scale and depth.
+    """
+    results = []
+
+    def record(benchmark: str, scale: int, depth: Optional[int], samples: List[float]) -> None:
+        result = {"benchmark": benchmark, "scale": scale, "depth": depth, **metrics.summarize(samples)}
+        results.append(result)
+        print(f"{benchmark:<26} x{scale:<4} depth={depth or '-':<3} "
+              f"{result['ops_per_sec']:>9.1f} ops/s  p50={result['p50_ms']:.3f} ms  "
+              f"p95={result['p95_ms']:.3f} ms  p99={result['p99_ms']:.3f} ms")
+
+    for scale in scales:
+        uri = standins.generate_dataset(scale, seed)
+        mongo_client = standins.FakeMongoClient()
+        with standins.installed(uri, mongo_client):
+            movie_db = db.MovieDB(registry.mysql_pool())
+            rng = random.Random(seed)
+            for kind in BENCHMARK_SEARCHES:
+                for depth in depths:
+                    record(kind, scale, depth,
+                           bench_search(movie_db, kind, depth, iterations, rng))
+
+            standins.seed_search_log(registry.mongo_collection(), scale * 10000, seed)
+            mongo_log.rebuild_rollups()
+            mongo_log.rebuild_counters()
+            record("top_queries", scale, None, bench_top_queries(iterations))
+            record("top_queries_week", scale, None, bench_top_queries(iterations, "week"))
+
+            rows = list(movie_db.search_film_by_description("a").rows)
+            record("render_page", scale, None, bench_renderer(rows, iterations))
+            mongo_log.close()
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "seed": seed,
+            "iterations": iterations,
+            "page_size": settings.MOVIE_RESULT_LIMIT,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], threshold: float) -> int:
+    """
+    Print the p50/p95 change of every benchmark against a previous run.
+
+    Args:
+        current (Dict[str, Any]): Results of this run.
+        previous (Dict[str, Any]): Results loaded from a previous run.
+        threshold (float): Slowdown of p50 in percent reported as a regression.
+
+    Returns:
+        int: Number of regressions.
+    """
+    def key(result: Dict[str, Any]) -> tuple:
+        return result["benchmark"], result["scale"], result["depth"]
+
+    before = {key(result): result for result in previous["results"]}
+    regressions = 0
+    print("\nComparison with previous run (p50 / p95 change):")
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        p50 = (result["p50_ms"] / old["p50_ms"] - 1) * 100 if old["p50_ms"] else 0.0
+        p95 = (result["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+        flag = ""
+        if p50 > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        benchmark, scale, depth = key(result)
+        print(f"{benchmark:<26} x{scale:<4} depth={depth or '-':<3} "
+              f"p50 {p50:+7.1f}%  p95 {p95:+7.1f}%{flag}")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark searches against local stand-ins.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="dataset scale factors (1 = sakila size)")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 5],
+                        help="page depths of the search benchmarks")
+    parser.add_argument("--iterations", type=int, default=100,
+                        help="operations per benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_results.json",
+                        help="JSON file receiving the results")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="p50 slowdown in percent reported as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks, write the results and compare them with a previous run.
+
+    Returns:
+        int: Process exit code, 1 if a regression was found.
+    """
+    args = parse_args(argv)
+    # Measure MySQL and MongoDB stand-ins, not the result cache
+    settings.SEARCH_CACHE_TTL = 0
+    results = run(args.scales, args.depths, args.iterations, args.seed)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        if compare(results, previous, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
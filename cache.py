@@ -0,0 +1,183 @@
+"""
+Bounded LRU cache with TTL for search results.
+
+Entries are evicted in least-recently-used order when either the entry
+count or the estimated size in bytes exceeds its limit, and expire after
+a fixed time to live. Hit, miss, eviction and expiration counters are kept
+for monitoring.
+
+Classes:
+    SearchCache -- thread-safe LRU + TTL cache with size accounting.
+
+Functions:
+- estimate_size(value: Any) -> int
+"""
+
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory footprint of a value made of tuples, lists and scalars.
+
+    Args:
+        value (Any): Value to measure, e.g. a pagination.Page.
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class SearchCache:
+    """
+    LRU cache with TTL and size accounting.
+
+    Attributes:
+        max_entries (int): Max number of cached entries.
+        max_bytes (int): Max estimated size of all cached values.
+        ttl (float): Seconds an entry stays valid.
+        hits (int): Number of successful lookups.
+        misses (int): Number of lookups without a valid entry.
+        evictions (int): Number of entries evicted to respect the limits.
+        expirations (int): Number of entries dropped because of the TTL.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024,
+                 ttl: float = 600) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+            max_entries: Max number of cached entries.
+            max_bytes: Max estimated size of all cached values.
+            ttl: Seconds an entry stays valid.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = 0
+        # key -> (value, size, expires_at); least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing or expired.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[Any]: Cached value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting least recently used entries if needed.
+
+        Values larger than max_bytes are not cached.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any],
+                    cacheable: Callable[[Any], bool] = bool) -> Any:
+        """
+        Return the cached value for key, loading and caching it on a miss.
+
+        Args:
+            key: Cache key.
+            load: Function computing the value.
+            cacheable: Predicate telling whether a loaded value may be cached.
+
+        Returns:
+            Any: Cached or freshly loaded value.
+        """
+        value = self.get(key)
+        if value is None:
+            value = load()
+            if cacheable(value):
+                self.put(key, value)
+        return value
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        """
+        Drop cached entries.
+
+        Args:
+            kind: Drop only entries whose key starts with this search kind,
+                or every entry if None.
+        """
+        with self._lock:
+            keys = [key for key in self._entries
+                    if kind is None or (isinstance(key, tuple) and key[0] == kind)]
+            for key in keys:
+                self._remove(key)
+        logger.info("Search cache invalidated: kind=%s, entries=%d", kind, len(keys))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache counters.
+
+        Returns:
+            Dict[str, Any]: entries, bytes, hits, misses, evictions, expirations, hit_ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry; the lock must be held."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,93 @@
+"""
+Cached snapshot of catalog metadata: genres, films per genre and year bounds.
+
+The genre list and the release year bounds are needed for every genre/year
+search but almost never change, so they are loaded once and served from
+memory. The snapshot records the latest category.last_update and
+film.last_update; a cheap version query compares them with the database
+every few seconds, and the snapshot is reloaded when they change or when
+it gets older than its refresh interval.
+
+Classes:
+    CatalogSnapshot -- immutable catalog metadata with its version.
+"""
+
+
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class CatalogSnapshot:
+    """
+    Catalog metadata loaded at one point in time.
+
+    Attributes:
+        genres (Dict[str, str]): Lowercase genre names mapped to their original case.
+        genre_counts (Dict[str, int]): Number of films per genre (original case).
+        year_min (Optional[int]): Minimum release year, None if there are no films.
+        year_max (Optional[int]): Maximum release year, None if there are no films.
+        version (Tuple[Any, ...]): Latest category.last_update and film.last_update.
+        loaded_at (float): Monotonic time when the snapshot was loaded.
+        checked_at (float): Monotonic time when the version was last compared.
+    """
+
+    def __init__(self, genre_rows: Iterable[Tuple[str, int]],
+                 year_bounds: Tuple[Optional[int], Optional[int]],
+                 version: Tuple[Any, ...]) -> None:
+        """
+        Build the snapshot from query results.
+
+        Args:
+            genre_rows: (genre, film count) rows of sql_queries.QUERY_GENRE_COUNTS.
+            year_bounds: (min_year, max_year) of sql_queries.QUERY_MIN_MAX_YEAR.
+            version: Row of sql_queries.QUERY_CATALOG_VERSION.
+        """
+        self.genre_counts: Dict[str, int] = {name: count for name, count in genre_rows}
+        self.genres: Dict[str, str] = {name.lower(): name for name in self.genre_counts}
+        self.year_min, self.year_max = year_bounds
+        self.version = tuple(version)
+        self.loaded_at = self.checked_at = time.monotonic()
+        logger.info("Catalog snapshot loaded: %d genres, years %s-%s, version %s",
+                    len(self.genres), self.year_min, self.year_max, self.version)
+
+    def is_stale(self, ttl: float) -> bool:
+        """
+        Tell whether the snapshot is older than ttl seconds.
+
+        Args:
+            ttl (float): Max age of the snapshot in seconds.
+
+        Returns:
+            bool: True if the snapshot should be reloaded.
+        """
+        return time.monotonic() - self.loaded_at > ttl
+
+    def needs_check(self, interval: float) -> bool:
+        """
+        Tell whether the version was compared more than interval seconds ago.
+
+        Args:
+            interval (float): Seconds between version checks.
+
+        Returns:
+            bool: True if the version should be compared with the database.
+        """
+        return time.monotonic() - self.checked_at > interval
+
+    def matches(self, version: Tuple[Any, ...]) -> bool:
+        """
+        Compare the snapshot version with the current one and record the check.
+
+        Args:
+            version (Tuple[Any, ...]): Current row of sql_queries.QUERY_CATALOG_VERSION.
+
+        Returns:
+            bool: True if the catalog did not change since the snapshot was loaded.
+        """
+        self.checked_at = time.monotonic()
+        return tuple(version) == self.version
@@ -0,0 +1,564 @@
+"""
+Memory-mapped columnar snapshot of the film catalog, with an in-process search engine.
+
+The sakila catalog is small and changes rarely, so instead of joining five
+tables for every search, the joins are flattened once into a compact file:
+one int32 column per result field, strings interned in a shared string
+table, and the cast of every film precomputed. The file is memory-mapped
+when opened: columns are read in place through memoryviews, and the only
+object created per file is the decoded text of the string table, so
+opening costs a few milliseconds whatever the catalog size. Searches scan
+the rows in (title, film_id) order from the cursor position and stop at
+the page limit, returning rows of the same shape as the MySQL queries.
+
+File layout:
+    8 bytes     magic b"MOVIECAT"
+    4 bytes     header length (little-endian)
+    header      JSON: format, byte order, catalog version, build time,
+                genres with film counts, year bounds, and the offset and
+                length of every column
+    columns     native int32 arrays, from the 8-byte aligned data offset
+    text        UTF-8 text of all strings, back to back
+
+Row columns have one entry per result row, i.e. per film and genre, like
+the GROUP BY of the search queries, sorted by (title, film_id): film_id,
+title, release_year, genre, actors, rental_rate (in cents) and
+description. Strings are numbers in the string table, whose char_offsets
+column tells where each one starts in the text; NULL is -1. The rows of
+each actor are listed in actor_rows[actor_starts[i]:actor_starts[i + 1]],
+and film_order lists the rows by film_id.
+
+Classes:
+    CatalogTables -- rows of the tables flattened into the file.
+    CatalogFile -- opened snapshot file answering searches and metadata.
+
+Functions:
+- version_key(version: Iterable[Any]) -> Tuple[Optional[str], ...]
+- fetch_tables(pool: ConnectionPool) -> CatalogTables
+- write_catalog_file(path: str, tables: CatalogTables) -> None
+- build_catalog_file(pool: ConnectionPool, path: str) -> CatalogFile
+"""
+
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set,
+                    Tuple)
+
+from actor_index import ActorIndex
+from catalog import CatalogSnapshot
+from exceptions import CatalogFileError
+from logger import get_logger
+from pagination import FIRST_TITLE_KEY
+from pool import ConnectionPool
+from query_builder import SearchCriteria
+import sql_queries
+
+
+logger = get_logger(__name__)
+
+MAGIC = b"MOVIECAT"
+FORMAT = 1
+
+# Value of NULL in every column
+NULL = -1
+
+# Row columns, in the order of the fields of a search result row
+ROW_COLUMNS = ("film_id", "title", "release_year", "genre", "actors", "rental_rate",
+               "description")
+
+
+class CatalogTables(NamedTuple):
+    """
+    Rows of the tables flattened into a catalog snapshot file.
+
+    Attributes:
+        version: Row of sql_queries.QUERY_SNAPSHOT_VERSION.
+        films: (film_id, title, release_year, rental_rate, description) rows.
+        film_genres: (film_id, genre name) rows.
+        actors: (actor_id, first_name, last_name) rows.
+        film_actors: (film_id, actor_id) rows.
+        genre_counts: (genre name, film count) rows.
+    """
+    version: Tuple[Any, ...]
+    films: List[Tuple[int, str, Optional[int], Any, Optional[str]]]
+    film_genres: List[Tuple[int, Optional[str]]]
+    actors: List[Tuple[int, str, str]]
+    film_actors: List[Tuple[int, int]]
+    genre_counts: List[Tuple[str, int]]
+
+
+def version_key(version: Iterable[Any]) -> Tuple[Optional[str], ...]:
+    """
+    Return the comparable (and JSON-serializable) form of a catalog version.
+
+    Args:
+        version: Row of sql_queries.QUERY_SNAPSHOT_VERSION.
+
+    Returns:
+        Tuple[Optional[str], ...]: Values as strings, NULL as None.
+    """
+    return tuple(None if value is None else str(value) for value in version)
+
+
+def fetch_tables(pool: ConnectionPool) -> CatalogTables:
+    """
+    Read the catalog tables from MySQL.
+
+    The version is read first: a change committed during the reads makes
+    the next version check fail, so it triggers another build instead of
+    being missed.
+
+    Args:
+        pool: MySQL connection pool.
+
+    Raises:
+        pymysql.MySQLError: If a query fails.
+        ConnectionError: If no connection is available.
+
+    Returns:
+        CatalogTables: Rows of every table.
+    """
+    with pool.connection() as conn, conn.cursor() as cursor:
+        def fetch(query: str) -> List[Tuple]:
+            cursor.execute(query)
+            return list(cursor.fetchall())
+
+        return CatalogTables(
+            version=fetch(sql_queries.QUERY_SNAPSHOT_VERSION)[0],
+            films=fetch(sql_queries.QUERY_SNAPSHOT_FILMS),
+            film_genres=fetch(sql_queries.QUERY_SNAPSHOT_FILM_GENRES),
+            actors=fetch(sql_queries.QUERY_ALL_ACTORS),
+            film_actors=fetch(sql_queries.QUERY_SNAPSHOT_FILM_ACTORS),
+            genre_counts=fetch(sql_queries.QUERY_GENRE_COUNTS),
+        )
+
+
+def _cents(rate: Any) -> int:
+    """Return a rental rate (Decimal, float or None) in cents, NULL for None."""
+    if rate is None:
+        return NULL
+    return int((Decimal(str(rate)) * 100).to_integral_value())
+
+
+def write_catalog_file(path: str, tables: CatalogTables) -> None:
+    """
+    Flatten the catalog tables into a snapshot file.
+
+    The file is written next to path and renamed over it, so readers never
+    see a partial file and an open mapping of the old file stays valid.
+
+    Args:
+        path: Target file.
+        tables: Rows read by fetch_tables().
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(text: Optional[str]) -> int:
+        if text is None:
+            return NULL
+        return strings.setdefault(text, len(strings))
+
+    genres_of: Dict[int, Set[Optional[str]]] = defaultdict(set)
+    for film_id, genre in tables.film_genres:
+        genres_of[film_id].add(genre)
+    names = {actor_id: (first_name, last_name)
+             for actor_id, first_name, last_name in tables.actors}
+    cast_of: Dict[int, List[int]] = defaultdict(list)
+    for film_id, actor_id in tables.film_actors:
+        cast_of[film_id].append(actor_id)
+
+    # One row per film and genre, as grouped by the search queries
+    rows = []
+    for film_id, title, release_year, rental_rate, description in tables.films:
+        cast = sorted(names[actor_id] for actor_id in cast_of[film_id] if actor_id in names)
+        actors = ", ".join(f"{first_name} {last_name}" for first_name, last_name in cast) or None
+        for genre in genres_of.get(film_id) or {None}:
+            rows.append((title, film_id, genre or "", genre, release_year, rental_rate,
+                         description, actors))
+    rows.sort(key=lambda row: row[:3])
+
+    columns: Dict[str, array] = {name: array("i") for name in ROW_COLUMNS}
+    rows_of_film: Dict[int, List[int]] = defaultdict(list)
+    for position, (title, film_id, _, genre, release_year, rental_rate,
+                   description, actors) in enumerate(rows):
+        for name, value in zip(ROW_COLUMNS, (
+                film_id, intern(title), NULL if release_year is None else release_year,
+                intern(genre), intern(actors), _cents(rental_rate), intern(description))):
+            columns[name].append(value)
+        rows_of_film[film_id].append(position)
+
+    columns["film_order"] = array("i", sorted(range(len(rows)), key=lambda i: rows[i][1]))
+    actor_ids = sorted(names)
+    columns["actor_ids"] = array("i", actor_ids)
+    columns["actor_first_names"] = array("i", (intern(names[i][0]) for i in actor_ids))
+    columns["actor_last_names"] = array("i", (intern(names[i][1]) for i in actor_ids))
+    films_of_actor: Dict[int, List[int]] = defaultdict(list)
+    for film_id, actor_id in tables.film_actors:
+        films_of_actor[actor_id].append(film_id)
+    columns["actor_starts"] = array("i", [0])
+    columns["actor_rows"] = array("i")
+    for actor_id in actor_ids:
+        positions = sorted({position for film_id in films_of_actor[actor_id]
+                            for position in rows_of_film[film_id]})
+        columns["actor_rows"].extend(positions)
+        columns["actor_starts"].append(len(columns["actor_rows"]))
+
+    texts = list(strings)
+    columns["char_offsets"] = array("i", [0])
+    for text in texts:
+        columns["char_offsets"].append(columns["char_offsets"][-1] + len(text))
+    text_bytes = "".join(texts).encode("utf-8")
+
+    layout: Dict[str, Tuple[int, int]] = {}
+    offset = 0
+    for name, column in columns.items():
+        layout[name] = (offset, len(column))
+        offset += len(column) * column.itemsize
+    years = [row[4] for row in rows if row[4] is not None]
+    header = json.dumps({
+        "format": FORMAT,
+        "byteorder": sys.byteorder,
+        "itemsize": array("i").itemsize,
+        "version": version_key(tables.version),
+        "built_at": time.time(),
+        "rows": len(rows),
+        "genre_counts": [[name, count] for name, count in tables.genre_counts],
+        "year_min": min(years, default=None),
+        "year_max": max(years, default=None),
+        "columns": layout,
+        "text": [offset, len(text_bytes)],
+    }).encode("utf-8")
+    data_offset = -(-(len(MAGIC) + 4 + len(header)) // 8) * 8
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        f.write(b"\0" * (data_offset - f.tell()))
+        for column in columns.values():
+            column.tofile(f)
+        f.write(text_bytes)
+    os.replace(temp_path, path)
+    logger.info("Catalog snapshot file written: %s, %d rows, %d strings, %d bytes",
+                path, len(rows), len(texts), data_offset + offset + len(text_bytes))
+
+
+def build_catalog_file(pool: ConnectionPool, path: str) -> "CatalogFile":
+    """
+    Read the catalog from MySQL, write it to a snapshot file and open it.
+
+    Args:
+        pool: MySQL connection pool.
+        path: Target file.
+
+    Raises:
+        pymysql.MySQLError: If a query fails.
+        ConnectionError: If no connection is available.
+        OSError: If the file cannot be written.
+
+    Returns:
+        CatalogFile: The new snapshot.
+    """
+    started = time.perf_counter()
+    write_catalog_file(path, fetch_tables(pool))
+    logger.info("Catalog snapshot file built in %.1f ms", (time.perf_counter() - started) * 1000)
+    return CatalogFile(path)
+
+
+class CatalogFile:
+    """
+    Memory-mapped catalog snapshot answering searches without MySQL.
+
+    Attributes:
+        path (str): Snapshot file.
+        version (Tuple[Optional[str], ...]): version_key() of the catalog when built.
+        built_at (float): Epoch time of the build.
+        snapshot (CatalogSnapshot): Genres, film counts and year bounds.
+        actor_index (ActorIndex): Actor names of the snapshot.
+        checked_at (Optional[float]): Monotonic time when the version was
+            last compared with the database, None if never.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map a snapshot file.
+
+        Args:
+            path: File written by write_catalog_file().
+
+        Raises:
+            CatalogFileError: If the file is missing, truncated, or was
+                written in another format or byte order.
+        """
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self._map)
+            if bytes(view[:len(MAGIC)]) != MAGIC:
+                raise CatalogFileError(f"Not a catalog snapshot file: {path}")
+            header_size, = struct.unpack_from("<I", self._map, len(MAGIC))
+            start = len(MAGIC) + 4
+            header = json.loads(bytes(view[start:start + header_size]))
+            if (header["format"], header["byteorder"], header["itemsize"]) != (
+                    FORMAT, sys.byteorder, array("i").itemsize):
+                raise CatalogFileError(f"Incompatible catalog snapshot file: {path}")
+            data = view[-(-(start + header_size) // 8) * 8:]
+            itemsize = header["itemsize"]
+            self._columns = {
+                name: data[offset:offset + length * itemsize].cast("i")
+                for name, (offset, length) in header["columns"].items()
+            }
+            text_offset, text_size = header["text"]
+            text = str(data[text_offset:text_offset + text_size], "utf-8")
+        except CatalogFileError:
+            raise
+        except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+            raise CatalogFileError(f"Cannot read catalog snapshot file {path}: {e}") from e
+
+        self._size = header["rows"]
+        for name in ROW_COLUMNS + ("film_order",):
+            if len(self._columns[name]) != self._size:
+                raise CatalogFileError(f"Truncated catalog snapshot file: {path}")
+        self._text = text
+        # Case-folded copy searched by LIKE filters; it must keep the char
+        # offsets, so characters whose lowercase is longer are left as they are
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+        self._folded = folded
+        self._offsets = self._columns["char_offsets"]
+        self.version = tuple(header["version"])
+        self.built_at = header["built_at"]
+        self.snapshot = CatalogSnapshot(header["genre_counts"],
+                                        (header["year_min"], header["year_max"]), self.version)
+        self.actor_index = ActorIndex(self.actors())
+        self.checked_at: Optional[float] = None
+        logger.info("Catalog snapshot file mapped: %s, %d rows, built %s", path, self._size,
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.built_at)))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _string(self, ref: int) -> Optional[str]:
+        """Return a string of the string table, None for NULL."""
+        if ref == NULL:
+            return None
+        return self._text[self._offsets[ref]:self._offsets[ref + 1]]
+
+    def key(self, position: int) -> Tuple[str, int]:
+        """Return the (title, film_id) sort key of a row."""
+        return self._string(self._columns["title"][position]), self._columns["film_id"][position]
+
+    def row(self, position: int) -> Tuple:
+        """
+        Return a row in the shape of the search queries.
+
+        Args:
+            position: Row number.
+
+        Returns:
+            Tuple: film_id, title, release_year, genre, actors, rental_rate
+                (Decimal, like pymysql returns DECIMAL), description.
+        """
+        c = self._columns
+        release_year = c["release_year"][position]
+        rental_rate = c["rental_rate"][position]
+        return (
+            c["film_id"][position],
+            self._string(c["title"][position]),
+            None if release_year == NULL else release_year,
+            self._string(c["genre"][position]),
+            self._string(c["actors"][position]),
+            None if rental_rate == NULL else Decimal(rental_rate).scaleb(-2),
+            self._string(c["description"][position]),
+        )
+
+    def actors(self) -> List[Tuple[int, str, str]]:
+        """Return the (actor_id, first_name, last_name) rows of the snapshot."""
+        c = self._columns
+        return [(actor_id, self._string(first), self._string(last))
+                for actor_id, first, last in zip(c["actor_ids"], c["actor_first_names"],
+                                                 c["actor_last_names"])]
+
+    def _contains(self, column: str, needle: str) -> Callable[[int], bool]:
+        """Return a LIKE '%needle%' test of a string column."""
+        refs, offsets, folded = self._columns[column], self._offsets, self._folded
+        needle = needle.lower()
+
+        def test(position: int) -> bool:
+            ref = refs[position]
+            return ref != NULL and folded.find(needle, offsets[ref], offsets[ref + 1]) != -1
+        return test
+
+    def _between(self, column: str, low: Any, high: Any) -> Callable[[int], bool]:
+        """Return a low <= value <= high test of an int column (either bound optional)."""
+        values = self._columns[column]
+        low = -sys.maxsize if low is None else low
+        high = sys.maxsize if high is None else high
+
+        def test(position: int) -> bool:
+            value = values[position]
+            return value != NULL and low <= value <= high
+        return test
+
+    def iter_rows(self, criteria: SearchCriteria, actor_ids: Optional[List[int]],
+                  after: Tuple[str, int]) -> Iterator[Tuple]:
+        """
+        Yield the rows matching criteria after a key, in (title, film_id) order.
+
+        Args:
+            criteria: Filters, matched like the MySQL search queries.
+            actor_ids: Ids the actor filter resolved to; required when
+                criteria.actor is set.
+            after: (title, film_id) of the last seen row.
+
+        Yields:
+            Matching rows in the shape of the search queries.
+        """
+        for position in self._matching(criteria, actor_ids, after):
+            yield self.row(position)
+
+    def _matching(self, criteria: SearchCriteria, actor_ids: Optional[List[int]],
+                  after: Tuple[str, int]) -> Iterator[int]:
+        """Yield the positions of the rows matching criteria after a key (see iter_rows)."""
+        tests = []
+        for name in ("title", "description", "genre"):
+            if getattr(criteria, name) is not None:
+                tests.append(self._contains(name, getattr(criteria, name)))
+        if criteria.year_min is not None or criteria.year_max is not None:
+            tests.append(self._between("release_year", criteria.year_min, criteria.year_max))
+        if criteria.rate_min is not None or criteria.rate_max is not None:
+            # Exact cents of the bounds: 2.99 * 100 is not 299 in floating point
+            tests.append(self._between(
+                "rental_rate",
+                None if criteria.rate_min is None else Decimal(str(criteria.rate_min)) * 100,
+                None if criteria.rate_max is None else Decimal(str(criteria.rate_max)) * 100,
+            ))
+
+        start = bisect_right(range(self._size), tuple(after), key=self.key)
+        if criteria.actor is not None:
+            positions: Iterable[int] = sorted(
+                position for position in self._actor_positions(actor_ids or ())
+                if position >= start
+            )
+        else:
+            positions = range(start, self._size)
+        for position in positions:
+            if all(test(position) for test in tests):
+                yield position
+
+    def scan(self, criteria: SearchCriteria, actor_ids: Optional[List[int]],
+             after: Tuple[str, int], limit: int) -> List[Tuple]:
+        """
+        Return up to limit rows matching criteria after a key (see iter_rows).
+
+        Args:
+            criteria: Filters.
+            actor_ids: Ids the actor filter resolved to.
+            after: (title, film_id) of the last seen row.
+            limit: Max number of rows.
+
+        Returns:
+            List[Tuple]: Matching rows in (title, film_id) order.
+        """
+        return list(islice(self.iter_rows(criteria, actor_ids, after), limit))
+
+    def count(self, criteria: SearchCriteria, actor_ids: Optional[List[int]]) -> int:
+        """
+        Return the number of rows matching criteria, without decoding them.
+
+        Args:
+            criteria: Filters.
+            actor_ids: Ids the actor filter resolved to.
+
+        Returns:
+            int: Number of matching rows.
+        """
+        return sum(1 for _ in self._matching(criteria, actor_ids, FIRST_TITLE_KEY))
+
+    def key_before(self, criteria: SearchCriteria, actor_ids: Optional[List[int]],
+                   start: int) -> Optional[Tuple[str, int]]:
+        """
+        Return the (title, film_id) key of the matching row before a start index.
+
+        Args:
+            criteria: Filters.
+            actor_ids: Ids the actor filter resolved to.
+            start: 0-based index of the first result of the page.
+
+        Returns:
+            Optional[Tuple[str, int]]: Key after which the rows from start follow,
+                or None if no row matches at start.
+        """
+        positions = list(islice(self._matching(criteria, actor_ids, FIRST_TITLE_KEY),
+                                start - 1, start + 1))
+        return self.key(positions[0]) if len(positions) == 2 else None
+
+    def _actor_positions(self, actor_ids: Iterable[int]) -> Set[int]:
+        """Return the rows of the films of any of the actors."""
+        c = self._columns
+        ids, starts, rows = c["actor_ids"], c["actor_starts"], c["actor_rows"]
+        positions = set()
+        for actor_id in actor_ids:
+            i = bisect_left(ids, actor_id)
+            if i < len(ids) and ids[i] == actor_id:
+                positions.update(rows[starts[i]:starts[i + 1]])
+        return positions
+
+    def films_by_ids(self, film_ids: List[int]) -> List[Tuple]:
+        """
+        Return the rows of films, in the order of film_ids.
+
+        Args:
+            film_ids: Film ids.
+
+        Returns:
+            List[Tuple]: Rows of the films found (one per genre).
+        """
+        order, film_id_column = self._columns["film_order"], self._columns["film_id"]
+        rows = []
+        for film_id in film_ids:
+            i = bisect_left(order, film_id, key=lambda position: film_id_column[position])
+            while i < len(order) and film_id_column[order[i]] == film_id:
+                rows.append(self.row(order[i]))
+                i += 1
+        return rows
+
+    def needs_check(self, interval: float) -> bool:
+        """
+        Tell whether the version was compared more than interval seconds ago.
+
+        Args:
+            interval (float): Seconds between version checks.
+
+        Returns:
+            bool: True if the version should be compared with the database.
+        """
+        return self.checked_at is None or time.monotonic() - self.checked_at > interval
+
+    def mark_checked(self) -> None:
+        """Record a version check, also when the database could not be reached."""
+        self.checked_at = time.monotonic()
+
+    def matches(self, version: Iterable[Any]) -> bool:
+        """
+        Compare the snapshot version with the current one and record the check.
+
+        Args:
+            version: Current row of sql_queries.QUERY_SNAPSHOT_VERSION.
+
+        Returns:
+            bool: True if the catalog did not change since the snapshot was built.
+        """
+        self.mark_checked()
+        return version_key(version) == self.version
@@ -0,0 +1,163 @@
+"""
+Lazy registry of database connections.
+
+Nothing is connected on import: the MySQL pool is created on first use
+(and itself opens connections lazily), and the MongoDB client is connected
+the first time a collection is requested, with the explicit timeouts from
+settings. A failed MongoDB connection is not retried before
+settings.MONGO_RETRY_INTERVAL, so an unreachable server costs one timeout,
+not one per search.
+
+Classes:
+    ConnectionRegistry -- creates, caches and closes shared connections.
+
+Attributes:
+    registry -- process-wide ConnectionRegistry instance.
+"""
+
+
+import threading
+import time
+from typing import Callable, Optional
+
+from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymysql.connections import Connection
+
+from logger import get_logger
+from pool import ConnectionPool
+import settings
+
+
+logger = get_logger(__name__)
+
+
+class ConnectionRegistry:
+    """
+    Factory and cache of the MySQL pool and the MongoDB client.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty registry; no connection is opened."""
+        self._lock = threading.Lock()
+        self._mysql_factory: Callable[[], Connection] = settings.connect_mysql
+        self._mysql_pool: Optional[ConnectionPool] = None
+        self._mongo_client: Optional[MongoClient] = None
+        self._mongo_failed_at: Optional[float] = None
+
+    def install(self, mysql_factory: Optional[Callable[[], Connection]] = None,
+                mongo_client: Optional[MongoClient] = None) -> None:
+        """
+        Replace the connection sources, e.g. with local stand-ins for benchmarks.
+
+        Connections opened so far are closed first.
+
+        Args:
+            mysql_factory: Function opening MySQL-compatible connections.
+            mongo_client: MongoDB-compatible client used instead of connecting.
+        """
+        self.close()
+        with self._lock:
+            self._mysql_factory = mysql_factory or settings.connect_mysql
+            self._mongo_client = mongo_client
+            self._mongo_failed_at = None
+
+    def create_mysql_pool(self, max_size: Optional[int] = None) -> ConnectionPool:
+        """
+        Create a new MySQL connection pool, not shared and not closed by close().
+
+        Args:
+            max_size: Maximum number of connections; settings.MYSQL_POOL_MAX_SIZE if None.
+
+        Returns:
+            ConnectionPool: Pool opening connections with the installed factory.
+        """
+        return ConnectionPool(
+            self._mysql_factory,
+            min_size=settings.MYSQL_POOL_MIN_SIZE,
+            max_size=max_size or settings.MYSQL_POOL_MAX_SIZE,
+            idle_timeout=settings.MYSQL_POOL_IDLE_TIMEOUT,
+            max_lifetime=settings.MYSQL_POOL_MAX_LIFETIME,
+            checkout_timeout=settings.MYSQL_POOL_CHECKOUT_TIMEOUT,
+        )
+
+    def mysql_pool(self) -> ConnectionPool:
+        """
+        Return the shared MySQL connection pool, creating it on first use.
+
+        Returns:
+            ConnectionPool: Pool opening connections with settings.connect_mysql.
+        """
+        with self._lock:
+            if self._mysql_pool is None:
+                self._mysql_pool = self.create_mysql_pool()
+            return self._mysql_pool
+
+    def mongo_client(self) -> Optional[MongoClient]:
+        """
+        Return the shared MongoDB client, connecting on first use.
+
+        Returns:
+            Optional[MongoClient]: Connected client, or None if MongoDB is unavailable.
+        """
+        with self._lock:
+            if self._mongo_client is not None:
+                return self._mongo_client
+            if (self._mongo_failed_at is not None
+                    and time.monotonic() - self._mongo_failed_at < settings.MONGO_RETRY_INTERVAL):
+                return None
+            try:
+                self._mongo_client = settings.connect_mongo()
+                self._mongo_failed_at = None
+                logger.info("MongoDB connected")
+            except ConnectionError as e:
+                logger.error(e)
+                self._mongo_failed_at = time.monotonic()
+            return self._mongo_client
+
+    def mongo_collection(self) -> Optional[Collection]:
+        """
+        Return the search log collection.
+
+        Returns:
+            Optional[Collection]: Collection, or None if MongoDB is unavailable.
+        """
+        client = self.mongo_client()
+        return settings.get_mongo_collection(client) if client is not None else None
+
+    def mongo_counters(self) -> Optional[Collection]:
+        """
+        Return the search popularity counters collection.
+
+        Returns:
+            Optional[Collection]: Collection, or None if MongoDB is unavailable.
+        """
+        client = self.mongo_client()
+        return settings.get_mongo_counters_collection(client) if client is not None else None
+
+    def mongo_rollup(self, unit: str) -> Optional[Collection]:
+        """
+        Return the hourly or daily search count buckets collection.
+
+        Args:
+            unit: "hour" or "day".
+
+        Returns:
+            Optional[Collection]: Collection, or None if MongoDB is unavailable.
+        """
+        client = self.mongo_client()
+        return settings.get_mongo_rollup_collection(client, unit) if client is not None else None
+
+    def close(self) -> None:
+        """Close every connection opened so far."""
+        with self._lock:
+            if self._mysql_pool is not None:
+                self._mysql_pool.close()
+                self._mysql_pool = None
+            if self._mongo_client is not None:
+                self._mongo_client.close()
+                self._mongo_client = None
+        logger.info("All connections closed.")
+
+
+registry = ConnectionRegistry()
@@ -1,16 +1,35 @@
 """
 Module for managing movie database queries.
 
-Provides search methods by name, actor, description, genre, and year,
-with query logging and result pagination.
+Provides search methods by name (substring or typo-tolerant), actor,
+description, genre, and year, a combined multi-criteria search, with query
+logging and keyset (cursor) result pagination, plus cheap result counts
+and page jumps.
 """
 
 
-from typing import Optional, Dict, Tuple, List, Any
+import threading
+import time
+from typing import Optional, Dict, Tuple, List, Any, Callable, Iterator
 
 import pymysql
+import pymysql.cursors
 
 from logger import get_logger
+from pagination import Page
+import pagination
+from actor_index import ActorIndex
+from cache import SearchCache
+from catalog import CatalogSnapshot
+from catalog_file import CatalogFile, build_catalog_file
+from exceptions import CatalogFileError
+from fuzzy_index import FuzzyTitleIndex
+from pool import ConnectionPool
+from query_builder import SearchCriteria
+from text_index import TrigramIndex
+import fuzzy_index
+import query_builder
+import metrics
 import settings
 import sql_queries
 import mongo_log
@@ -18,150 +37,1016 @@ import mongo_log
 
 logger = get_logger(__name__)
 
+# Search kinds answered by the trigram index when it is enabled, and their field
+INDEXED_FIELDS = {"name": "title", "description": "description"}
+
+# Description search modes using the film_text FULLTEXT index, and their SQL modifier
+FULLTEXT_MODES = {"natural": "IN NATURAL LANGUAGE MODE", "boolean": "IN BOOLEAN MODE"}
+DESCRIPTION_SEARCH_MODES = ("like",) + tuple(FULLTEXT_MODES)
+
+# Characters with a meaning in FULLTEXT boolean mode queries
+BOOLEAN_OPERATORS = frozenset('+-<>()~*"@')
+
+# Last item of the cache key of a search count, in place of the page cursor
+# (cursors are URL-safe base64, so they never start with "#")
+COUNT_KEY = "#count"
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize search text for cache keys.
+
+    Searches are case-insensitive, so only the case is folded: spaces are
+    significant in LIKE patterns.
+
+    Args:
+        text: Search text as entered.
+
+    Returns:
+        Normalized text.
+    """
+    return text.lower()
+
+
+def search_key(kind: str, args: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """
+    Return the cache key of a search, without its page cursor.
+
+    Args:
+        kind: Search kind, e.g. "name" or "genre_and_year", or "criteria"
+            for a combined search.
+        args: Search arguments; (SearchCriteria,) for a combined search.
+
+    Returns:
+        Search kind followed by the normalized arguments.
+    """
+    match kind:
+        case "criteria":
+            return kind, args[0].normalized()
+        case "genre_and_year":
+            genre, year_min, year_max = args
+            return kind, normalize(genre), year_min, year_max
+    return kind, normalize(args[0])
+
+
+def fulltext_query(text: str, mode: str) -> str:
+    """
+    Return the AGAINST text of a description search.
+
+    In boolean mode, a query without operators requires every word
+    ("shark boat" becomes "+shark +boat"); queries with operators are used
+    as typed. Natural language queries are used as typed.
+
+    Args:
+        text: Search text as entered.
+        mode: "natural" or "boolean".
+
+    Returns:
+        Text for MATCH ... AGAINST.
+    """
+    if mode == "boolean" and not BOOLEAN_OPERATORS & set(text):
+        return " ".join(f"+{word}" for word in text.split())
+    return text
+
 
 class MovieDB:
     """
     Database access layer for movie-related queries.
 
     Attributes:
-        connection (pymysql.connections.Connection): Active MySQL connection.
-        cursor (pymysql.cursors.Cursor): Cursor for executing SQL queries.
-        limit (int): Max number of results to return per query (pagination limit).
+        pool (ConnectionPool): MySQL connection pool borrowed from per query.
+        limit (int): Max number of results to return per page (pagination limit).
+        text_index (Optional[TrigramIndex]): Trigram index answering title and
+            description searches, or None to search with LIKE in MySQL.
+        actor_index (Optional[ActorIndex]): Cached actor names used to resolve
+            actor searches to actor ids; loaded on first actor search.
+        catalog_snapshot (Optional[CatalogSnapshot]): Cached genres and year
+            bounds; loaded on first use.
+        fuzzy_index (Optional[FuzzyTitleIndex]): BK-tree of film titles for
+            typo-tolerant title search; built on first use.
+        catalog_file_path (Optional[str]): Catalog snapshot file answering
+            searches and metadata in-process, None to query MySQL.
+        catalog_file (Optional[CatalogFile]): Mapped catalog snapshot file.
+        cache (Optional[SearchCache]): Search result cache, or None to always query.
+        log_searches (bool): Log first-page searches to MongoDB.
+        description_mode (str): "like", "natural" or "boolean" (see
+            settings.DESCRIPTION_SEARCH_MODE).
     """
 
-    def __init__(self, conn: pymysql.connections.Connection,
-                 cursor: pymysql.cursors.Cursor) -> None:
+    def __init__(self, pool: ConnectionPool, cache: Optional[SearchCache] = None,
+                 log_searches: bool = True) -> None:
         """
-        Initialize MovieDB with active DB connection and cursor.
+        Initialize MovieDB with a MySQL connection pool.
 
         Args:
-            conn: MySQL connection instance.
-            cursor: Cursor object for executing queries.
+            pool: Connection pool; a connection is borrowed for each query.
+            cache: Optional cache of search result pages.
+            log_searches: Log first-page searches to MongoDB.
         """
-        self.connection = conn
-        self.cursor = cursor
+        self.pool = pool
+        self.cache = cache
+        self.log_searches = log_searches
+        if cache is not None:
+            metrics.registry.register_collector("search_cache", cache.stats)
         self.limit = settings.MOVIE_RESULT_LIMIT
+        self.text_index: Optional[TrigramIndex] = None
+        self.actor_index: Optional[ActorIndex] = None
+        self.catalog_snapshot: Optional[CatalogSnapshot] = None
+        self.fuzzy_index: Optional[FuzzyTitleIndex] = None
+        self.catalog_file_path: Optional[str] = None
+        self.catalog_file: Optional[CatalogFile] = None
+        self._catalog_file_lock = threading.Lock()
+        self.description_mode = "like"
+        self.set_description_mode(settings.DESCRIPTION_SEARCH_MODE)
         logger.info("MovieDB initialized with limit=%d", self.limit)
 
-    def query(self, query: str, params: Optional[Tuple[Any, ...]] = None) -> List[Tuple]:
+    def enable_text_index(self) -> None:
+        """
+        Build the trigram index over film titles and descriptions.
+
+        Title and description searches are answered from the index afterwards;
+        MySQL is only queried to hydrate the films of the requested page.
+        """
+        logger.info("Building trigram index")
+        self.text_index = TrigramIndex.from_rows(self.query(sql_queries.QUERY_FILM_TEXTS))
+        self.invalidate_cache()
+
+    def enable_catalog_file(self, path: str) -> None:
+        """
+        Answer searches and metadata from a memory-mapped catalog snapshot file.
+
+        An existing file is mapped right away, without querying MySQL; a
+        missing or unreadable one is built on first use. Its version is
+        compared with the database on first use, then at most every
+        settings.CATALOG_CHECK_INTERVAL seconds, and the file is rebuilt when
+        the catalog changed. While MySQL is unreachable the file is used as is.
+        FULLTEXT description searches still run in MySQL.
+
+        Args:
+            path: Snapshot file.
+        """
+        self.catalog_file_path = path
+        try:
+            self.catalog_file = CatalogFile(path)
+        except CatalogFileError as e:
+            logger.info("Catalog snapshot file not usable, building it on first use: %s", e)
+        self.invalidate_cache()
+
+    def _current_catalog_file(self) -> Optional[CatalogFile]:
+        """
+        Return the catalog snapshot file, rebuilding it when the catalog changed.
+
+        Returns:
+            Mapped CatalogFile, or None if disabled, or missing while MySQL
+            is unavailable.
+        """
+        if self.catalog_file_path is None:
+            return None
+        current = self.catalog_file
+        if current is not None and not current.needs_check(settings.CATALOG_CHECK_INTERVAL):
+            return current
+        with self._catalog_file_lock:
+            current = self.catalog_file
+            if current is not None and not current.needs_check(settings.CATALOG_CHECK_INTERVAL):
+                return current
+            version = self.query(sql_queries.QUERY_SNAPSHOT_VERSION)
+            if current is not None:
+                if not version:
+                    current.mark_checked()
+                    return current
+                if current.matches(version[0]):
+                    return current
+                logger.info("Catalog changed since the snapshot file was built, rebuilding it")
+            elif not version:
+                return None
+            try:
+                self.catalog_file = build_catalog_file(self.pool, self.catalog_file_path)
+            except (pymysql.MySQLError, ConnectionError, OSError) as e:
+                logger.error("Cannot build catalog snapshot file %s: %s",
+                             self.catalog_file_path, e)
+                return current
+            self.invalidate_cache()
+            return self.catalog_file
+
+    def set_description_mode(self, mode: str) -> None:
+        """
+        Select how description searches match films.
+
+        Args:
+            mode: "like" (substring, by title), "natural" or "boolean"
+                (FULLTEXT over film_text, by relevance).
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in DESCRIPTION_SEARCH_MODES:
+            raise ValueError(f"Unknown description search mode: {mode}")
+        if mode != self.description_mode:
+            self.description_mode = mode
+            self.invalidate_cache("description")
+        logger.info("Description search mode: %s", mode)
+
+    def query(self, query: str, params: Optional[Tuple[Any, ...]] = None,
+              template: Optional[str] = None) -> List[Tuple]:
         """
         Execute a SQL query with optional parameters and fetch all results.
 
+        A connection is borrowed from the pool for the duration of the query,
+        so MovieDB can be shared by several threads. Execute and fetch times,
+        row counts and errors are recorded per template in metrics.registry.
+
         Args:
             query: SQL query string with placeholders.
             params: Optional tuple of parameters for query placeholders.
+            template: sql_queries name of the query for the metric labels,
+                found from the query text by default (see metrics.template_name).
 
         Returns:
             List of tuples representing rows fetched from the database.
             Returns empty list on error.
         """
+        template = template or metrics.template_name(query)
         try:
-            if params:
-                logger.debug("Executing query: %s with params: %s", query, params)
-                self.cursor.execute(query, params)
-            else:
-                logger.debug("Executing query: %s", query)
-                self.cursor.execute(query)
-            result = self.cursor.fetchall()
-            logger.debug("Query executed successfully, fetched %d rows", len(result))
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                started = time.perf_counter()
+                if params:
+                    logger.debug("Executing query: %s with params: %s", query, params)
+                    cursor.execute(query, params)
+                else:
+                    logger.debug("Executing query: %s", query)
+                    cursor.execute(query)
+                executed = time.perf_counter()
+                result = cursor.fetchall()
+                fetched = time.perf_counter()
+            logger.debug("Query executed successfully, fetched %d rows", len(result), extra={
+                "template": template,
+                "execute_ms": round((executed - started) * 1000, 3),
+                "fetch_ms": round((fetched - executed) * 1000, 3),
+                "rows": len(result),
+            })
+            metrics.registry.observe("query_execute_seconds", template, executed - started)
+            metrics.registry.observe("query_fetch_seconds", template, fetched - executed)
+            metrics.registry.inc("query_rows_total", template, len(result))
             return result
-        except pymysql.MySQLError as e:
+        except (pymysql.MySQLError, ConnectionError) as e:
             logger.error("Error executing query: %s; Exception: %s", query, e)
+            metrics.registry.inc("query_errors_total", template)
             return []
 
-    def search_film_by_name(self, film_name: str, offset: int = 0) -> List[Tuple]:
+    def resolve_actor_ids(self, actor_name: str) -> List[int]:
+        """
+        Resolve a partial actor name to actor ids using the cached actor index.
+
+        The index is (re)loaded when missing or older than settings.ACTOR_INDEX_TTL.
+        An empty index (e.g. MySQL unavailable) is used but not kept.
+
+        Args:
+            actor_name: Partial or full actor name.
+
+        Returns:
+            List of matching actor ids.
+        """
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            return catalog_file.actor_index.resolve(actor_name)
+        actor_index = self.actor_index
+        if actor_index is None or actor_index.is_stale(settings.ACTOR_INDEX_TTL):
+            actor_index = ActorIndex(self.query(sql_queries.QUERY_ALL_ACTORS))
+            if actor_index.names:
+                self.actor_index = actor_index
+        return actor_index.resolve(actor_name)
+
+    def _search_statement(self, kind: str,
+                          args: Tuple[Any, ...]) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+        """
+        Return the keyset search query of a search kind and its filter parameters.
+
+        Args:
+            kind: "name", "actor", "description" or "genre_and_year".
+            args: Search arguments, e.g. (genre, year_min, year_max).
+
+        Returns:
+            (query, filter_params), or None if nothing can match
+            (e.g. no actor matches the name).
+        """
+        match kind:
+            case "name":
+                return sql_queries.QUERY_FILM_BY_NAME, (query_builder.like_pattern(args[0]),)
+            case "actor":
+                actor_ids = self.resolve_actor_ids(args[0])
+                if not actor_ids:
+                    return None
+                placeholders = ", ".join(["%s"] * len(actor_ids))
+                query = sql_queries.QUERY_FILM_BY_ACTOR.format(ids=placeholders)
+                return query, tuple(actor_ids)
+            case "description":
+                return sql_queries.QUERY_FILM_BY_DESCRIPTION, (query_builder.like_pattern(args[0]),)
+            case "genre_and_year":
+                genre, year_min, year_max = args
+                return (sql_queries.QUERY_FILM_BY_GENRE_AND_YEAR,
+                        (query_builder.like_pattern(genre), year_min, year_max))
+        raise ValueError(f"Unknown search kind: {kind}")
+
+    def _fetch(self, kind: str, args: Tuple[Any, ...], cursor: Optional[str]) -> Page:
         """
-        Search films by name using LIKE pattern with pagination.
+        Fetch one page of a search from the catalog file, the trigram index or MySQL.
+
+        Args:
+            kind: "name", "actor", "description" or "genre_and_year".
+            args: Search arguments.
+            cursor: Cursor of the requested page, or None for the first page.
+
+        Returns:
+            Page with the found rows and the cursor of the next page.
+        """
+        if kind == "description" and self.description_mode in FULLTEXT_MODES:
+            return self._fulltext_page(args[0], cursor)
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            return self._catalog_file_page(catalog_file, query_builder.criteria_for(kind, args),
+                                           cursor)
+        if self.text_index is not None and kind in INDEXED_FIELDS:
+            return self._indexed_page(INDEXED_FIELDS[kind], args[0], cursor)
+        statement = self._search_statement(kind, args)
+        if statement is None:
+            return Page([], None)
+        return self._search_page(*statement, cursor)
+
+    def _search_page(self, query: str, filter_params: Tuple[Any, ...],
+                     cursor: Optional[str], template: Optional[str] = None) -> Page:
+        """
+        Run a keyset-paginated search query and build a Page from its rows.
+
+        Args:
+            query: Search query from sql_queries ending with the keyset predicate.
+            filter_params: Parameters of the search filter placeholders.
+            cursor: Cursor of the requested page, or None for the first page.
+            template: sql_queries name of the query for the metric labels.
+
+        Raises:
+            InvalidCursor: If the cursor cannot be decoded.
+
+        Returns:
+            Page with the found rows and the cursor of the next page.
+        """
+        last_title, last_id = (pagination.decode_cursor(cursor) if cursor
+                               else pagination.FIRST_TITLE_KEY)
+        params = filter_params + (last_title, last_title, last_id, self.limit + 1)
+        return pagination.make_page(self.query(query, params, template), self.limit)
+
+    def _catalog_file_page(self, catalog_file: CatalogFile, criteria: SearchCriteria,
+                           cursor: Optional[str]) -> Page:
+        """
+        Answer a search from the catalog snapshot file.
+
+        Args:
+            catalog_file: Mapped snapshot.
+            criteria: Filters of the search.
+            cursor: Cursor of the requested page, or None for the first page.
+
+        Raises:
+            InvalidCursor: If the cursor cannot be decoded.
+
+        Returns:
+            Page with the found rows and the cursor of the next page.
+        """
+        after = (pagination.decode_cursor(cursor) if cursor
+                 else pagination.FIRST_TITLE_KEY)
+        actor_ids = None
+        if criteria.actor is not None:
+            actor_ids = catalog_file.actor_index.resolve(criteria.actor)
+            if not actor_ids:
+                return Page([], None)
+        rows = catalog_file.scan(criteria, actor_ids, after, self.limit + 1)
+        return pagination.make_page(rows, self.limit)
+
+    def _fulltext_statement(self, text: str) -> Tuple[str, Tuple[Any, ...]]:
+        """
+        Return the FULLTEXT description query and its search parameters.
+
+        Args:
+            text: Search text as entered.
+
+        Returns:
+            (query, filter_params); the keyset parameters follow.
+        """
+        against = fulltext_query(text, self.description_mode)
+        query = sql_queries.QUERY_FILM_BY_DESCRIPTION_FULLTEXT.format(
+            mode=FULLTEXT_MODES[self.description_mode]
+        )
+        return query, (against, against)
+
+    def _fulltext_page(self, text: str, cursor: Optional[str]) -> Page:
+        """
+        Fetch one page of a relevance-ranked description search.
+
+        When the first page has no FULLTEXT match (or film_text cannot be
+        queried), the search falls back to LIKE; the cursors of such a search
+        hold a title instead of a score and keep following the LIKE path.
+
+        Args:
+            text: Words to look for in titles and descriptions.
+            cursor: Cursor of the requested page, or None for the first page.
+
+        Raises:
+            InvalidCursor: If the cursor cannot be decoded.
+
+        Returns:
+            Page with the found rows, most relevant first, and the cursor of the next page.
+        """
+        if cursor is None:
+            last_score, last_id = pagination.FIRST_SCORE_KEY
+        else:
+            last_score, last_id = pagination.decode_cursor(cursor, sort_types=(str, int, float))
+            if isinstance(last_score, str):
+                return self._search_page(*self._search_statement("description", (text,)), cursor)
+        query, filter_params = self._fulltext_statement(text)
+        params = filter_params + (last_score, last_score, last_id, self.limit + 1)
+        page = pagination.make_page(self.query(query, params), self.limit,
+                                    pagination.relevance_key)
+        if cursor is None and not page.rows:
+            logger.info("No FULLTEXT match for '%s', falling back to LIKE", text)
+            return self._search_page(*self._search_statement("description", (text,)), None)
+        # Drop the score column: rows have the same shape as other searches
+        return Page([row[:7] for row in page.rows], page.next_cursor)
+
+    def _indexed_page(self, field: str, text: str, cursor: Optional[str]) -> Page:
+        """
+        Answer a substring search from the trigram index and hydrate its page.
+
+        Args:
+            field: Indexed field, "title" or "description".
+            text: Substring to look for.
+            cursor: Cursor of the requested page, or None for the first page.
+
+        Raises:
+            InvalidCursor: If the cursor cannot be decoded.
+
+        Returns:
+            Page with the found rows and the cursor of the next page.
+        """
+        after = (pagination.decode_cursor(cursor) if cursor
+                 else pagination.FIRST_TITLE_KEY)
+        matches = self.text_index.search(field, text)
+        page_ids = self.text_index.page_ids(matches, after, self.limit + 1)
+        logger.debug("Trigram index: %d matches for %s '%s'", len(matches), field, text)
+        return pagination.make_page(self.query_films_by_ids(page_ids), self.limit)
+
+    def stream(self, query: str, params: Optional[Tuple[Any, ...]] = None,
+               batch_size: Optional[int] = None) -> Iterator[Tuple]:
+        """
+        Execute a SQL query and yield its rows through an unbuffered server-side cursor.
+
+        Rows are read with fetchmany() in batches, so memory stays bounded
+        whatever the size of the result. The borrowed connection is given back
+        as soon as the rows are exhausted; if the consumer stops early (close()
+        on the generator, or leaving a contextlib.closing block), the connection
+        is discarded instead of draining the remaining rows from the server.
+
+        Args:
+            query: SQL query string with placeholders.
+            params: Optional tuple of parameters for query placeholders.
+            batch_size: Rows per fetchmany(), defaults to settings.STREAM_BATCH_SIZE.
+
+        Raises:
+            pymysql.MySQLError: If the query fails; unlike query(), partial
+                results are never silently truncated.
+            ConnectionError: If no connection is available.
+
+        Yields:
+            Rows as tuples.
+        """
+        batch_size = batch_size or settings.STREAM_BATCH_SIZE
+        template = metrics.template_name(query)
+        conn = self.pool.acquire()
+        exhausted = False
+        rows_total = 0
+        try:
+            cursor = conn.cursor(pymysql.cursors.SSCursor)
+            logger.debug("Streaming query: %s with params: %s", query, params)
+            started = time.perf_counter()
+            cursor.execute(query, params)
+            metrics.registry.observe("query_execute_seconds", template,
+                                     time.perf_counter() - started)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                rows_total += len(rows)
+                yield from rows
+            exhausted = True
+            cursor.close()
+        except pymysql.MySQLError as e:
+            logger.error("Error streaming query: %s; Exception: %s", query, e)
+            metrics.registry.inc("query_errors_total", template)
+            raise
+        finally:
+            self.pool.release(conn, discard=not exhausted)
+            metrics.registry.inc("query_rows_total", template, rows_total)
+            logger.debug("Stream finished: %d rows, exhausted=%s", rows_total, exhausted)
+
+    def stream_search(self, kind: str, *args: Any,
+                      batch_size: Optional[int] = None) -> Iterator[Tuple]:
+        """
+        Yield every film matching a search, in the order of the paginated search.
+
+        Uses the same matching semantics as the search_film_by_* methods
+        (including the catalog file or trigram index when enabled) but
+        without pagination, result cache or search logging.
+
+        Args:
+            kind: "name", "actor", "description" or "genre_and_year".
+            *args: Search arguments, e.g. genre, year_min, year_max.
+            batch_size: Rows per batch, defaults to settings.STREAM_BATCH_SIZE.
+
+        Yields:
+            Film records with the same shape as search results.
+        """
+        batch_size = batch_size or settings.STREAM_BATCH_SIZE
+        if kind == "description" and self.description_mode in FULLTEXT_MODES:
+            query, filter_params = self._fulltext_statement(args[0])
+            last_score, last_id = pagination.FIRST_SCORE_KEY
+            params = filter_params + (last_score, last_score, last_id, sql_queries.NO_LIMIT)
+            found = False
+            try:
+                for row in self.stream(query, params, batch_size):
+                    found = True
+                    yield row[:7]
+            except pymysql.MySQLError:
+                if found:
+                    raise
+            if found:
+                return
+            logger.info("No FULLTEXT match for '%s', streaming LIKE matches", args[0])
+
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            criteria = query_builder.criteria_for(kind, args)
+            actor_ids = None
+            if criteria.actor is not None:
+                actor_ids = catalog_file.actor_index.resolve(criteria.actor)
+                if not actor_ids:
+                    return
+            yield from catalog_file.iter_rows(criteria, actor_ids, pagination.FIRST_TITLE_KEY)
+            return
+
+        if self.text_index is not None and kind in INDEXED_FIELDS:
+            matches = self.text_index.search(INDEXED_FIELDS[kind], args[0])
+            film_ids = self.text_index.page_ids(matches, pagination.FIRST_TITLE_KEY,
+                                                len(matches))
+            for start in range(0, len(film_ids), batch_size):
+                yield from self.query_films_by_ids(film_ids[start:start + batch_size])
+            return
+
+        statement = self._search_statement(kind, args)
+        if statement is None:
+            return
+        query, filter_params = statement
+        last_title, last_id = pagination.FIRST_TITLE_KEY
+        params = filter_params + (last_title, last_title, last_id, sql_queries.NO_LIMIT)
+        yield from self.stream(query, params, batch_size)
+
+    def query_films_by_ids(self, film_ids: List[int]) -> List[Tuple]:
+        """
+        Retrieve full film rows for the given ids, preserving their order.
+
+        Args:
+            film_ids: Film ids to hydrate.
+
+        Returns:
+            List of film records in the order of film_ids.
+        """
+        if not film_ids:
+            return []
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            return catalog_file.films_by_ids(film_ids)
+        placeholders = ", ".join(["%s"] * len(film_ids))
+        query = sql_queries.QUERY_FILMS_BY_IDS.format(ids=placeholders)
+        rows = {row[0]: row for row in self.query(query, tuple(film_ids))}
+        return [rows[film_id] for film_id in film_ids if film_id in rows]
+
+    def _cached(self, key: Tuple[Any, ...], fetch: Callable[[], Any],
+                cacheable: Callable[[Any], bool] = lambda page: bool(page.rows)) -> Any:
+        """
+        Serve a search page from the result cache, fetching it on a miss.
+
+        Empty pages are not cached: query() also returns no rows on errors.
+
+        Args:
+            key: Cache key: search kind, normalized params and page cursor.
+            fetch: Function fetching the page from the database.
+            cacheable: Predicate telling whether a fetched value may be cached.
+
+        Returns:
+            Cached or freshly fetched Page (or the value of fetch).
+        """
+        if self.cache is None:
+            return fetch()
+        return self.cache.get_or_load(key, fetch, cacheable)
+
+    def invalidate_cache(self, kind: Optional[str] = None) -> None:
+        """
+        Drop cached search results.
+
+        Args:
+            kind: Search kind to drop ("name", "actor", "description",
+                "genre_and_year"), or None to drop everything.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(kind)
+
+    def search_film_by_name(self, film_name: str, cursor: Optional[str] = None) -> Page:
+        """
+        Search films by name using LIKE pattern with keyset pagination.
 
         Args:
             film_name: Partial or full film name to search.
-            offset: Number of rows to skip for pagination.
+            cursor: Cursor returned with the previous page, None for the first page.
 
         Returns:
-            List of matching film records.
+            Page of matching film records.
         """
-        logger.info("Search film by name: '%s', offset: %d", film_name, offset)
-        if offset == 0:
+        logger.info("Search film by name: '%s', cursor: %s", film_name, cursor)
+        if cursor is None and self.log_searches:
             mongo_log.log_create("search_by_name", film_name)
-        param = f"%{film_name}%"
-        query = sql_queries.QUERY_FILM_BY_NAME
-        return self.query(query, (param, self.limit, offset))
+        key = search_key("name", (film_name,)) + (cursor,)
+        return self._cached(key, lambda: self._fetch("name", (film_name,), cursor))
+
 
-    def search_film_by_actor(self, actor_name: str, offset: int = 0) -> List[Tuple]:
+    def search_film_by_fuzzy_name(self, film_name: str, cursor: Optional[str] = None) -> Page:
         """
-        Search films by actor name with pagination.
+        Search the films whose title is closest to a possibly misspelled name.
+
+        Args:
+            film_name: Title, or title word, as typed.
+            cursor: Accepted for the common search signature; the closest
+                films always fit on one page.
+
+        Returns:
+            Page of the closest films, closest first, without next page.
+        """
+        logger.info("Search film by fuzzy name: '%s'", film_name)
+        if cursor is None and self.log_searches:
+            mongo_log.log_create("search_by_fuzzy_name", film_name)
+        return self.suggest_titles(film_name)
+
+    def suggest_titles(self, film_name: str) -> Page:
+        """
+        Find the films closest to a name by title edit distance, without logging.
+
+        Only the settings.FUZZY_TOP_K closest films are hydrated from MySQL.
+
+        Args:
+            film_name: Title, or title word, as typed.
+
+        Returns:
+            Page of the closest films, closest first, without next page.
+        """
+        index = self._fuzzy_titles()
+        if index is None:
+            return Page([], None)
+        max_distance = fuzzy_index.max_distance_for(film_name, settings.FUZZY_MAX_DISTANCE)
+        started = time.perf_counter()
+        closest = index.closest(film_name, settings.FUZZY_TOP_K, max_distance)
+        logger.debug("Fuzzy index: %d films within %d edits of '%s' in %.3f ms",
+                     len(closest), max_distance, film_name,
+                     (time.perf_counter() - started) * 1000)
+        return Page(self.query_films_by_ids([film_id for _, film_id in closest]), None)
+
+    def _fuzzy_titles(self) -> Optional[FuzzyTitleIndex]:
+        """
+        Return the fuzzy title index, (re)building it when the catalog changed.
+
+        The index is compared with the catalog snapshot version, which
+        follows film.last_update; an empty index (e.g. MySQL unavailable)
+        is not kept.
+
+        Returns:
+            FuzzyTitleIndex, or None if there are no films.
+        """
+        version = self.catalog().version
+        index = self.fuzzy_index
+        if index is None or index.version != version:
+            index = FuzzyTitleIndex(self.query(sql_queries.QUERY_FILM_TITLES), version)
+            if not len(index):
+                return None
+            self.fuzzy_index = index
+        return index
+
+    def search_film_by_actor(self, actor_name: str, cursor: Optional[str] = None) -> Page:
+        """
+        Search films by actor name with keyset pagination.
+
+        The name is first resolved to actor ids from the cached actor index,
+        then films are fetched through film_actor with their full cast.
 
         Args:
             actor_name: Partial or full actor name.
-            offset: Pagination offset.
+            cursor: Cursor returned with the previous page, None for the first page.
 
         Returns:
-            List of films featuring the actor.
+            Page of films featuring the actor.
         """
-        logger.info("Search film by actor: '%s', offset: %d", actor_name, offset)
-        if offset == 0:
+        logger.info("Search film by actor: '%s', cursor: %s", actor_name, cursor)
+        if cursor is None and self.log_searches:
             mongo_log.log_create("search_by_actor", actor_name)
-        param = f"%{actor_name}%"
-        query = sql_queries.QUERY_FILM_BY_ACTOR
-        return self.query(query, (param, self.limit, offset))
+        key = search_key("actor", (actor_name,)) + (cursor,)
+        return self._cached(key, lambda: self._fetch("actor", (actor_name,), cursor))
 
-    def search_film_by_description(self, description_text: str, offset: int = 0) -> List[Tuple]:
+
+    def search_film_by_description(self, description_text: str,
+                                   cursor: Optional[str] = None) -> Page:
         """
         Search films by description text.
 
         Args:
             description_text: Text to match within film descriptions.
-            offset: Pagination offset.
+            cursor: Cursor returned with the previous page, None for the first page.
 
         Returns:
-            List of matching films.
+            Page of matching films.
         """
-        logger.info("Search film by description: '%s', offset: %d", description_text, offset)
-        if offset == 0:
+        logger.info("Search film by description: '%s', cursor: %s", description_text, cursor)
+        if cursor is None and self.log_searches:
             mongo_log.log_create("search_by_description", description_text)
-        param = f"%{description_text}%"
-        query = sql_queries.QUERY_FILM_BY_DESCRIPTION
-        return self.query(query, (param, self.limit, offset))
+        key = search_key("description", (description_text,)) + (cursor,)
+        return self._cached(
+            key, lambda: self._fetch("description", (description_text,), cursor)
+        )
+
 
     def search_film_by_genre_and_year(self, genre: str,
         year_min: int,
         year_max: int,
-        offset: int = 0
-    ) -> List[Tuple]:
+        cursor: Optional[str] = None
+    ) -> Page:
         """
-        Search films by genre and year range with pagination.
+        Search films by genre and year range with keyset pagination.
 
         Args:
             genre: Film genre to search for.
             year_min: Minimum release year.
             year_max: Maximum release year.
-            offset: Pagination offset.
+            cursor: Cursor returned with the previous page, None for the first page.
 
         Returns:
-            List of films matching criteria.
+            Page of films matching criteria.
         """
 
-        logger.info("Search film by genre: '%s', year range: %d-%d, offset: %d",
-                    genre, year_min, year_max, offset)
-        if offset == 0:
+        logger.info("Search film by genre: '%s', year range: %d-%d, cursor: %s",
+                    genre, year_min, year_max, cursor)
+        if cursor is None and self.log_searches:
             mongo_log.log_create("search_by_genre_and_year", f"{genre} {year_min}-{year_max}")
-        param = f"%{genre}%"
-        query = sql_queries.QUERY_FILM_BY_GENRE_AND_YEAR
-        return self.query(query, (param, year_min, year_max, self.limit, offset))
+        key = search_key("genre_and_year", (genre, year_min, year_max)) + (cursor,)
+        return self._cached(
+            key, lambda: self._fetch("genre_and_year", (genre, year_min, year_max), cursor)
+        )
+
+
+    def search(self, criteria: SearchCriteria, cursor: Optional[str] = None) -> Page:
+        """
+        Search films matching every set filter of criteria, in one query.
+
+        The actor filter is resolved to actor ids from the cached actor index
+        first; the remaining filters are combined by query_builder.
+
+        Args:
+            criteria: Filters of the search; an empty criteria lists all films.
+            cursor: Cursor returned with the previous page, None for the first page.
+
+        Returns:
+            Page of films matching all filters.
+        """
+        logger.info("Search films by criteria: '%s', cursor: %s", criteria.describe(), cursor)
+        if cursor is None and self.log_searches:
+            mongo_log.log_create("search_by_criteria", criteria.describe())
+        key = search_key("criteria", (criteria,)) + (cursor,)
+        return self._cached(key, lambda: self._fetch_criteria(criteria, cursor))
+
+    def _fetch_criteria(self, criteria: SearchCriteria, cursor: Optional[str]) -> Page:
+        """
+        Fetch one page of a combined search from the catalog file or MySQL.
+
+        Args:
+            criteria: Filters of the search.
+            cursor: Cursor of the requested page, or None for the first page.
+
+        Returns:
+            Page with the found rows and the cursor of the next page.
+        """
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            return self._catalog_file_page(catalog_file, criteria, cursor)
+        actor_ids = None
+        if criteria.actor is not None:
+            actor_ids = self.resolve_actor_ids(criteria.actor)
+            if not actor_ids:
+                return Page([], None)
+        # a compiled statement can be identical to a single-search template
+        # (e.g. title only), so its metrics label is not guessed from the text
+        query, filter_params = query_builder.build_search(criteria, actor_ids)
+        return self._search_page(query, filter_params, cursor, "QUERY_FILM_SEARCH")
+
+    def count_matches(self, kind: str, args: Tuple[Any, ...]) -> Optional[int]:
+        """
+        Return the number of results of a search, without fetching them.
+
+        MySQL only counts over the tables read by the filters, without the
+        cast and genre joins of the search rows; the catalog file and the
+        trigram index count without hydrating anything. Counts are cached
+        with the pages of the search, under its normalized arguments; like
+        empty pages, zero counts are not.
+
+        Args:
+            kind: "name", "actor", "description", "genre_and_year", or
+                "criteria" for a combined search.
+            args: Search arguments, e.g. (genre, year_min, year_max), or
+                (SearchCriteria,).
+
+        Raises:
+            ValueError: If the kind is unknown.
+
+        Returns:
+            Number of results, or None if MySQL could not be queried.
+        """
+        return self._cached(search_key(kind, args) + (COUNT_KEY,),
+                            lambda: self._count(kind, args), bool)
+
+    def _count(self, kind: str, args: Tuple[Any, ...]) -> Optional[int]:
+        """
+        Count the results of a search from the catalog file, the trigram index or MySQL.
+
+        Args:
+            kind: Search kind (see count_matches).
+            args: Search arguments.
+
+        Returns:
+            Number of results, or None if MySQL could not be queried.
+        """
+        if kind == "description" and self.description_mode in FULLTEXT_MODES:
+            count = self._fulltext_count(args[0])
+            # Without FULLTEXT match the search falls back to LIKE
+            if count != 0:
+                return count
+        criteria = query_builder.criteria_for(kind, args)
+        actor_ids = None
+        if criteria.actor is not None:
+            actor_ids = self.resolve_actor_ids(criteria.actor)
+            if not actor_ids:
+                return 0
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            return catalog_file.count(criteria, actor_ids)
+        if self.text_index is not None and kind in INDEXED_FIELDS:
+            return len(self.text_index.search(INDEXED_FIELDS[kind], args[0]))
+        rows = self.query(*query_builder.build_count(criteria, actor_ids))
+        return rows[0][0] if rows else None
+
+    def _fulltext_count(self, text: str) -> Optional[int]:
+        """
+        Count the FULLTEXT matches of a description search.
+
+        Args:
+            text: Search text as entered.
+
+        Returns:
+            Number of matches, or None if film_text could not be queried.
+        """
+        query = sql_queries.QUERY_FULLTEXT_COUNT.format(mode=FULLTEXT_MODES[self.description_mode])
+        rows = self.query(query, (fulltext_query(text, self.description_mode),))
+        return rows[0][0] if rows else None
+
+    def page_cursor(self, kind: str, args: Tuple[Any, ...], number: int) -> Optional[str]:
+        """
+        Return the cursor of a page of a search, to jump to it directly.
+
+        The key of the last row before the page is read at an OFFSET of the
+        search keys only ((title, film_id) over the filtered tables, or
+        (score, film_id) of FULLTEXT matches), so the rows before the page
+        are neither joined with their cast nor hydrated. Cursors are cached
+        with the pages of the search.
+
+        Args:
+            kind: Search kind (see count_matches).
+            args: Search arguments.
+            number: Page number, from 1.
+
+        Raises:
+            ValueError: If the kind is unknown or the page does not exist.
+
+        Returns:
+            Cursor to pass to the search method, None for the first page.
+        """
+        if number < 1:
+            raise ValueError(f"Invalid page number: {number}")
+        if number == 1:
+            return None
+        start = (number - 1) * self.limit
+        cursor = self._cached(search_key(kind, args) + (f"#page={number}",),
+                              lambda: self._cursor_before(kind, args, start), bool)
+        if cursor is None:
+            raise ValueError(f"Page {number} is past the last page")
+        return cursor
+
+    def _cursor_before(self, kind: str, args: Tuple[Any, ...], start: int) -> Optional[str]:
+        """
+        Return the cursor of the results of a search from a start index on.
+
+        Args:
+            kind: Search kind (see count_matches).
+            args: Search arguments.
+            start: 0-based index of the first result of the page.
+
+        Returns:
+            Cursor, or None if the search has no result at start.
+        """
+        if kind == "description" and self.description_mode in FULLTEXT_MODES:
+            against = fulltext_query(args[0], self.description_mode)
+            query = sql_queries.QUERY_FULLTEXT_KEYS_AT.format(
+                mode=FULLTEXT_MODES[self.description_mode]
+            )
+            rows = self.query(query, (against, against, start - 1))
+            if len(rows) == 2:
+                return pagination.encode_cursor(float(rows[0][0]), rows[0][1])
+            # Without FULLTEXT match the search falls back to LIKE
+            if rows or self._fulltext_count(args[0]) != 0:
+                return None
+        criteria = query_builder.criteria_for(kind, args)
+        actor_ids = None
+        if criteria.actor is not None:
+            actor_ids = self.resolve_actor_ids(criteria.actor)
+            if not actor_ids:
+                return None
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            key = catalog_file.key_before(criteria, actor_ids, start)
+        elif self.text_index is not None and kind in INDEXED_FIELDS:
+            matches = self.text_index.search(INDEXED_FIELDS[kind], args[0])
+            key = self.text_index.key_before(matches, start)
+        else:
+            query, filter_params = query_builder.build_keys_at(criteria, actor_ids)
+            rows = self.query(query, filter_params + (start - 1,))
+            key = rows[0] if len(rows) == 2 else None
+        return None if key is None else pagination.encode_cursor(*key)
+
+    def catalog(self) -> CatalogSnapshot:
+        """
+        Return the catalog metadata snapshot, reloading it when outdated.
+
+        The snapshot is reloaded after settings.CATALOG_TTL seconds, or earlier
+        when the latest category/film last_update differs from the snapshot
+        version (checked at most every settings.CATALOG_CHECK_INTERVAL seconds).
+        A change of the catalog also drops the cached search results.
+        An empty snapshot (e.g. MySQL unavailable) is returned but not kept.
+        With a catalog snapshot file, its metadata is returned instead.
+
+        Returns:
+            Current CatalogSnapshot.
+        """
+        catalog_file = self._current_catalog_file()
+        if catalog_file is not None:
+            return catalog_file.snapshot
+        snapshot = self.catalog_snapshot
+        if snapshot is not None and not snapshot.is_stale(settings.CATALOG_TTL):
+            if not snapshot.needs_check(settings.CATALOG_CHECK_INTERVAL):
+                return snapshot
+            version = self.query(sql_queries.QUERY_CATALOG_VERSION)
+            if not version or snapshot.matches(version[0]):
+                return snapshot
+            logger.info("Catalog changed since %s, reloading snapshot", snapshot.version)
+            self.invalidate_cache()
+
+        version = self.query(sql_queries.QUERY_CATALOG_VERSION)
+        snapshot = CatalogSnapshot(
+            self.query(sql_queries.QUERY_GENRE_COUNTS),
+            self._query_year_bounds(),
+            version[0] if version else (),
+        )
+        if snapshot.genres:
+            self.catalog_snapshot = snapshot
+        return snapshot
 
     def query_all_genres(self) -> Dict[str, str]:
         """
-        Retrieve all genres from the database.
+        Retrieve all genres from the catalog snapshot.
 
         Returns:
             Dictionary mapping lowercase genre names to their original case.
         """
-        logger.info("Query all genres")
-        query = sql_queries.QUERY_ALL_GENRES
-        result = self.query(query)
-        return {row[0].lower(): row[0] for row in result}
+        return dict(self.catalog().genres)
 
     def query_min_max_year(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Retrieve the minimum and maximum release years from the catalog snapshot.
+
+        Returns:
+            Tuple of (min_year, max_year), or (None, None) if no data.
+        """
+        snapshot = self.catalog()
+        return snapshot.year_min, snapshot.year_max
+
+    def _query_year_bounds(self) -> Tuple[Optional[int], Optional[int]]:
         """
         Retrieve the minimum and maximum release years of films in the database.
 
@@ -169,6 +1054,31 @@ class MovieDB:
             Tuple of (min_year, max_year), or (None, None) if no data.
         """
         logger.info("Query min and max year")
-        query = sql_queries.QUERY_MIN_MAX_YEAR
-        result = self.query(query)
+        result = self.query(sql_queries.QUERY_MIN_MAX_YEAR)
         return result[0] if result else (None, None)
+
+
+def create_movie_db(pool: ConnectionPool, log_searches: bool = True) -> MovieDB:
+    """
+    Create a MovieDB configured from settings (result cache, search engine).
+
+    Args:
+        pool: Pool the MovieDB borrows connections from.
+        log_searches: Log first-page searches to MongoDB.
+
+    Returns:
+        Ready to use MovieDB.
+    """
+    search_cache = None
+    if settings.SEARCH_CACHE_TTL > 0:
+        search_cache = SearchCache(
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+            max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+            ttl=settings.SEARCH_CACHE_TTL,
+        )
+    movie_db = MovieDB(pool, cache=search_cache, log_searches=log_searches)
+    if settings.SEARCH_ENGINE == "trigram":
+        movie_db.enable_text_index()
+    elif settings.SEARCH_ENGINE == "snapshot":
+        movie_db.enable_catalog_file(settings.CATALOG_FILE_PATH)
+    return movie_db
@@ -1,10 +1,25 @@
 """
-Module with user exit exception and decorator.
+Module with application exceptions.
 
 Classes:
     UserExit -- raised when user chooses to exit.
+    InvalidCursor -- raised when a pagination cursor cannot be decoded.
+    PoolTimeout -- raised when no pooled connection becomes free in time.
+    CatalogFileError -- raised when a catalog snapshot file cannot be read.
 """
 
 
 class UserExit(Exception):
     """Exception for user-triggered exit."""
+
+
+class InvalidCursor(ValueError):
+    """Exception for malformed or foreign pagination cursors."""
+
+
+class PoolTimeout(ConnectionError):
+    """Exception for a connection pool checkout that timed out."""
+
+
+class CatalogFileError(OSError):
+    """Exception for a missing, truncated or incompatible catalog snapshot file."""
@@ -0,0 +1,120 @@
+"""
+Bulk export of search results to CSV or JSON lines.
+
+Rows are streamed from MySQL through MovieDB.stream_search and written
+one by one, so memory stays constant whatever the number of matches.
+Files ending in .gz are gzip-compressed.
+
+Classes:
+    ExportStats -- number of rows written, duration and throughput.
+
+Functions:
+- export_search(movie_db, kind, args, path, fmt, compress) -> ExportStats
+"""
+
+
+import contextlib
+import csv
+import gzip
+import json
+import time
+from decimal import Decimal
+from typing import Any, Dict, IO, Iterable, NamedTuple, Optional, Tuple
+
+from logger import get_logger
+import db
+
+
+logger = get_logger(__name__)
+
+COLUMNS = ["film_id", "title", "release_year", "genre", "actors", "rental_rate", "description"]
+
+FORMATS = ("csv", "jsonl")
+
+
+class ExportStats(NamedTuple):
+    """
+    Result of an export.
+
+    Attributes:
+        rows (int): Number of rows written.
+        seconds (float): Duration of the export.
+        rows_per_sec (float): Throughput.
+    """
+    rows: int
+    seconds: float
+    rows_per_sec: float
+
+
+def row_record(row: Tuple) -> Dict[str, Any]:
+    """Convert a film row to a JSON-serializable dict."""
+    return {
+        column: float(value) if isinstance(value, Decimal) else value
+        for column, value in zip(COLUMNS, row)
+    }
+
+
+def write_rows(rows: Iterable[Tuple], f: IO[str], fmt: str) -> int:
+    """
+    Write film rows to an open text file.
+
+    Args:
+        rows (Iterable[Tuple]): Film rows as returned by the searches.
+        f (IO[str]): Target file.
+        fmt (str): "csv" (with a header line) or "jsonl".
+
+    Returns:
+        int: Number of rows written.
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            f.write(json.dumps(row_record(row), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_search(movie_db: db.MovieDB, kind: str, args: Tuple[Any, ...], path: str,
+                  fmt: Optional[str] = None, compress: Optional[bool] = None) -> ExportStats:
+    """
+    Stream every result of a search to a CSV or JSON lines file.
+
+    Args:
+        movie_db (db.MovieDB): MovieDB used for the search.
+        kind (str): "name", "actor", "description" or "genre_and_year".
+        args (Tuple[Any, ...]): Search arguments, e.g. (genre, year_min, year_max).
+        path (str): Target file.
+        fmt (Optional[str]): "csv" or "jsonl"; guessed from path if None.
+        compress (Optional[bool]): gzip the output; True for *.gz paths if None.
+
+    Raises:
+        ValueError: If the format is unknown.
+
+    Returns:
+        ExportStats: Rows written, duration and throughput.
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    if fmt is None:
+        fmt = "jsonl" if path.removesuffix(".gz").endswith((".jsonl", ".json")) else "csv"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    logger.info("Export %s %s to %s (format=%s, gzip=%s)", kind, args, path, fmt, compress)
+    started = time.perf_counter()
+    opener = gzip.open if compress else open
+    with contextlib.closing(movie_db.stream_search(kind, *args)) as rows, \
+            opener(path, "wt", encoding="utf-8", newline="") as f:
+        count = write_rows(rows, f, fmt)
+    seconds = time.perf_counter() - started
+    stats = ExportStats(count, seconds, count / seconds if seconds else 0.0)
+    logger.info("Export finished: %d rows in %.2f s (%.0f rows/s)",
+                stats.rows, stats.seconds, stats.rows_per_sec)
+    return stats
@@ -0,0 +1,380 @@
+"""
+BK-tree index for typo-tolerant film title search.
+
+Distinct lowercase title words are the terms of a BK-tree (Burkhard-Keller
+tree) over the Levenshtein edit distance. A word is compared with a small
+part of the terms only: the triangle inequality rules out every subtree
+whose edge distance is farther from the query distance than the current
+search radius, and the radius shrinks to the k-th best distance as soon as
+k films were found. Distances are computed with the bit-parallel algorithm
+of Myers, a few integer operations per character.
+
+A query of one word is matched against title words, so "dinosuar" finds
+ACADEMY DINOSAUR, and against full titles, so "devilannie" finds DEVIL ANNIE.
+Full titles are compared only when their length is within the accepted
+distance of the query's and they contain one of distance + 1 disjoint
+pieces of the query, moved by the accepted distance at most: an edit
+changes at most one piece, so a title within that many edits keeps at least
+one piece intact, and shifts the others by one character at most. Edits of
+spaces are therefore found like any other, whatever the accepted distance.
+
+The index is built from (film_id, title) rows and records the catalog
+version it was built from, so that MovieDB can rebuild it when films change.
+
+Classes:
+    BKTree -- metric tree of terms under the Levenshtein distance.
+    FuzzyTitleIndex -- top-k closest films by title edit distance.
+
+Functions:
+- max_distance_for(text: str, limit: int) -> int
+- split_pieces(text: str, count: int) -> List[str]
+- pattern_masks(pattern: str) -> Dict[str, int]
+- edit_distance(masks: Dict[str, int], length: int, text: str, max_distance: int) -> int
+- levenshtein(a: str, b: str) -> int
+"""
+
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def max_distance_for(text: str, limit: int) -> int:
+    """
+    Return the edit distance accepted for a search text.
+
+    A third of its length, at least 1 and at most limit: short words would
+    otherwise match almost any word of the same length.
+
+    Args:
+        text (str): Searched title or word.
+        limit (int): Largest distance accepted for long texts.
+
+    Returns:
+        int: Largest edit distance of a match.
+    """
+    return min(limit, max(len(text.strip()) // 3, 1))
+
+
+def split_pieces(text: str, count: int) -> List[str]:
+    """
+    Split a text into count disjoint pieces of (nearly) equal length.
+
+    Args:
+        text (str): Text to split.
+        count (int): Number of pieces; pieces are empty past the text length.
+
+    Returns:
+        List[str]: Consecutive pieces whose concatenation is the text.
+    """
+    return [text[i * len(text) // count:(i + 1) * len(text) // count] for i in range(count)]
+
+
+def pattern_masks(pattern: str) -> Dict[str, int]:
+    """
+    Return the bit mask of the positions of each character of a pattern.
+
+    Args:
+        pattern (str): String compared with many others.
+
+    Returns:
+        Dict[str, int]: Bit i of a character's mask is set if pattern[i] is that character.
+    """
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | 1 << i
+    return masks
+
+
+def edit_distance(masks: Dict[str, int], length: int, text: str, max_distance: int) -> int:
+    """
+    Return the Levenshtein distance of a pattern and a text.
+
+    Bit-parallel algorithm of Myers (1999) in the formulation of Hyyrö: a
+    column of the dynamic programming matrix is kept as bit vectors of its
+    vertical deltas and advanced with a few integer operations per text
+    character, instead of one minimum per cell. Each remaining character
+    lowers the distance by one at most, so the computation stops as soon
+    as the distance cannot get back to max_distance.
+
+    Args:
+        masks (Dict[str, int]): pattern_masks() of the pattern.
+        length (int): Length of the pattern.
+        text (str): Compared string.
+        max_distance (int): Largest distance of interest.
+
+    Returns:
+        int: Edit distance, or max_distance + 1 if it is larger than max_distance.
+    """
+    if abs(len(text) - length) > max_distance:
+        return max_distance + 1
+    if not length:
+        return len(text)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, score = full, 0, length
+    # Score above which max_distance is out of reach with the remaining characters
+    bound = len(text) + max_distance
+    for char in text:
+        eq = masks.get(char, 0)
+        vertical = eq | negative
+        horizontal = (((eq & positive) + positive) ^ positive) | eq
+        up = negative | ~(horizontal | positive) & full
+        down = positive & horizontal
+        if up & last:
+            score += 1
+        elif down & last:
+            score -= 1
+        up = (up << 1) | 1
+        down <<= 1
+        positive = (down | ~(vertical | up)) & full
+        negative = up & vertical
+        bound -= 1
+        if score > bound:
+            return max_distance + 1
+    return score
+
+
+def levenshtein(a: str, b: str) -> int:
+    """
+    Return the Levenshtein distance of two strings.
+
+    Args:
+        a (str): First string.
+        b (str): Second string.
+
+    Returns:
+        int: Minimum number of inserted, deleted or substituted characters.
+    """
+    # No distance exceeds the longer length
+    return edit_distance(pattern_masks(a), len(a), b, max(len(a), len(b)))
+
+
+class BKTree:
+    """
+    BK-tree of terms under the Levenshtein distance, each with a set of ids.
+
+    Nodes are [term, {edge distance: child node}] lists.
+
+    Attributes:
+        ids (Dict[str, Set[int]]): Ids recorded under each term.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty tree."""
+        self._root: Optional[List[Any]] = None
+        self.ids: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, term: str, item_id: int) -> None:
+        """
+        Record an id under a term, inserting the term if it is new.
+
+        Args:
+            term (str): Term.
+            item_id (int): Id recorded under the term.
+        """
+        if term in self.ids:
+            self.ids[term].add(item_id)
+            return
+        self.ids[term] = {item_id}
+        if self._root is None:
+            self._root = [term, {}]
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(term, node[0])
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [term, {}]
+                return
+            node = child
+
+    def nearest(self, query: str, max_distance: int,
+                accept: Callable[[str, int], int]) -> None:
+        """
+        Visit the terms within max_distance of the query, narrowing as told.
+
+        accept(term, distance) is called for every term found and returns
+        the radius to keep searching with, so that a top-k search can
+        shrink it once it has k results.
+
+        Args:
+            query (str): Searched term.
+            max_distance (int): Initial search radius.
+            accept: Callback receiving (term, distance) and returning the new radius.
+        """
+        if self._root is None:
+            return
+        masks, length = pattern_masks(query), len(query)
+        radius = max_distance
+        stack = [self._root]
+        while stack:
+            term, children = stack.pop()
+            # Exact up to the farthest child edge, which is all pruning needs
+            distance = edit_distance(masks, length, term, radius + max(children, default=0))
+            if distance <= radius:
+                radius = accept(term, distance)
+            low, high = distance - radius, distance + radius
+            stack.extend(child for edge, child in children.items() if low <= edge <= high)
+
+
+class FuzzyTitleIndex:
+    """
+    Top-k films closest to a query by title edit distance.
+
+    Attributes:
+        words (BKTree): Title words with the ids of the films using them.
+        version (Tuple[Any, ...]): Catalog version the index was built from.
+        built_at (float): Monotonic time when the index was built.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str]], version: Tuple[Any, ...] = ()) -> None:
+        """
+        Build the index.
+
+        Args:
+            rows: (film_id, title) rows of sql_queries.QUERY_FILM_TITLES.
+            version: Row of sql_queries.QUERY_CATALOG_VERSION.
+        """
+        started = time.perf_counter()
+        self.version = tuple(version)
+        self.words = BKTree()
+        # (lowercase title, film_id) sort key per film
+        self._keys: Dict[int, Tuple[str, int]] = {}
+        by_length: Dict[int, List[Tuple[str, int]]] = {}
+        for film_id, title in rows:
+            title = " ".join((title or "").lower().split())
+            self._keys[film_id] = (title, film_id)
+            by_length.setdefault(len(title), []).append((title, film_id))
+            for word in title.split():
+                self.words.add(word, film_id)
+        # Titles of each length joined with newlines, and their film ids: the
+        # title of a match at offset i of the text is the (i // (length + 1))-th
+        self._titles: Dict[int, Tuple[str, List[int]]] = {
+            length: ("\n".join(title for title, _ in pairs), [film_id for _, film_id in pairs])
+            for length, pairs in by_length.items()
+        }
+        self.built_at = time.monotonic()
+        logger.info("Fuzzy title index built: %d films, %d words in %.1f ms",
+                    len(self._keys), len(self.words), (time.perf_counter() - started) * 1000)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def closest(self, text: str, k: int, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Return the k films closest to the text.
+
+        Args:
+            text (str): Title, or title word, as typed.
+            k (int): Max number of films.
+            max_distance (int): Largest edit distance of a match.
+
+        Returns:
+            List[Tuple[int, int]]: (distance, film_id) pairs, closest first,
+                ties ordered by title.
+        """
+        query = " ".join(text.lower().split())
+        if not query or k <= 0:
+            return []
+        best = self._closest_titles(query, max_distance)
+        if " " not in query:
+            for film_id, distance in self._closest_words(query, k, max_distance).items():
+                if distance < best.get(film_id, max_distance + 1):
+                    best[film_id] = distance
+        ranked = sorted((distance, self._keys[film_id]) for film_id, distance in best.items())
+        return [(distance, key[1]) for distance, key in ranked[:k]]
+
+    def _closest_words(self, query: str, k: int, max_distance: int) -> Dict[int, int]:
+        """
+        Find the films with a title word close to a one-word query.
+
+        Args:
+            query: Normalized one-word query.
+            k: Number of films after which the radius shrinks.
+            max_distance: Largest edit distance of a match.
+
+        Returns:
+            Dict[int, int]: Smallest word distance per film; at least the k
+                closest films, ties included.
+        """
+        best: Dict[int, int] = {}
+        # Films found per distance, to shrink the radius to the k-th best distance
+        counts = [0] * (max_distance + 1)
+
+        def accept(term: str, distance: int) -> int:
+            for film_id in self.words.ids[term]:
+                previous = best.get(film_id)
+                if previous is not None and previous <= distance:
+                    continue
+                if previous is not None:
+                    counts[previous] -= 1
+                best[film_id] = distance
+                counts[distance] += 1
+            # Farther terms cannot enter the top k; terms at the k-th
+            # distance still can, by title order
+            found = 0
+            for radius, count in enumerate(counts):
+                found += count
+                if found >= k:
+                    return radius
+            return max_distance
+
+        self.words.nearest(query, max_distance, accept)
+        return best
+
+    def _closest_titles(self, query: str, max_distance: int) -> Dict[int, int]:
+        """
+        Find the films whose full title is close to a query.
+
+        Only titles of a length within max_distance of the query's and
+        containing one of max_distance + 1 disjoint pieces of the query near
+        its place in the query are compared (see the module docstring),
+        which finds every title within max_distance edits.
+
+        Args:
+            query: Normalized query.
+            max_distance: Largest edit distance of a match.
+
+        Returns:
+            Dict[int, int]: Title distance per matching film.
+        """
+        pieces = split_pieces(query, max_distance + 1)
+        masks, length = pattern_masks(query), len(query)
+        best: Dict[int, int] = {}
+        for size in range(length - max_distance, length + max_distance + 1):
+            if size not in self._titles:
+                continue
+            text, film_ids = self._titles[size]
+            if "" in pieces:
+                found = set(range(len(film_ids)))
+            else:
+                found = set()
+                start = 0
+                for piece in pieces:
+                    # An intact piece moved by max_distance characters at most
+                    low, high = max(start - max_distance, 0), start + max_distance
+                    offset = text.find(piece, low)
+                    while offset >= 0:
+                        position, column = divmod(offset, size + 1)
+                        line = position * (size + 1)
+                        if column < low:
+                            offset = text.find(piece, line + low)
+                            continue
+                        if column <= high:
+                            found.add(position)
+                        offset = text.find(piece, line + size + 1 + low)
+                    start += len(piece)
+            for position in found:
+                title = text[position * (size + 1):position * (size + 1) + size]
+                distance = edit_distance(masks, length, title, max_distance)
+                if distance <= max_distance:
+                    best[film_ids[position]] = distance
+        return best
@@ -0,0 +1,163 @@
+"""
+Load test of the HTTP/JSON service against local stand-in databases.
+
+Starts the service in-process on a free port over a seeded stand-in
+dataset (standins.py), or targets an already running service with --url,
+then sends random search, metadata and top-queries requests from
+concurrent clients and reports requests/sec, error count and
+p50/p95/p99 latency.
+
+Usage:
+    python loadtest.py [--scale 1] [--requests 2000] [--concurrency 16]
+                       [--workers 16] [--seed 42] [--url http://host:port]
+"""
+
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import benchmark
+import metrics
+import mongo_log
+import service
+import standins
+
+
+def request_paths(count: int, seed: int) -> List[str]:
+    """
+    Build a reproducible mix of request paths.
+
+    Mostly first-page searches of the four kinds, plus metadata and top queries.
+
+    Args:
+        count (int): Number of requests.
+        seed (int): Random seed.
+
+    Returns:
+        List[str]: Paths with query strings.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        kind = rng.choices(benchmark.BENCHMARK_SEARCHES + ["metadata", "top_queries"],
+                           weights=[3, 2, 3, 2, 1, 1])[0]
+        match kind:
+            case "metadata":
+                paths.append("/metadata")
+            case "top_queries":
+                paths.append("/top-queries?n=5")
+            case "search_by_genre_and_year":
+                genre, year_min, year_max = benchmark.search_params(kind, rng)
+                query = {"genre": genre, "year_min": year_min, "year_max": year_max}
+                paths.append(f"/search/genre_and_year?{urlencode(query)}")
+            case _:
+                text, = benchmark.search_params(kind, rng)
+                paths.append(f"/search/{kind.removeprefix('search_by_')}?{urlencode({'text': text})}")
+    return paths
+
+
+def fetch(url: str, timeout: float) -> Tuple[float, bool]:
+    """
+    Send one GET request.
+
+    Args:
+        url (str): Full URL.
+        timeout (float): Client timeout in seconds.
+
+    Returns:
+        Tuple[float, bool]: Latency in seconds and whether the request succeeded.
+    """
+    started = time.perf_counter()
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            json.load(response)
+            ok = response.status == 200
+    except (HTTPError, URLError, TimeoutError, ValueError):
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def run(base_url: str, paths: List[str], concurrency: int, timeout: float) -> Dict[str, Any]:
+    """
+    Send every request with concurrent clients.
+
+    Args:
+        base_url (str): Service URL, e.g. "http://127.0.0.1:8000".
+        paths (List[str]): Request paths.
+        concurrency (int): Number of concurrent clients.
+        timeout (float): Client timeout in seconds.
+
+    Returns:
+        Dict[str, Any]: requests, errors, seconds, requests_per_sec and the
+            latency summary of metrics.summarize.
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda path: fetch(base_url + path, timeout), paths))
+    seconds = time.perf_counter() - started
+    return {
+        "requests": len(results),
+        "errors": sum(not ok for _, ok in results),
+        "seconds": seconds,
+        "requests_per_sec": len(results) / seconds if seconds else 0.0,
+        **metrics.summarize([latency for latency, _ in results]),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Load test the HTTP/JSON search service.")
+    parser.add_argument("--scale", type=int, default=1, help="stand-in dataset scale factor")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--workers", type=int, default=16, help="service request workers")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout in seconds")
+    parser.add_argument("--url", help="target a running service instead of stand-ins")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the load test and print its results.
+
+    Returns:
+        int: Process exit code, 1 if any request failed.
+    """
+    args = parse_args(argv)
+    paths = request_paths(args.requests, args.seed)
+    if args.url:
+        result = run(args.url.rstrip("/"), paths, args.concurrency, args.timeout)
+    else:
+        uri = standins.generate_dataset(args.scale, args.seed)
+        with standins.installed(uri, standins.FakeMongoClient()):
+            server = service.create_service("127.0.0.1", 0, workers=args.workers)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                result = run(f"http://127.0.0.1:{server.server_port}", paths,
+                             args.concurrency, args.timeout)
+            finally:
+                server.shutdown()
+                server.server_close()
+                server.movie_db.pool.close()
+                mongo_log.close()
+
+    print(f"{result['requests']} requests, {result['errors']} errors in "
+          f"{result['seconds']:.2f} s: {result['requests_per_sec']:.1f} req/s, "
+          f"p50={result['p50_ms']:.2f} ms  p95={result['p95_ms']:.2f} ms  "
+          f"p99={result['p99_ms']:.2f} ms")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
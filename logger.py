@@ -1,21 +1,182 @@
 """
 Logger configuration module.
 
-Sets up basic logging to a file and provides a function to get
-module-specific logger instances with consistent formatting and encoding.
+Sets up non-blocking logging to a rotating file and provides a function to
+get module-specific logger instances with consistent formatting and encoding.
+
+- The root logger only puts records on an in-memory queue; a background
+  QueueListener thread formats them and writes them to settings.LOG_FILE,
+  so no caller waits for disk I/O.
+- Records are plain text or JSON lines (settings.LOG_FORMAT); JSON records
+  include fields passed with extra=, e.g. query timings.
+- The file is rotated by size or time (settings.LOG_ROTATION).
+- Levels can be set per module (settings.LOG_LEVELS).
+- Repeated DEBUG records are sampled (settings.LOG_DEBUG_SAMPLE_EVERY), so
+  debug logging overhead stays flat under batch or service load.
 """
 
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import settings
+
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s:%(lineno)d: %(message)s"
+
+# Attributes of every LogRecord; anything else was passed with extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "taskName",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+
+    Fields: time, level, logger, line, message, the formatted exception if
+    any, and every field passed with extra= (e.g. template, execute_ms, rows).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return the JSON line of a record."""
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keep only every n-th DEBUG record of each call site; other levels pass.
+
+    Counters are updated without a lock: a lost increment under contention
+    only shifts which record of a call site is kept.
+    """
+
+    def __init__(self, every: int) -> None:
+        """
+        Args:
+            every (int): Keep one DEBUG record out of this many per call site.
+        """
+        super().__init__()
+        self.every = max(every, 1)
+        self._seen: Counter = Counter()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Tell whether the record is kept."""
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        key: Tuple[str, int] = (record.pathname, record.lineno)
+        seen = self._seen[key]
+        self._seen[key] = seen + 1
+        return seen % self.every == 0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler leaving the formatting to the listener thread.
+
+    Only the message arguments are merged in the calling thread, since they
+    could change before the listener gets to the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message arguments and return the record to queue."""
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """
+    Parse per-module levels.
+
+    Args:
+        spec (str): Comma-separated "module=LEVEL" pairs, e.g. "db=DEBUG,pool=WARNING".
+
+    Returns:
+        Dict[str, str]: Level name per logger name.
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _file_handler() -> logging.Handler:
+    """Create the file handler for settings.LOG_FILE with the configured rotation."""
+    match settings.LOG_ROTATION:
+        case "size":
+            handler: logging.Handler = logging.handlers.RotatingFileHandler(
+                settings.LOG_FILE, maxBytes=settings.LOG_MAX_BYTES,
+                backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8", delay=True)
+        case "time":
+            handler = logging.handlers.TimedRotatingFileHandler(
+                settings.LOG_FILE, when=settings.LOG_ROTATE_WHEN,
+                backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8", delay=True)
+        case _:
+            handler = logging.FileHandler(settings.LOG_FILE, encoding="utf-8", delay=True)
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Configure the root logger (once): queue handler, listener thread, levels.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampler(settings.LOG_DEBUG_SAMPLE_EVERY))
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.addHandler(queue_handler)
+    for name, level in parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, _file_handler(),
+                                               respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """Write the queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 # Configure root logger (do this once in main entry point of the app)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s:%(lineno)d: %(message)s",
-    handlers=[
-        logging.FileHandler("app.log", encoding="utf-8"),
-    ]
-)
+setup_logging()
 
 # Optional: main app logger for generic logs
 logger = logging.getLogger("loggi_moviedb")
@@ -1,63 +1,90 @@
 """
 Main application module to manage movie search and logging functionality.
 
-- Establishes connections to MySQL and MongoDB databases on startup.
+- Opens connections to MySQL and MongoDB lazily, so the menu renders immediately.
 - Provides a command-line user interface (UI) for interacting with the movie database.
-- Allows searching movies by various criteria: name, actor, description, genre/year.
+- Allows searching movies by various criteria: name, actor, description, genre/year,
+  or any combination of them with a rental rate range.
 - Displays top 5 popular search queries from MongoDB logs.
 - Handles graceful exits, resource cleanup, and logs errors/information.
+
+Usage:
+    python main.py                    -- interactive movie search
+    python main.py rebuild-counters   -- backfill query rollups and counters from the raw search log
+    python main.py export KIND TEXT --out FILE [--format csv|jsonl] [--gzip]
+                                      -- stream all results of a search to a file
+    python main.py batch IN --out OUT [--workers N] [--log-searches]
+                                      -- run the JSON lines search requests of a file
+    python main.py serve [--host HOST] [--port PORT] [--workers N]
+                                      -- serve the searches as an HTTP/JSON service
+    python main.py build-snapshot [--out FILE]
+                                      -- write the catalog snapshot file (SEARCH_ENGINE=snapshot)
 """
 
+import argparse
+import threading
+import time
+from typing import Any, List, Optional
+
 import pymysql
 
+from connections import registry
+from pool import ConnectionPool
 import settings
+import batch
+import catalog_file
 import db
+import export
+import service
 import ui
 import logger
+import metrics
 import mongo_log
 
 
 logger = logger.get_logger(__name__)
 
 
-def main() -> None:
+def warm_up(mysql_pool: ConnectionPool) -> None:
     """
-    Main entry point of the application.
+    Open the first MySQL connections, reporting if MySQL is unreachable.
 
-    Establishes database connections, then enters a loop displaying the main menu.
-    Handles user choices to search movies or view top searches.
-    Manages cleanup of database connections on exit or error.
-    """
-    mysql_conn = settings.mysql_connection
-    if not mysql_conn or not mysql_conn.open:
-        ui.show_message("MySQL connection is not available.")
-        logger.error("MySQL connection is not available.")
-        return
+    Runs on a background thread so the menu renders without waiting for it.
 
-    mysql_cursor = None
+    Args:
+        mysql_pool (ConnectionPool): Pool to warm up.
+    """
     try:
-        mysql_cursor = mysql_conn.cursor()
-    except (pymysql.MySQLError, ui.UserExit) as e:
-        ui.show_message(f"Unexpected error: {e}")
-        logger.error("Unexpected error: %s", e)
-        return
+        mysql_pool.warm()
+    except ConnectionError as e:
+        ui.show_message("MySQL connection is not available.")
+        logger.error("MySQL connection is not available: %s", e)
 
-    mongo_client = settings.mongo_client
-    mongo_collection = settings.mongo_collection
-    if mongo_client is None or mongo_collection is None:
-        ui.show_message("MongoDB connection or collection is not available.")
-        logger.error("MongoDB connection or collection is not available.")
-        if mysql_cursor is not None:
-            mysql_cursor.close()
-        if mysql_conn is not None and mysql_conn.open:
-            mysql_conn.close()
-        return
 
+def main() -> None:
+    """
+    Main entry point of the application.
 
-    movie_db = db.MovieDB(mysql_conn, mysql_cursor)
+    Enters a loop displaying the main menu right away; database connections
+    are opened lazily (MySQL warms up in the background, MongoDB on first log write).
+    Handles user choices to search movies or view top searches.
+    Manages cleanup of database connections on exit or error.
+    """
+    started = time.perf_counter()
+    mysql_pool = registry.mysql_pool()
+    threading.Thread(target=warm_up, args=(mysql_pool,), name="mysql-warm-up",
+                     daemon=True).start()
+    movie_db = db.create_movie_db(mysql_pool)
 
     try:
         while True:
+            if started is not None:
+                startup_ms = (time.perf_counter() - started) * 1000
+                logger.info("Startup to first menu: %.1f ms", startup_ms)
+                if startup_ms > settings.STARTUP_BUDGET_MS:
+                    logger.warning("Startup exceeded budget of %d ms", settings.STARTUP_BUDGET_MS)
+                started = None
+
             choice = ui.show_menu()
 
             match choice:
@@ -68,8 +95,12 @@ def main() -> None:
                         ui.show_message("Returning to main menu...")
 
                 case 2:
-                    top_searches = mongo_log.get_top_5_queries(5)
-                    ui.show_top_searches(top_searches)
+                    window = ui.prompt_top_window()
+                    top_searches = mongo_log.get_top_queries(5, window)
+                    ui.show_top_searches(top_searches, ui.TOP_WINDOW_LABELS[window])
+
+                case 9:
+                    ui.show_stats(metrics.registry.snapshot())
 
                 case 0:
                     ui.show_message("Goodbye")
@@ -84,13 +115,10 @@ def main() -> None:
 
     finally:
         # Ensure all connections are closed properly on exit
-        if mysql_cursor is not None:
-            mysql_cursor.close()
-        if mysql_conn is not None and mysql_conn.open:
-            mysql_conn.close()
-        if mongo_client is not None:
-            mongo_client.close()
-        logger.info("All connections closed.")
+        mongo_log.close()
+        registry.close()
+        if settings.METRICS_DUMP_PATH:
+            metrics.registry.dump(settings.METRICS_DUMP_PATH)
 
 
 def handle_movie_search(movie_db: db.MovieDB) -> None:
@@ -115,35 +143,208 @@ def handle_movie_search(movie_db: db.MovieDB) -> None:
         match movie_choice:
             case 1:
                 name = ui.film_name()
-                ui.paginate_query(movie_db.search_film_by_name, name)
+                if not paginate_search(movie_db, "name", name):
+                    ui.show_suggestions(movie_db.suggest_titles(name).rows)
 
             case 2:
                 name = ui.actor_name()
                 if name is None:
                     raise ui.UserExit()
-                ui.paginate_query(movie_db.search_film_by_actor, name)
+                paginate_search(movie_db, "actor", name)
 
             case 3:
                 desc = ui.description_text()
                 if desc is None:
                     raise ui.UserExit()
-                ui.paginate_query(movie_db.search_film_by_description, desc)
+                paginate_search(movie_db, "description", desc)
 
             case 4:
-                genres = movie_db.query_all_genres()
-                genre = ui.prompt_genre_choice(genres)
+                catalog = movie_db.catalog()
+                genre = ui.prompt_genre_choice(catalog.genres, catalog.genre_counts)
 
-                year_min, year_max = movie_db.query_min_max_year()
-                ui.show_year_range(year_min, year_max)
+                ui.show_year_range(catalog.year_min, catalog.year_max)
 
-                min_year, max_year = ui.prompt_year_range(year_min, year_max)
+                min_year, max_year = ui.prompt_year_range(catalog.year_min, catalog.year_max)
                 if min_year is None or max_year is None:
                     raise ui.UserExit()
 
-                ui.paginate_query(movie_db.search_film_by_genre_and_year, genre, min_year, max_year)
+                paginate_search(movie_db, "genre_and_year", genre, min_year, max_year)
+
+            case 5:
+                criteria = ui.prompt_criteria()
+                paginate_search(movie_db, "criteria", criteria)
 
     except ui.UserExit:
         ui.show_message("Returning to previous menu...")
 
+
+def paginate_search(movie_db: db.MovieDB, kind: str, *args: Any) -> bool:
+    """
+    Page through a search, showing its total and letting the user jump to a page.
+
+    Args:
+        movie_db (db.MovieDB): The MovieDB instance running the search.
+        kind (str): "name", "actor", "description", "genre_and_year" or "criteria".
+        *args: Search arguments.
+
+    Returns:
+        bool: False if the search found nothing.
+    """
+    if kind == "criteria":
+        search = movie_db.search
+    else:
+        search = getattr(movie_db, f"search_film_by_{kind}")
+    return ui.paginate_query(search, *args,
+                             count=lambda: movie_db.count_matches(kind, args),
+                             seek=lambda number: movie_db.page_cursor(kind, args, number))
+
+
+def rebuild_counters() -> None:
+    """
+    Recompute the MongoDB hourly and daily query rollups from the raw search
+    log, then the query popularity counters from the daily rollups.
+    """
+    if registry.mongo_client() is None:
+        ui.show_message("MongoDB connection or collection is not available.")
+        return
+    try:
+        buckets = mongo_log.rebuild_rollups()
+        ui.show_message(f"Rollups rebuilt: {buckets} hourly and daily buckets.")
+        total = mongo_log.rebuild_counters()
+        ui.show_message(f"Counters rebuilt: {total} distinct queries.")
+    finally:
+        mongo_log.close()
+        registry.close()
+
+
+def export_results(args: argparse.Namespace) -> None:
+    """
+    Stream every result of a search to a CSV or JSON lines file.
+
+    Args:
+        args (argparse.Namespace): Parsed "export" command arguments.
+    """
+    movie_db = db.create_movie_db(registry.mysql_pool(), log_searches=False)
+    try:
+        if args.kind == "genre_and_year":
+            year_min, year_max = movie_db.query_min_max_year()
+            search_args = (args.text, args.year_min or year_min, args.year_max or year_max)
+        else:
+            search_args = (args.text,)
+        stats = export.export_search(movie_db, args.kind, search_args, args.out,
+                                     fmt=args.format, compress=args.gzip or None)
+        ui.show_message(f"Exported {stats.rows} rows to {args.out} in {stats.seconds:.2f} s "
+                        f"({stats.rows_per_sec:.0f} rows/s).")
+    except (pymysql.MySQLError, OSError) as e:
+        ui.show_message(f"Export failed: {e}")
+        logger.error("Export failed: %s", e)
+    finally:
+        registry.close()
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    """
+    Run the search requests of a JSON lines file and report throughput.
+
+    Args:
+        args (argparse.Namespace): Parsed "batch" command arguments.
+    """
+    try:
+        stats = batch.run_file(args.input, args.out, args.workers, args.log_searches)
+        ui.show_message(
+            f"{stats.requests} requests ({stats.errors} errors) in {stats.seconds:.2f} s "
+            f"({stats.requests_per_sec:.1f} req/s); latency p50={stats.latency['p50_ms']:.1f} ms "
+            f"p95={stats.latency['p95_ms']:.1f} ms p99={stats.latency['p99_ms']:.1f} ms. "
+            f"Results written to {args.out}."
+        )
+    except OSError as e:
+        ui.show_message(f"Batch failed: {e}")
+        logger.error("Batch failed: %s", e)
+    finally:
+        mongo_log.close()
+        registry.close()
+
+
+def build_snapshot(args: argparse.Namespace) -> None:
+    """
+    Write the catalog snapshot file from MySQL.
+
+    Args:
+        args (argparse.Namespace): Parsed "build-snapshot" command arguments.
+    """
+    started = time.perf_counter()
+    try:
+        snapshot = catalog_file.build_catalog_file(registry.mysql_pool(), args.out)
+        ui.show_message(f"Catalog snapshot written to {args.out}: {len(snapshot)} rows "
+                        f"in {time.perf_counter() - started:.2f} s.")
+    except (pymysql.MySQLError, ConnectionError, OSError) as e:
+        ui.show_message(f"Snapshot build failed: {e}")
+        logger.error("Snapshot build failed: %s", e)
+    finally:
+        registry.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+
+    Args:
+        argv (Optional[List[str]]): Arguments, defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: Parsed arguments; command is None for interactive mode.
+    """
+    parser = argparse.ArgumentParser(description="Movie search over the sakila database.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("rebuild-counters",
+                        help="backfill query counters from the raw search log")
+
+    export_parser = commands.add_parser("export",
+                                        help="stream all results of a search to a file")
+    export_parser.add_argument("kind", choices=["name", "actor", "description", "genre_and_year"])
+    export_parser.add_argument("text", help="title/actor/description text, or genre name")
+    export_parser.add_argument("--year-min", type=int, help="genre search: minimum release year")
+    export_parser.add_argument("--year-max", type=int, help="genre search: maximum release year")
+    export_parser.add_argument("--out", required=True,
+                               help="target file; *.gz is gzip-compressed")
+    export_parser.add_argument("--format", choices=export.FORMATS,
+                               help="csv or jsonl, guessed from --out by default")
+    export_parser.add_argument("--gzip", action="store_true", help="gzip the output")
+
+    batch_parser = commands.add_parser("batch",
+                                       help="run the JSON lines search requests of a file")
+    batch_parser.add_argument("input", help="file with one JSON search request per line")
+    batch_parser.add_argument("--out", required=True, help="JSON lines results file")
+    batch_parser.add_argument("--workers", type=int, default=settings.BATCH_WORKERS,
+                              help="worker threads and pooled MySQL connections")
+    batch_parser.add_argument("--log-searches", action="store_true",
+                              help="log first-page searches to MongoDB")
+
+    serve_parser = commands.add_parser("serve", help="serve the searches as an HTTP/JSON service")
+    serve_parser.add_argument("--host", default=settings.HTTP_HOST)
+    serve_parser.add_argument("--port", type=int, default=settings.HTTP_PORT)
+    serve_parser.add_argument("--workers", type=int, default=settings.HTTP_WORKERS,
+                              help="request worker threads")
+
+    snapshot_parser = commands.add_parser("build-snapshot",
+                                          help="write the catalog snapshot file")
+    snapshot_parser.add_argument("--out", default=settings.CATALOG_FILE_PATH,
+                                 help="target file, settings.CATALOG_FILE_PATH by default")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    match args.command:
+        case "rebuild-counters":
+            rebuild_counters()
+        case "export":
+            export_results(args)
+        case "batch":
+            run_batch(args)
+        case "serve":
+            service.serve(args.host, args.port, args.workers)
+        case "build-snapshot":
+            build_snapshot(args)
+        case _:
+            main()
@@ -0,0 +1,279 @@
+"""
+Low-overhead in-process metrics registry.
+
+Keeps counters and fixed-bucket latency histograms labelled by SQL
+template name, plus collectors that report gauges on demand (e.g. the
+search result cache statistics). The registry can be rendered as a dict,
+dumped as JSON, or written in the Prometheus text exposition format.
+
+Classes:
+    Histogram -- fixed-bucket histogram of durations in seconds.
+    MetricsRegistry -- counters, histograms and gauge collectors.
+
+Functions:
+- template_name(query: str) -> str
+- percentile(samples: List[float], pct: float) -> float
+- summarize(samples: List[float]) -> Dict[str, float]
+
+Attributes:
+    registry -- process-wide MetricsRegistry instance.
+"""
+
+
+import json
+import statistics
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+import sql_queries
+
+
+# Upper bounds of histogram buckets, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Templates from sql_queries, longest first so that prefix matching of
+# formatted templates ({ids} placeholders) picks the most specific one
+_TEMPLATES: List[Tuple[str, str]] = sorted(
+    ((name, value.split("{", 1)[0]) for name, value in vars(sql_queries).items()
+     if name.startswith("QUERY_") and isinstance(value, str)),
+    key=lambda item: len(item[1]), reverse=True,
+)
+
+
+@lru_cache(maxsize=512)
+def template_name(query: str) -> str:
+    """
+    Return the sql_queries constant name of a query, for metric labels.
+
+    Statements compiled by query_builder can start like (or equal) a
+    single-search template, so MovieDB passes their name explicitly.
+
+    Args:
+        query (str): Query text, possibly a formatted template.
+
+    Returns:
+        str: Template name such as "QUERY_FILM_BY_NAME", or "other".
+    """
+    for name, prefix in _TEMPLATES:
+        if query.startswith(prefix):
+            return name
+    return "other"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the pct-th percentile of samples (nearest-rank method).
+
+    Args:
+        samples (List[float]): Measured values.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: Percentile value.
+    """
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarize exact latencies measured in seconds.
+
+    Args:
+        samples (List[float]): Latency of each operation in seconds.
+
+    Returns:
+        Dict[str, float]: count, ops_per_sec (sequential) and mean/p50/p95/p99
+            latency in milliseconds.
+    """
+    if not samples:
+        return {"count": 0, "ops_per_sec": 0.0, "mean_ms": 0.0,
+                "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "ops_per_sec": len(samples) / total if total else 0.0,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+class Histogram:
+    """
+    Histogram of durations with fixed buckets.
+
+    Attributes:
+        counts (List[int]): Observations per bucket; the last one is +Inf.
+        total (float): Sum of observed values.
+        count (int): Number of observations.
+    """
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one value in seconds."""
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            q (float): Quantile between 0 and 1.
+
+        Returns:
+            float: Estimated value in seconds (inf if in the last bucket).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return count, sum, mean, estimated p50/p95/p99 and bucket counts."""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of labelled counters, histograms and gauge collectors.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._histograms: Dict[str, Dict[str, Histogram]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def inc(self, name: str, label: str, amount: int = 1) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Metric name, e.g. "query_errors_total".
+            label (str): Template name.
+            amount (int): Increment.
+        """
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[label] = counters.get(label, 0) + amount
+
+    def observe(self, name: str, label: str, seconds: float) -> None:
+        """
+        Record a duration in a histogram.
+
+        Args:
+            name (str): Metric name, e.g. "query_execute_seconds".
+            label (str): Template name.
+            seconds (float): Duration.
+        """
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            histogram = histograms.get(label)
+            if histogram is None:
+                histogram = histograms[label] = Histogram()
+            histogram.observe(seconds)
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """
+        Register a function reporting gauges when metrics are read.
+
+        Args:
+            name (str): Prefix of the reported gauges, e.g. "search_cache".
+            collect: Function returning {gauge: value}.
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    def reset(self) -> None:
+        """Forget every counter and histogram (collectors are kept)."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current values of all metrics.
+
+        Returns:
+            Dict[str, Any]: {"counters": {name: {label: value}},
+                "histograms": {name: {label: {...}}}, "gauges": {name: value}}.
+        """
+        with self._lock:
+            counters = {name: dict(values) for name, values in self._counters.items()}
+            histograms = {
+                name: {label: h.to_dict() for label, h in values.items()}
+                for name, values in self._histograms.items()
+            }
+            collectors = list(self._collectors.items())
+        gauges = {}
+        for prefix, collect in collectors:
+            for key, value in collect().items():
+                if isinstance(value, (int, float)):
+                    gauges[f"{prefix}_{key}"] = value
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def to_json(self) -> str:
+        """Render all metrics as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, values in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE moviedb_{name} counter")
+            for label, value in sorted(values.items()):
+                lines.append(f'moviedb_{name}{{template="{label}"}} {value}')
+        for name, values in sorted(snapshot["histograms"].items()):
+            lines.append(f"# TYPE moviedb_{name} histogram")
+            for label, h in sorted(values.items()):
+                cumulative = 0
+                for bound, count in h["buckets"].items():
+                    cumulative += count
+                    lines.append(
+                        f'moviedb_{name}_bucket{{template="{label}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'moviedb_{name}_sum{{template="{label}"}} {h["sum"]}')
+                lines.append(f'moviedb_{name}_count{{template="{label}"}} {h["count"]}')
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"# TYPE moviedb_{name} gauge")
+            lines.append(f"moviedb_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """
+        Write all metrics to a file: Prometheus text for *.prom, JSON otherwise.
+
+        Args:
+            path (str): Target file path.
+        """
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+registry = MetricsRegistry()
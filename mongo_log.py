@@ -3,53 +3,604 @@ Logs movie search queries to MongoDB and retrieves top queries.
 
 Features:
 - Log queries with type, string, and timestamp.
-- Fetch top N frequent queries.
-- Print formatted query statistics.
+- Write logs behind the user's back: documents are queued in-process and
+  written with insert_many by a background thread on size or time thresholds.
+- Maintain per-query popularity counters ($inc/$max upserts) next to the raw
+  log, so top N queries is an indexed sort-and-limit.
+- Roll the searches up the same way into hourly and daily buckets per query,
+  so that raw log documents can expire (TTL index) without losing counts.
+- Fetch top N frequent queries of the last hour, day, week or all time.
+- Rebuild the counters and the rollup buckets from the raw log.
 
-Depends on settings.mongo_collection and logging.
+Collections are obtained lazily from connections.registry, so importing
+this module or logging a search never waits for MongoDB.
 """
 
 
+import json
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from pymongo.errors import PyMongoError
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
 
+from connections import registry
 import settings
 
 
 logger = logging.getLogger(__name__)
-collection = settings.mongo_collection
+
+# Index backing the top N queries sort on the counters collection
+COUNTERS_INDEX = [("count", DESCENDING), ("last_query", DESCENDING)]
+
+# Unique index of the rollup buckets: upsert lookups and time range matches
+ROLLUP_INDEX = [("start", ASCENDING), ("query_type", ASCENDING), ("query_str", ASCENDING)]
+
+# Units of the rollup buckets
+ROLLUP_UNITS = ("hour", "day")
+
+# Windows of the top queries: their length and the rollup unit they are summed
+# from; "all" is served by the counters collection
+TOP_WINDOWS: Dict[str, Tuple[Optional[timedelta], Optional[str]]] = {
+    "hour": (timedelta(hours=1), "hour"),
+    "day": (timedelta(days=1), "hour"),
+    "week": (timedelta(weeks=1), "day"),
+    "all": (None, None),
+}
+
+# Server error raised by create_index when the index exists with other options
+INDEX_OPTIONS_CONFLICT = 85
+
+# Write error of a document whose _id is already in the collection
+DUPLICATE_KEY = 11000
+
+OVERFLOW_POLICIES = ("drop", "block", "spill")
+
+# Queue markers handled by the flusher thread
+_FLUSH = object()
+_STOP = object()
+
+
+class SearchLogWriter:
+    """
+    Bounded write-behind queue flushing search log documents with insert_many.
+
+    Attributes:
+        get_collection (Callable): Returns the target collection or None.
+        get_counters (Callable): Returns the counters collection or None.
+        get_rollup (Callable): Returns the rollup collection of a unit or None.
+        batch_size (int): Number of queued documents triggering a write.
+        flush_interval (float): Max seconds a document waits before being written.
+        overflow (str): Policy when the queue is full: "drop", "block" or "spill".
+        spill_path (str): JSON lines file receiving spilled documents.
+        dropped (int): Number of documents lost because of overflow or errors.
+    """
+
+    def __init__(self, get_collection: Callable[[], Optional[Collection]],
+                 get_counters: Callable[[], Optional[Collection]] = lambda: None,
+                 get_rollup: Callable[[str], Optional[Collection]] = lambda unit: None,
+                 batch_size: int = 100,
+                 flush_interval: float = 2.0,
+                 queue_size: int = 10000,
+                 overflow: str = "drop",
+                 spill_path: str = "search_log.spill.jsonl") -> None:
+        """
+        Create the queue and start the background flusher thread.
+
+        Args:
+            get_collection: Function returning the target collection or None.
+            get_counters: Function returning the counters collection or None.
+            get_rollup: Function returning the rollup collection of a unit
+                ("hour" or "day") or None.
+            batch_size: Number of queued documents triggering a write.
+            flush_interval: Max seconds a document waits before being written.
+            queue_size: Max number of queued documents.
+            overflow: Policy when the queue is full: "drop", "block" or "spill".
+            spill_path: JSON lines file receiving spilled documents.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.get_collection = get_collection
+        self.get_counters = get_counters
+        self.get_rollup = get_rollup
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._spill_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="mongo-log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, doc: Dict[str, Any]) -> None:
+        """
+        Queue a document for writing without waiting for MongoDB.
+
+        Args:
+            doc (Dict[str, Any]): Log document.
+        """
+        if self.overflow == "block":
+            self._queue.put(doc)
+            return
+        try:
+            self._queue.put_nowait(doc)
+        except queue.Full:
+            if self.overflow == "spill":
+                self._spill([doc])
+            else:
+                self.dropped += 1
+                logger.warning("MongoDB log queue is full — dropping log document")
+
+    def flush(self) -> None:
+        """Write every queued document and wait until it is done."""
+        if self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self) -> None:
+        """Flush queued documents and stop the flusher thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        logger.info("MongoDB log writer closed, dropped=%d", self.dropped)
+
+    def _run(self) -> None:
+        """Flusher thread: collect documents and write them in batches."""
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch or item is _FLUSH or item is _STOP:
+                try:
+                    self._write(batch)
+                except Exception:
+                    # e.g. the spill file cannot be written; keep the thread alive
+                    logger.exception("MongoDB log writer failed on %d documents", len(batch))
+                for _ in batch:
+                    self._queue.task_done()
+                batch = []
+                deadline = None
+            if item is _FLUSH or item is _STOP:
+                self._queue.task_done()
+            if item is _STOP:
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Insert a batch, then any previously spilled documents.
+
+        While MongoDB is unavailable new batches are only appended to the
+        spill file; it is read back once a batch was written again.
+        """
+        if not batch:
+            return
+        target = self.get_collection()
+        if target is None:
+            logger.warning("MongoDB: collection is None — cannot write %d logs", len(batch))
+            self._lose(batch)
+            return
+        if self._insert(target, batch):
+            spilled = self._take_spilled()
+            if spilled:
+                logger.info("Replaying %d spilled log documents", len(spilled))
+                self._insert(target, spilled)
+
+    def _insert(self, target: Collection, docs: List[Dict[str, Any]]) -> bool:
+        """
+        Insert documents and count the written ones; keep or drop the others.
+
+        Returns:
+            bool: False if MongoDB rejected the whole write (e.g. unreachable).
+        """
+        try:
+            target.insert_many(docs, ordered=False)
+            logger.info("Logs written to MongoDB: %d documents", len(docs))
+        except BulkWriteError as e:
+            written, failed = split_bulk_insert(docs, e.details)
+            logger.error("Some logs were not written to MongoDB: %d written, %d failed: %s",
+                         len(written), len(failed), e)
+            self._lose(failed)
+            docs = written
+        except PyMongoError as e:
+            logger.error("Some error happened: %s", e)
+            self._lose(docs)
+            return False
+        if docs:
+            self._update_counters(docs)
+            self._update_rollups(docs)
+        return True
+
+    def _update_counters(self, docs: List[Dict[str, Any]]) -> None:
+        """Add written documents to the popularity counters with one bulk write."""
+        target = self.get_counters()
+        if target is None:
+            return
+        try:
+            target.bulk_write(counter_updates(docs), ordered=False)
+        except PyMongoError as e:
+            # The raw log is already written; rebuild_counters() can repair the drift
+            logger.error("Error updating query counters: %s", e)
+
+    def _update_rollups(self, docs: List[Dict[str, Any]]) -> None:
+        """Add written documents to the hourly and daily buckets, one bulk write per unit."""
+        for unit in ROLLUP_UNITS:
+            target = self.get_rollup(unit)
+            if target is None:
+                continue
+            try:
+                target.bulk_write(rollup_updates(docs, unit), ordered=False)
+            except PyMongoError as e:
+                # rebuild_rollups() can repair the drift while the raw log is kept
+                logger.error("Error updating %sly query rollups: %s", unit, e)
+
+    def _lose(self, docs: List[Dict[str, Any]]) -> None:
+        """Keep unwritten documents on disk with the spill policy, drop them otherwise."""
+        if not docs:
+            return
+        if self.overflow == "spill":
+            self._spill(docs)
+        else:
+            self.dropped += len(docs)
+
+    def _spill(self, docs: List[Dict[str, Any]]) -> None:
+        """Append documents to the spill file."""
+        with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+            for doc in docs:
+                record = {k: v for k, v in doc.items() if k != "_id"}
+                record["timestamp"] = record["timestamp"].isoformat()
+                f.write(json.dumps(record) + "\n")
+        logger.warning("MongoDB log: spilled %d documents to %s", len(docs), self.spill_path)
+
+    def _take_spilled(self) -> List[Dict[str, Any]]:
+        """Read and remove spilled documents."""
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return []
+            with open(self.spill_path, encoding="utf-8") as f:
+                docs = [json.loads(line) for line in f if line.strip()]
+            os.remove(self.spill_path)
+        for doc in docs:
+            doc["timestamp"] = datetime.fromisoformat(doc["timestamp"])
+        return docs
+
+
+def split_bulk_insert(docs: List[Dict[str, Any]],
+                      details: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split the documents of an unordered insert_many that raised BulkWriteError.
+
+    Documents rejected as duplicate keys are already in the collection (and
+    were counted when they were first written), so they are in neither list.
+
+    Args:
+        docs (List[Dict[str, Any]]): Documents passed to insert_many.
+        details (Dict[str, Any]): BulkWriteError.details ("writeErrors").
+
+    Returns:
+        Tuple[List, List]: Documents that were inserted, and documents that failed.
+    """
+    errors = {error["index"]: error.get("code") for error in details.get("writeErrors", [])}
+    written = [doc for i, doc in enumerate(docs) if i not in errors]
+    failed = [docs[i] for i, code in sorted(errors.items()) if code != DUPLICATE_KEY]
+    return written, failed
+
+
+def bucket_start(timestamp: datetime, unit: str) -> datetime:
+    """
+    Return the start of the rollup bucket of a timestamp.
+
+    Args:
+        timestamp (datetime): Search time.
+        unit (str): "hour" or "day".
+
+    Returns:
+        datetime: Timestamp truncated to the hour or day.
+    """
+    if unit == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def _totals(docs: List[Dict[str, Any]],
+            key: Callable[[Dict[str, Any]], tuple]) -> Dict[tuple, List[Any]]:
+    """Return [count, last timestamp] of log documents per key."""
+    totals: Dict[tuple, List[Any]] = {}
+    for doc in docs:
+        total = totals.setdefault(key(doc), [0, doc["timestamp"]])
+        total[0] += 1
+        total[1] = max(total[1], doc["timestamp"])
+    return totals
+
+
+def counter_updates(docs: List[Dict[str, Any]]) -> List[UpdateOne]:
+    """
+    Build counter upserts for a batch of log documents.
+
+    Documents of the same query are merged into one $inc/$max update.
+
+    Args:
+        docs (List[Dict[str, Any]]): Log documents.
+
+    Returns:
+        List[UpdateOne]: One upsert per distinct (query_type, query_str).
+    """
+    totals = _totals(docs, lambda doc: (doc["query_type"], doc["query_str"]))
+    return [
+        UpdateOne(
+            {"_id": {"query_type": query_type, "query_str": query_str}},
+            {"$inc": {"count": count}, "$max": {"last_query": last_query}},
+            upsert=True,
+        )
+        for (query_type, query_str), (count, last_query) in totals.items()
+    ]
+
+
+def rollup_updates(docs: List[Dict[str, Any]], unit: str) -> List[UpdateOne]:
+    """
+    Build rollup bucket upserts for a batch of log documents.
+
+    Documents of the same query and bucket are merged into one $inc/$max update.
+
+    Args:
+        docs (List[Dict[str, Any]]): Log documents.
+        unit (str): "hour" or "day".
+
+    Returns:
+        List[UpdateOne]: One upsert per distinct (query_type, query_str, bucket start).
+    """
+    totals = _totals(docs, lambda doc: (doc["query_type"], doc["query_str"],
+                                        bucket_start(doc["timestamp"], unit)))
+    return [
+        UpdateOne(
+            {"start": start, "query_type": query_type, "query_str": query_str},
+            {"$inc": {"count": count}, "$max": {"last_query": last_query}},
+            upsert=True,
+        )
+        for (query_type, query_str, start), (count, last_query) in totals.items()
+    ]
+
+
+def ensure_indexes(counters: Collection) -> bool:
+    """
+    Create the index backing the top N queries sort on the counters collection.
+
+    Args:
+        counters (Collection): Counters collection.
+
+    Returns:
+        bool: True if the index exists.
+    """
+    try:
+        counters.create_index(COUNTERS_INDEX)
+        return True
+    except PyMongoError as e:
+        logger.error("Error creating counters index: %s", e)
+        return False
+
+
+def ensure_ttl_index(collection: Collection, field: str, days: int) -> bool:
+    """
+    Expire the documents of a collection days after a date field.
+
+    An existing TTL index with another lifetime is changed in place with
+    collMod. With days 0 nothing is created: a TTL index created before
+    has to be dropped by hand.
+
+    Args:
+        collection (Collection): Collection to expire.
+        field (str): Date field.
+        days (int): Lifetime of the documents, 0 to keep them.
+
+    Returns:
+        bool: True if the index is as configured.
+    """
+    if days <= 0:
+        return True
+    seconds = days * 24 * 3600
+    try:
+        try:
+            collection.create_index([(field, ASCENDING)], expireAfterSeconds=seconds)
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            collection.database.command("collMod", collection.name, index={
+                "keyPattern": {field: 1}, "expireAfterSeconds": seconds,
+            })
+            logger.info("TTL of %s.%s changed to %d days", collection.name, field, days)
+        return True
+    except PyMongoError as e:
+        logger.error("Error creating TTL index on %s.%s: %s", collection.name, field, e)
+        return False
+
+
+def ensure_rollup_indexes(rollup: Collection, unit: str) -> bool:
+    """
+    Create the unique bucket index of a rollup collection, and the TTL of hourly buckets.
+
+    Args:
+        rollup (Collection): Rollup collection.
+        unit (str): "hour" or "day".
+
+    Returns:
+        bool: True if the indexes exist.
+    """
+    try:
+        rollup.create_index(ROLLUP_INDEX, unique=True)
+    except PyMongoError as e:
+        logger.error("Error creating rollup index: %s", e)
+        return False
+    if unit == "hour":
+        return ensure_ttl_index(rollup, "start", settings.MONGO_HOURLY_RETENTION_DAYS)
+    return True
+
+
+# Names of the collections whose indexes were created
+_indexes_ready: Set[str] = set()
+
+
+def _with_indexes(collection: Optional[Collection],
+                  ensure: Callable[[Collection], bool]) -> Optional[Collection]:
+    """Return a collection, creating its indexes on first access."""
+    if collection is not None and collection.name not in _indexes_ready:
+        if ensure(collection):
+            _indexes_ready.add(collection.name)
+    return collection
+
+
+def get_counters() -> Optional[Collection]:
+    """
+    Return the counters collection, creating its index on first access.
+
+    Returns:
+        Optional[Collection]: Counters collection, or None if MongoDB is unavailable.
+    """
+    return _with_indexes(registry.mongo_counters(), ensure_indexes)
+
+
+def ensure_log_indexes(collection: Collection) -> bool:
+    """
+    Create the TTL index of the raw search log.
+
+    A log without rollups yet (e.g. written before they existed) is rolled
+    up first, so that the searches the index expires are kept in the buckets.
+
+    Log timestamps are naive local times, which MongoDB reads as UTC: raw
+    documents expire up to the UTC offset early or late.
+
+    Args:
+        collection (Collection): Search log collection.
+
+    Returns:
+        bool: True if the index is as configured.
+    """
+    daily = get_rollup("day")
+    if settings.MONGO_LOG_RETENTION_DAYS > 0 and daily is not None:
+        try:
+            if _is_empty(daily) and not _is_empty(collection):
+                logger.info("Rolling up the search log before enabling its retention")
+                if not _rebuild_rollups(collection):
+                    return False
+        except PyMongoError as e:
+            logger.error("Error checking the search log rollups: %s", e)
+            return False
+    return ensure_ttl_index(collection, "timestamp", settings.MONGO_LOG_RETENTION_DAYS)
+
+
+def _is_empty(collection: Collection) -> bool:
+    """Tell whether a collection has no document."""
+    return not list(collection.find().limit(1))
+
+
+def get_log_collection() -> Optional[Collection]:
+    """
+    Return the raw search log collection, creating its TTL index on first access.
+
+    Returns:
+        Optional[Collection]: Search log collection, or None if MongoDB is unavailable.
+    """
+    return _with_indexes(registry.mongo_collection(), ensure_log_indexes)
+
+
+def get_rollup(unit: str) -> Optional[Collection]:
+    """
+    Return the hourly or daily rollup collection, creating its indexes on first access.
+
+    Args:
+        unit (str): "hour" or "day".
+
+    Returns:
+        Optional[Collection]: Rollup collection, or None if MongoDB is unavailable.
+    """
+    return _with_indexes(registry.mongo_rollup(unit),
+                         lambda rollup: ensure_rollup_indexes(rollup, unit))
+
+
+_writer: Optional[SearchLogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> SearchLogWriter:
+    """
+    Return the process-wide search log writer, starting it on first use.
+
+    Returns:
+        SearchLogWriter: Writer configured from settings.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SearchLogWriter(
+                get_log_collection,
+                get_counters,
+                get_rollup,
+                batch_size=settings.MONGO_LOG_BATCH_SIZE,
+                flush_interval=settings.MONGO_LOG_FLUSH_INTERVAL,
+                queue_size=settings.MONGO_LOG_QUEUE_SIZE,
+                overflow=settings.MONGO_LOG_OVERFLOW,
+                spill_path=settings.MONGO_LOG_SPILL_PATH,
+            )
+        return _writer
 
 
 def log_create(query_type: str, query_str: str) -> None:
     """
-    Insert a log document into the MongoDB collection.
+    Queue a log document for the MongoDB collection.
+
+    The document is written in the background, so the caller never waits
+    for a MongoDB round trip.
 
     Args:
         query_type (str): The type/category of the query (e.g., 'film_name', 'actor').
         query_str (str): The query string that was searched.
     """
-    if collection is None:
-        logger.warning("MongoDB: collection is None — cannot write log")
-        return
-
     doc = {
         "query_type": query_type,
         "query_str": query_str,
         "timestamp": datetime.now()
     }
-    try:
-        collection.insert_one(doc)
-        logger.info("Log created for query_type=%s, query_str=%s", query_type, query_str)
-    except PyMongoError as e:
-        logger.error("Some error happened: %s", e)
+    get_writer().submit(doc)
+    logger.info("Log queued for query_type=%s, query_str=%s", query_type, query_str)
+
+
+def flush() -> None:
+    """Write every queued log document to MongoDB."""
+    if _writer is not None:
+        _writer.flush()
+
+
+def close() -> None:
+    """Flush queued log documents and stop the background writer."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
 
 
 def get_top_5_queries(n: int = 5) -> List[Dict[str, Any]]:
     """
-    Retrieve the top n most frequent queries from MongoDB logs, grouped by query type and string.
+    Retrieve the top n most frequent queries, grouped by query type and string.
+
+    Served from the maintained counters collection with an indexed sort and limit.
 
     Args:
         n (int): Number of top queries to retrieve. Defaults to 5.
@@ -60,22 +611,176 @@ def get_top_5_queries(n: int = 5) -> List[Dict[str, Any]]:
             - 'count': int (number of occurrences)
             - 'last_query': datetime (timestamp of last query)
     """
-    if collection is None:
+    counters = get_counters()
+    if counters is None:
         logger.warning("MongoDB is not connected — cannot get top queries")
         return []
 
+    # Make the user's own latest searches visible in the statistics
+    flush()
+
+    try:
+        return list(counters.find().sort(COUNTERS_INDEX).limit(n))
+    except PyMongoError as e:
+        logger.error("Error happened: %s", e)
+        return []
+
+
+def get_top_queries(n: int = 5, window: str = "all") -> List[Dict[str, Any]]:
+    """
+    Retrieve the top n most frequent queries of a time window.
+
+    The last hour and day are summed from the hourly buckets, the last week
+    from the daily buckets, all time from the counters. Whole buckets are
+    counted, so a window covers up to one bucket more than its length.
+
+    Args:
+        n (int): Number of top queries to retrieve.
+        window (str): "hour", "day", "week" or "all".
+
+    Raises:
+        ValueError: If the window is unknown.
+
+    Returns:
+        List[Dict[str, Any]]: Documents shaped like those of get_top_5_queries.
+    """
+    if window not in TOP_WINDOWS:
+        raise ValueError(f"Unknown top queries window: {window}")
+    length, unit = TOP_WINDOWS[window]
+    if unit is None:
+        return get_top_5_queries(n)
+    rollup = get_rollup(unit)
+    if rollup is None:
+        logger.warning("MongoDB is not connected — cannot get top queries")
+        return []
+
+    flush()
+
     pipeline = [
+        {"$match": {"start": {"$gte": bucket_start(datetime.now() - length, unit)}}},
         {"$group": {
             "_id": {"query_type": "$query_type", "query_str": "$query_str"},
-            "count": {"$sum": 1},
-            "last_query": {"$max": "$timestamp"}
+            "count": {"$sum": "$count"},
+            "last_query": {"$max": "$last_query"}
         }},
-        {"$sort": {"count": -1, "last_query": -1}},
-        {"$limit": n}
+        {"$sort": {"count": DESCENDING, "last_query": DESCENDING}},
+        {"$limit": n},
     ]
 
     try:
-        return list(collection.aggregate(pipeline))
+        return list(rollup.aggregate(pipeline))
     except PyMongoError as e:
         logger.error("Error happened: %s", e)
         return []
+
+
+def rebuild_counters() -> int:
+    """
+    Recompute the counters collection from the daily rollup buckets.
+
+    Used once to backfill counters for existing logs, or to repair them; the
+    daily buckets are kept when the raw log expires, so no search is lost.
+    Run rebuild_rollups() first to bring the buckets up to date.
+
+    Returns:
+        int: Number of counter documents, or 0 on error.
+    """
+    daily = get_rollup("day")
+    counters = get_counters()
+    if daily is None or counters is None:
+        logger.warning("MongoDB is not connected — cannot rebuild counters")
+        return 0
+
+    flush()
+
+    pipeline = [
+        {"$group": {
+            "_id": {"query_type": "$query_type", "query_str": "$query_str"},
+            "count": {"$sum": "$count"},
+            "last_query": {"$max": "$last_query"}
+        }},
+        {"$out": counters.name}
+    ]
+
+    try:
+        daily.aggregate(pipeline)
+        counters.create_index(COUNTERS_INDEX)
+        total = counters.count_documents({})
+        logger.info("Counters rebuilt: %d queries", total)
+        return total
+    except PyMongoError as e:
+        logger.error("Error rebuilding counters: %s", e)
+        return 0
+
+
+def rebuild_rollups() -> int:
+    """
+    Recompute the hourly and daily buckets covered by the raw search log.
+
+    Used once to backfill the buckets of existing logs, or to repair them.
+    Buckets older than the oldest raw log document are left as they are;
+    the bucket of that document loses the searches already expired.
+
+    Returns:
+        int: Number of rebuilt buckets, or 0 on error.
+    """
+    collection = get_log_collection()
+    if collection is None:
+        logger.warning("MongoDB is not connected — cannot rebuild rollups")
+        return 0
+
+    flush()
+
+    try:
+        total = _rebuild_rollups(collection)
+    except PyMongoError as e:
+        logger.error("Error rebuilding rollups: %s", e)
+        return 0
+    logger.info("Rollups rebuilt: %d buckets", total)
+    return total
+
+
+def _rebuild_rollups(collection: Collection) -> int:
+    """
+    Recompute the buckets of the raw log documents with one aggregation per unit.
+
+    The oldest bucket is kept when it already exists, as expired events may be
+    missing from it. Does not flush the log writer, whose thread may be the caller.
+
+    Args:
+        collection (Collection): Search log collection.
+
+    Raises:
+        PyMongoError: If a collection cannot be read or written.
+
+    Returns:
+        int: Number of rebuilt buckets, 0 if the log or a rollup collection is unavailable.
+    """
+    oldest = list(collection.find().sort([("timestamp", ASCENDING)]).limit(1))
+    if not oldest:
+        return 0
+    total = 0
+    for unit in ROLLUP_UNITS:
+        rollup = get_rollup(unit)
+        if rollup is None:
+            return 0
+        since = bucket_start(oldest[0]["timestamp"], unit)
+        if list(rollup.find({"start": since}).limit(1)):
+            # the TTL index may have removed part of the oldest bucket's events
+            since += timedelta(**{f"{unit}s": 1})
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": since}}},
+            {"$group": {
+                "_id": {"start": {"$dateTrunc": {"date": "$timestamp", "unit": unit}},
+                        "query_type": "$query_type", "query_str": "$query_str"},
+                "count": {"$sum": 1},
+                "last_query": {"$max": "$timestamp"}
+            }},
+            {"$project": {"_id": 0, "start": "$_id.start", "query_type": "$_id.query_type",
+                          "query_str": "$_id.query_str", "count": 1, "last_query": 1}},
+            {"$merge": {"into": rollup.name, "on": ["start", "query_type", "query_str"],
+                        "whenMatched": "replace", "whenNotMatched": "insert"}},
+        ]
+        collection.aggregate(pipeline)
+        total += rollup.count_documents({"start": {"$gte": since}})
+    return total
@@ -0,0 +1,158 @@
+"""
+Keyset (seek) pagination helpers for film searches.
+
+Instead of LIMIT/OFFSET, every search page remembers the sort key of the
+last row it returned and the next page starts strictly after it. The
+position is handed to callers as an opaque, URL-safe cursor string.
+
+Classes:
+    Page -- one page of search results plus the cursor of the next page.
+
+Functions:
+- encode_cursor(*key) -> str
+- decode_cursor(cursor, size) -> Tuple[Any, ...]
+- make_page(rows, limit, key_func) -> Page
+- page_count(total, limit) -> int
+"""
+
+
+import base64
+import json
+import sys
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from exceptions import InvalidCursor
+
+
+class Page(NamedTuple):
+    """
+    One page of search results.
+
+    Attributes:
+        rows (List[Tuple]): Rows of the current page.
+        next_cursor (Optional[str]): Cursor of the following page,
+            or None when this is the last page.
+    """
+    rows: List[Tuple]
+    next_cursor: Optional[str]
+
+
+def title_key(row: Tuple) -> Tuple[str, int]:
+    """
+    Return the (title, film_id) sort key of a film result row.
+
+    Args:
+        row (Tuple): Film row as returned by the search queries.
+
+    Returns:
+        Tuple[str, int]: Sort key used by the keyset queries.
+    """
+    return row[1], row[0]
+
+
+# Sort key of the "virtual" row located before the first film
+FIRST_TITLE_KEY = ("", 0)
+
+
+def relevance_key(row: Tuple) -> Tuple[float, int]:
+    """
+    Return the (score, film_id) sort key of a relevance-ranked result row.
+
+    Args:
+        row (Tuple): Film row followed by its relevance score.
+
+    Returns:
+        Tuple[float, int]: Sort key used by the FULLTEXT keyset query
+            (score descending, film_id ascending).
+    """
+    return float(row[7]), row[0]
+
+
+# Relevance key of the "virtual" row ranked before the best match
+FIRST_SCORE_KEY = (sys.float_info.max, 0)
+
+
+def encode_cursor(*key: Any) -> str:
+    """
+    Encode the sort key of the last seen row into an opaque cursor.
+
+    Args:
+        *key: Sort key values, e.g. title and film_id of the last row.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int = 2,
+                  sort_types: Tuple[type, ...] = (str,)) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Cursors come from clients, so the type of every key value is checked:
+    the sort values (title, or score) must be of sort_types and the last
+    value must be a film_id, an int.
+
+    Args:
+        cursor (str): Cursor string.
+        size (int): Expected number of key values.
+        sort_types (Tuple[type, ...]): Accepted types of the values before the
+            film_id, e.g. (str, int, float) for a title or a relevance score.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or has a wrong shape or type.
+
+    Returns:
+        Tuple[Any, ...]: Sort key values of the last seen row.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor(f"Malformed cursor: {cursor!r}") from e
+    if not isinstance(key, list) or len(key) != size:
+        raise InvalidCursor(f"Unexpected cursor shape: {cursor!r}")
+    # bool is an int subclass, but no sort key
+    if any(isinstance(value, bool) for value in key) \
+            or not all(isinstance(value, sort_types) for value in key[:-1]) \
+            or not isinstance(key[-1], int):
+        raise InvalidCursor(f"Unexpected cursor values: {cursor!r}")
+    return tuple(key)
+
+
+def make_page(rows: List[Tuple], limit: int,
+              key_func: Callable[[Tuple], Tuple[Any, ...]] = title_key) -> Page:
+    """
+    Build a Page from rows fetched with a LIMIT of limit + 1.
+
+    The extra row only tells whether another page exists; it is dropped.
+
+    Args:
+        rows (List[Tuple]): Up to limit + 1 fetched rows.
+        limit (int): Page size.
+        key_func (Callable): Function returning the sort key of a row.
+
+    Returns:
+        Page: Rows of the page and the cursor of the next one.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return Page(rows, None)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor(*key_func(rows[-1])))
+
+
+def page_count(total: int, limit: int) -> int:
+    """
+    Return the number of pages of a search.
+
+    Args:
+        total (int): Number of results.
+        limit (int): Page size.
+
+    Returns:
+        int: Number of pages; a search without results has one empty page.
+    """
+    return max(-(-total // limit), 1)
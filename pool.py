@@ -0,0 +1,251 @@
+"""
+Bounded, thread-safe MySQL connection pool.
+
+Connections are opened lazily through a factory, borrowed for a single
+query and returned afterwards, so several threads can run searches in
+parallel over a small, reused set of connections.
+
+Features:
+- min/max pool size; connections above min_size are closed after idle_timeout.
+- ping-on-checkout, so connections dropped by the server are replaced transparently.
+- max_lifetime, after which a connection is recycled.
+- checkout timeout when all max_size connections are in use.
+
+Classes:
+    ConnectionPool -- pool of pymysql connections.
+"""
+
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import pymysql
+from pymysql.connections import Connection
+
+from exceptions import PoolTimeout
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ConnectionPool:
+    """
+    Pool of MySQL connections borrowed per use.
+
+    Attributes:
+        factory (Callable[[], Connection]): Function opening a new connection.
+        min_size (int): Number of idle connections kept open.
+        max_size (int): Max number of open connections.
+        idle_timeout (float): Seconds after which extra idle connections are closed.
+        max_lifetime (float): Seconds after which a connection is recycled.
+        checkout_timeout (float): Seconds to wait for a free connection.
+    """
+
+    def __init__(self, factory: Callable[[], Connection],
+                 min_size: int = 1,
+                 max_size: int = 5,
+                 idle_timeout: float = 300,
+                 max_lifetime: float = 3600,
+                 checkout_timeout: float = 10) -> None:
+        """
+        Create an empty pool; no connection is opened until first use.
+
+        Args:
+            factory: Function opening a new connection, raising ConnectionError on failure.
+            min_size: Number of idle connections kept open.
+            max_size: Max number of open connections.
+            idle_timeout: Seconds after which extra idle connections are closed.
+            max_lifetime: Seconds after which a connection is recycled.
+            checkout_timeout: Seconds to wait for a free connection.
+        """
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        # idle connections as (connection, last_used); most recently used on the right
+        self._idle: Deque[Tuple[Connection, float]] = deque()
+        self._created: Dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """Number of currently open connections (idle and borrowed)."""
+        return self._size
+
+    def _open(self) -> Connection:
+        """Open a new connection; the slot must already be reserved in _size."""
+        try:
+            conn = self.factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._created[id(conn)] = time.monotonic()
+        logger.debug("Pool: opened connection, size=%d", self._size)
+        return conn
+
+    def _close(self, conn: Connection) -> None:
+        """Close a connection whose slot is already freed or about to be."""
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except pymysql.Error:
+            pass
+
+    def _discard(self, conn: Connection) -> None:
+        """Close a connection and free its slot."""
+        self._close(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        logger.debug("Pool: discarded connection, size=%d", self._size)
+
+    def _expired(self, conn: Connection, last_used: float, now: float) -> bool:
+        """Tell whether an idle connection must be closed instead of reused."""
+        if now - self._created.get(id(conn), now) > self.max_lifetime:
+            return True
+        return now - last_used > self.idle_timeout and self._size > self.min_size
+
+    def _prune_idle(self) -> None:
+        """
+        Close the extra connections left idle longer than idle_timeout.
+
+        acquire() reuses the most recently used connection, so under steady
+        light traffic the least recently used ones on the left of the idle
+        list would otherwise never be looked at.
+        """
+        now = time.monotonic()
+        stale = []
+        with self._cond:
+            while (self._idle and self._size > self.min_size
+                   and now - self._idle[0][1] > self.idle_timeout):
+                stale.append(self._idle.popleft()[0])
+                self._size -= 1
+        for conn in stale:
+            self._close(conn)
+        if stale:
+            logger.debug("Pool: closed %d idle connections, size=%d", len(stale), self._size)
+
+    def _healthy(self, conn: Connection) -> bool:
+        """Ping a connection taken from the idle list."""
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except pymysql.Error as e:
+            logger.warning("Pool: dropping dead connection: %s", e)
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> Connection:
+        """
+        Borrow a connection, opening a new one if none is idle.
+
+        Args:
+            timeout: Seconds to wait for a free connection, defaults to checkout_timeout.
+
+        Raises:
+            PoolTimeout: If no connection became free in time.
+            ConnectionError: If a new connection cannot be opened.
+
+        Returns:
+            Connection: Open, pinged connection; give it back with release().
+        """
+        self._prune_idle()
+        deadline = time.monotonic() + (self.checkout_timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise ConnectionError("Connection pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"No free connection after waiting, pool size={self.max_size}"
+                        )
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    self._size += 1
+                    conn = None
+
+            if conn is None:
+                return self._open()
+            if self._expired(conn, last_used, time.monotonic()) or not self._healthy(conn):
+                self._discard(conn)
+                continue
+            return conn
+
+    def release(self, conn: Connection, discard: bool = False) -> None:
+        """
+        Give a borrowed connection back to the pool.
+
+        Args:
+            conn: Connection returned by acquire().
+            discard: Close the connection instead of reusing it.
+        """
+        if discard or self._closed or not conn.open:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        self._prune_idle()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Connection]:
+        """
+        Borrow a connection for the duration of a with block.
+
+        Connections that failed with an operational error are discarded.
+
+        Args:
+            timeout: Seconds to wait for a free connection.
+
+        Yields:
+            Connection: Borrowed connection.
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except (pymysql.OperationalError, pymysql.InterfaceError):
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def warm(self) -> None:
+        """
+        Open connections until min_size of them are idle (at least one).
+
+        Raises:
+            ConnectionError: If a connection cannot be opened.
+        """
+        conns = [self.acquire() for _ in range(max(self.min_size, 1))]
+        for conn in conns:
+            self.release(conn)
+        logger.info("Pool warmed up, size=%d", self._size)
+
+    def close(self) -> None:
+        """Close all idle connections; borrowed ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+        logger.info("Pool closed")
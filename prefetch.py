@@ -0,0 +1,160 @@
+"""
+Speculative prefetch of the next result pages.
+
+While a page is displayed, the following pages are fetched on a background
+thread, which borrows its own pooled connection through the search
+function. Pages chain by cursor: each prefetch starts from the cursor of
+the page fetched before it. When the requested page is the one expected,
+it is handed over as soon as its fetch completes (usually instantly);
+otherwise prefetched pages are discarded and the page is fetched directly.
+The first page is kept, so going back to it neither re-runs nor re-logs
+the search.
+
+Classes:
+    PagePrefetcher -- fetches up to depth pages ahead of the displayed one.
+"""
+
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Optional, Tuple, Union
+
+from logger import get_logger
+from pagination import Page
+
+
+logger = get_logger(__name__)
+
+
+class PagePrefetcher:
+    """
+    Fetch pages of one search ahead of the user.
+
+    Use as a context manager, or call close(), so that pages still queued
+    are discarded when the user leaves the results.
+
+    Attributes:
+        depth (int): Number of pages fetched ahead; 0 disables prefetching.
+    """
+
+    def __init__(self, search_func: Callable[..., Page], args: Tuple[Any, ...],
+                 depth: int) -> None:
+        """
+        Args:
+            search_func: Search function accepting args and a cursor.
+            args: Search arguments excluding the cursor.
+            depth: Number of pages fetched ahead.
+        """
+        self.depth = depth
+        self._search_func = search_func
+        self._args = args
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque[Future] = deque()
+        self._tail: Union[Page, Future, None] = None
+        self._next_cursor: Optional[str] = None
+        self._first: Optional[Page] = None
+        self._closed = False
+
+    def __enter__(self) -> "PagePrefetcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def get(self, cursor: Optional[str]) -> Page:
+        """
+        Return the page at cursor and start prefetching the pages after it.
+
+        Args:
+            cursor: Cursor of the requested page, None for the first page.
+
+        Returns:
+            Requested Page.
+        """
+        if self._pending and cursor is not None and cursor == self._next_cursor:
+            page = self._pending.popleft().result()
+            logger.debug("Prefetched page handed over, %d still queued", len(self._pending))
+        elif cursor is None and self._first is not None:
+            self._discard()
+            page = self._tail = self._first
+        else:
+            self._discard()
+            page = self._search_func(*self._args, cursor)
+            self._tail = page
+            if cursor is None:
+                self._first = page
+        self._next_cursor = page.next_cursor
+        self._fill()
+        return page
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run another call for the same search, e.g. its count, on the prefetch thread.
+
+        The call runs before the fetches queued after it, and is cancelled
+        by close() if it has not started.
+
+        Args:
+            func: Function to call.
+            *args: Arguments of func.
+
+        Returns:
+            Future of the result of func.
+        """
+        return self._started_executor().submit(func, *args)
+
+    def close(self) -> None:
+        """Discard queued pages and stop the background thread."""
+        self._closed = True
+        self._discard()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _fill(self) -> None:
+        """Queue fetches until depth pages are pending or the last page is reached."""
+        if self.depth <= 0 or self._closed:
+            return
+        executor = self._started_executor()
+        while len(self._pending) < self.depth and not self._at_end():
+            self._tail = executor.submit(self._fetch_after, self._tail)
+            self._pending.append(self._tail)
+
+    def _started_executor(self) -> ThreadPoolExecutor:
+        """Return the single worker running the background calls, started on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        return self._executor
+
+    def _at_end(self) -> bool:
+        """Tell whether the last queued or fetched page is known to be the last one."""
+        tail = self._tail
+        if isinstance(tail, Future):
+            if not tail.done() or tail.cancelled() or tail.exception() is not None:
+                return False
+            tail = tail.result()
+        return tail is None or tail.next_cursor is None
+
+    def _fetch_after(self, previous: Union[Page, Future, None]) -> Optional[Page]:
+        """
+        Fetch the page following previous (runs on the prefetch thread).
+
+        The single worker runs fetches in order, so a previous future is
+        always complete here.
+
+        Args:
+            previous: Page, or future of the page, preceding the one to fetch.
+
+        Returns:
+            Next Page, or None if previous was the last page or prefetching stopped.
+        """
+        page = previous.result() if isinstance(previous, Future) else previous
+        if self._closed or page is None or page.next_cursor is None:
+            return None
+        return self._search_func(*self._args, page.next_cursor)
+
+    def _discard(self) -> None:
+        """Cancel queued fetches; a fetch already running completes unused."""
+        while self._pending:
+            self._pending.popleft().cancel()
+        self._tail = None
@@ -0,0 +1,270 @@
+"""
+Query builder for multi-criteria film searches.
+
+Combines any subset of title, actor, description, genre, release year
+range and rental rate filters into one parameterized, keyset-paginated
+statement, so a combined search costs a single round trip. Counts and
+page keys of the same filters only join the tables the filters read. Predicates are
+emitted in a fixed order, most selective indexed filter first, and the
+compiled SQL is cached per criteria shape (which filters are set and how
+many actor ids they resolved to), so repeated searches only rebind
+parameters.
+
+Classes:
+    SearchCriteria -- optional filters of a combined search.
+
+Functions:
+- compile_search(shape: Tuple[str, ...], actor_count: int) -> str
+- build_search(criteria, actor_ids) -> Tuple[str, Tuple[Any, ...]]
+- compile_filtered(template: str, shape: Tuple[str, ...], actor_count: int) -> str
+- build_count(criteria, actor_ids) -> Tuple[str, Tuple[Any, ...]]
+- build_keys_at(criteria, actor_ids) -> Tuple[str, Tuple[Any, ...]]
+- criteria_for(kind: str, args: Tuple[Any, ...]) -> SearchCriteria
+- like_pattern(text: str) -> str
+"""
+
+
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+import sql_queries
+
+
+# Filter predicates, in the order they are emitted: film_actor and category
+# lookups go through indexes and keep few films, title LIKE can still scan
+# idx_title, ranges on release_year and rental_rate are unindexed, and
+# description LIKE reads the longest column so it is evaluated last.
+PREDICATES = {
+    "actor": "f.film_id IN (SELECT film_id FROM film_actor WHERE actor_id IN ({ids}))",
+    "genre": "c.name LIKE %s",
+    "title": "f.title LIKE %s",
+    "year_min": "f.release_year >= %s",
+    "year_max": "f.release_year <= %s",
+    "rate_min": "f.rental_rate >= %s",
+    "rate_max": "f.rental_rate <= %s",
+    "description": "f.description LIKE %s",
+}
+
+# Filters matched as substrings with LIKE '%...%'
+LIKE_FILTERS = ("genre", "title", "description")
+
+# Escapes of the LIKE wildcards and of the escape character itself (MySQL's
+# default, backslash), so that search text is matched literally, as the
+# trigram index and the catalog snapshot file do
+LIKE_ESCAPES = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
+# Joins needed by a filter of the count and page key queries; the other
+# filters only read film (actor goes through a film_actor subquery)
+FILTER_JOINS = {
+    "genre": "JOIN film_category AS fc ON f.film_id = fc.film_id\n"
+             "JOIN category AS c ON fc.category_id = c.category_id\n",
+}
+
+
+class SearchCriteria(NamedTuple):
+    """
+    Filters of a combined search; None means "not filtered".
+
+    Attributes:
+        title (Optional[str]): Part of the title.
+        actor (Optional[str]): Part of an actor name.
+        description (Optional[str]): Part of the description.
+        genre (Optional[str]): Part of the genre name.
+        year_min (Optional[int]): Minimum release year.
+        year_max (Optional[int]): Maximum release year.
+        rate_min (Optional[float]): Minimum rental rate.
+        rate_max (Optional[float]): Maximum rental rate.
+    """
+    title: Optional[str] = None
+    actor: Optional[str] = None
+    description: Optional[str] = None
+    genre: Optional[str] = None
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    rate_min: Optional[float] = None
+    rate_max: Optional[float] = None
+
+    def shape(self) -> Tuple[str, ...]:
+        """Return the names of the set filters, in predicate order."""
+        return tuple(name for name in PREDICATES if getattr(self, name) is not None)
+
+    def normalized(self) -> "SearchCriteria":
+        """Return the criteria with text filters case-folded (for cache keys)."""
+        return self._replace(**{
+            name: getattr(self, name).lower() for name in ("title", "actor", "description", "genre")
+            if getattr(self, name) is not None
+        })
+
+    def describe(self) -> str:
+        """Return a short human-readable form, e.g. "title=ace genre=comedy year=2000-2006"."""
+        parts = [f"{name}={getattr(self, name)}"
+                 for name in ("title", "actor", "description", "genre")
+                 if getattr(self, name) is not None]
+        for name, low, high in (("year", self.year_min, self.year_max),
+                                ("rate", self.rate_min, self.rate_max)):
+            if low is not None or high is not None:
+                parts.append(f"{name}={'' if low is None else low}-{'' if high is None else high}")
+        return " ".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_search(shape: Tuple[str, ...], actor_count: int) -> str:
+    """
+    Compile the keyset search statement of a criteria shape.
+
+    Args:
+        shape (Tuple[str, ...]): Names of the set filters (SearchCriteria.shape()).
+        actor_count (int): Number of actor id placeholders of the actor filter.
+
+    Returns:
+        str: Query whose parameters are the filter parameters in shape order,
+            then last title, last title, last film_id, limit.
+    """
+    filters = []
+    for name in shape:
+        predicate = PREDICATES[name]
+        if name == "actor":
+            predicate = predicate.format(ids=", ".join(["%s"] * actor_count))
+        filters.append(f"{predicate}\n    AND ")
+    return sql_queries.QUERY_FILM_SEARCH.format(filters="".join(filters))
+
+
+def like_pattern(text: str) -> str:
+    """
+    Return the LIKE pattern matching a text as a literal substring.
+
+    Args:
+        text (str): Searched text; "%", "_" and "\\" in it are not wildcards.
+
+    Returns:
+        str: Escaped text between "%" wildcards.
+    """
+    return f"%{text.translate(LIKE_ESCAPES)}%"
+
+
+def _filter_params(criteria: SearchCriteria, shape: Tuple[str, ...],
+                   actor_ids: Optional[List[int]]) -> Tuple[Any, ...]:
+    """Return the parameters of the filters of a shape, in shape order."""
+    params: List[Any] = []
+    for name in shape:
+        if name == "actor":
+            params.extend(actor_ids)
+        elif name in LIKE_FILTERS:
+            params.append(like_pattern(getattr(criteria, name)))
+        else:
+            params.append(getattr(criteria, name))
+    return tuple(params)
+
+
+def build_search(criteria: SearchCriteria,
+                 actor_ids: Optional[List[int]] = None) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Build the search statement and filter parameters of criteria.
+
+    Args:
+        criteria (SearchCriteria): Filters of the search.
+        actor_ids (Optional[List[int]]): Ids the actor filter resolved to;
+            required (and non-empty) when criteria.actor is set.
+
+    Returns:
+        Tuple[str, Tuple[Any, ...]]: (query, filter_params); the keyset
+            parameters are appended by the caller.
+    """
+    shape = criteria.shape()
+    return (compile_search(shape, len(actor_ids or ())),
+            _filter_params(criteria, shape, actor_ids))
+
+
+@lru_cache(maxsize=256)
+def compile_filtered(template: str, shape: Tuple[str, ...], actor_count: int) -> str:
+    """
+    Compile a count or page key statement of a criteria shape.
+
+    Unlike the search statement, only the tables read by the filters are
+    joined: no cast or genre is fetched for the rows.
+
+    Args:
+        template (str): sql_queries.QUERY_FILM_COUNT or QUERY_FILM_KEYS_AT.
+        shape (Tuple[str, ...]): Names of the set filters (SearchCriteria.shape()).
+        actor_count (int): Number of actor id placeholders of the actor filter.
+
+    Returns:
+        str: Query whose first parameters are the filter parameters in shape order.
+    """
+    joins, filters = [], []
+    for name in shape:
+        predicate = PREDICATES[name]
+        if name == "actor":
+            predicate = predicate.format(ids=", ".join(["%s"] * actor_count))
+        if name in FILTER_JOINS:
+            joins.append(FILTER_JOINS[name])
+        filters.append(predicate)
+    return template.format(joins="".join(joins), filters="\n    AND ".join(filters) or "TRUE")
+
+
+def build_count(criteria: SearchCriteria,
+                actor_ids: Optional[List[int]] = None) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Build the statement counting the films matching criteria.
+
+    Args:
+        criteria (SearchCriteria): Filters of the search.
+        actor_ids (Optional[List[int]]): Ids the actor filter resolved to;
+            required (and non-empty) when criteria.actor is set.
+
+    Returns:
+        Tuple[str, Tuple[Any, ...]]: (query, params).
+    """
+    shape = criteria.shape()
+    return (compile_filtered(sql_queries.QUERY_FILM_COUNT, shape, len(actor_ids or ())),
+            _filter_params(criteria, shape, actor_ids))
+
+
+def build_keys_at(criteria: SearchCriteria,
+                  actor_ids: Optional[List[int]] = None) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Build the statement returning the (title, film_id) keys at an offset of a search.
+
+    Args:
+        criteria (SearchCriteria): Filters of the search.
+        actor_ids (Optional[List[int]]): Ids the actor filter resolved to;
+            required (and non-empty) when criteria.actor is set.
+
+    Returns:
+        Tuple[str, Tuple[Any, ...]]: (query, filter_params); the offset is
+            appended by the caller.
+    """
+    shape = criteria.shape()
+    return (compile_filtered(sql_queries.QUERY_FILM_KEYS_AT, shape, len(actor_ids or ())),
+            _filter_params(criteria, shape, actor_ids))
+
+
+def criteria_for(kind: str, args: Tuple[Any, ...]) -> SearchCriteria:
+    """
+    Return the combined search criteria equivalent to a single search.
+
+    Args:
+        kind (str): "name", "actor", "description", "genre_and_year", or
+            "criteria" for a combined search.
+        args (Tuple[Any, ...]): Search arguments, e.g. (genre, year_min, year_max),
+            or (SearchCriteria,).
+
+    Raises:
+        ValueError: If the kind is unknown.
+
+    Returns:
+        SearchCriteria: Filters of the search.
+    """
+    match kind:
+        case "criteria":
+            return args[0]
+        case "name":
+            return SearchCriteria(title=args[0])
+        case "actor":
+            return SearchCriteria(actor=args[0])
+        case "description":
+            return SearchCriteria(description=args[0])
+        case "genre_and_year":
+            genre, year_min, year_max = args
+            return SearchCriteria(genre=genre, year_min=year_min, year_max=year_max)
+    raise ValueError(f"Unknown search kind: {kind}")
@@ -0,0 +1,313 @@
+"""
+HTTP/JSON service exposing the movie searches, catalog metadata and top queries.
+
+Endpoints (GET, JSON responses):
+    /search/name?text=...[&cursor=...]
+    /search/fuzzy_name?text=...      -- closest titles by edit distance, one page
+    /search/actor?text=...[&cursor=...]
+    /search/description?text=...[&cursor=...]
+    /search/genre_and_year?genre=...&year_min=...&year_max=...[&cursor=...]
+    /search?title=&actor=&description=&genre=&year_min=&year_max=&rate_min=&rate_max=[&cursor=]
+        -- combined search, every filter optional
+    /metadata          -- genres with film counts and release year bounds
+    /top-queries?n=5&window=all
+                       -- most popular searches of the last hour, day, week or all time
+    /metrics           -- query metrics in the Prometheus text format
+    /health
+
+Search responses are {"rows": [...], "next_cursor": "..."}; pass next_cursor
+back as cursor to get the next page. Searches other than fuzzy_name also
+accept total=1, adding "total" (number of results) and "pages" to the
+response, and page=N, returning page N instead of the page of cursor. Errors are {"error": "..."} with status
+400 (bad parameters), 404 (unknown path) or 504 (request timeout).
+
+Connections are accepted by a bounded pool of request worker threads.
+Database work runs on a separate executor sized to the MySQL connection
+pool, and a request waiting longer than the request timeout is answered
+with 504 (its query completes in the background and is discarded).
+
+Classes:
+    SearchService -- HTTP server dispatching requests to a worker pool.
+    RequestHandler -- routes requests to MovieDB and mongo_log.
+
+Functions:
+- criteria_from_params(params: Dict[str, str]) -> SearchCriteria
+- create_service(host, port, workers, db_connections, request_timeout, log_searches) -> SearchService
+- serve(host, port, workers) -> None
+"""
+
+
+import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from connections import registry
+from logger import get_logger
+from pagination import Page
+from query_builder import SearchCriteria
+import batch
+import db
+import export
+import metrics
+import mongo_log
+import pagination
+import settings
+
+
+logger = get_logger(__name__)
+
+# Conversion of the combined search filters from query string values
+CRITERIA_TYPES: Dict[str, Callable[[str], Any]] = {
+    "title": str, "actor": str, "description": str, "genre": str,
+    "year_min": int, "year_max": int, "rate_min": float, "rate_max": float,
+}
+
+
+def criteria_from_params(params: Dict[str, str]) -> SearchCriteria:
+    """
+    Build combined search criteria from query string parameters.
+
+    Args:
+        params (Dict[str, str]): Query string parameters; cursor, total and
+            page are ignored.
+
+    Raises:
+        ValueError: If a parameter is unknown or has an invalid value.
+
+    Returns:
+        SearchCriteria: Filters of the search.
+    """
+    unknown = set(params) - set(CRITERIA_TYPES) - {"cursor", "total", "page"}
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    return SearchCriteria(**{
+        name: convert(params[name]) for name, convert in CRITERIA_TYPES.items()
+        if params.get(name)
+    })
+
+
+def page_response(page: Page) -> Dict[str, Any]:
+    """Return the JSON body of a search page."""
+    return {"rows": [export.row_record(row) for row in page.rows],
+            "next_cursor": page.next_cursor}
+
+
+class SearchService(HTTPServer):
+    """
+    HTTP server handling each connection on a bounded worker pool.
+
+    Attributes:
+        movie_db (db.MovieDB): MovieDB serving the searches.
+        request_timeout (float): Seconds before a request is answered with 504.
+    """
+
+    # Pending connections kept by the listening socket (the default of 5
+    # drops connections of bursts, which clients retry only after a second)
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], movie_db: db.MovieDB, workers: int,
+                 db_connections: int, request_timeout: float) -> None:
+        """
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port.
+            movie_db: MovieDB serving the searches.
+            workers: Number of request worker threads.
+            db_connections: Number of concurrent database calls.
+            request_timeout: Seconds before a request is answered with 504.
+        """
+        super().__init__(address, RequestHandler)
+        self.movie_db = movie_db
+        self.request_timeout = request_timeout
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self._db_executor = ThreadPoolExecutor(max_workers=db_connections,
+                                               thread_name_prefix="http-db")
+
+    def process_request(self, request: Any, client_address: Tuple[str, int]) -> None:
+        """Hand the connection over to the worker pool."""
+        self._workers.submit(self._process, request, client_address)
+
+    def _process(self, request: Any, client_address: Tuple[str, int]) -> None:
+        """Handle one connection on a worker thread."""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a database call within the request timeout.
+
+        Args:
+            func: Blocking MovieDB or mongo_log function.
+            *args: Its arguments.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the call takes longer than request_timeout.
+
+        Returns:
+            Result of func.
+        """
+        future = self._db_executor.submit(func, *args)
+        try:
+            return future.result(timeout=self.request_timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise
+
+    def server_close(self) -> None:
+        """Stop accepting connections and wait for the running requests."""
+        super().server_close()
+        self._workers.shutdown(wait=True)
+        self._db_executor.shutdown(wait=True)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Route GET requests to the searches and statistics.
+    """
+
+    server: SearchService
+    server_version = "MovieSearch/1.0"
+    # Seconds to wait for a slow client
+    timeout = settings.HTTP_REQUEST_TIMEOUT
+
+    def do_GET(self) -> None:
+        """Answer a GET request with JSON (or Prometheus text for /metrics)."""
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        movie_db = self.server.movie_db
+        try:
+            match url.path.rstrip("/"):
+                case "/search":
+                    criteria = criteria_from_params(params)
+                    self.send_search(movie_db.search, "criteria", (criteria,),
+                                     params.get("cursor"), params)
+                case path if path.startswith("/search/"):
+                    kind = path.removeprefix("/search/")
+                    for name in ("year_min", "year_max"):
+                        if name in params:
+                            params[name] = int(params[name])
+                    kind, args, cursor = batch.parse_request({"type": kind, "params": params})
+                    search = getattr(movie_db, f"search_film_by_{kind}")
+                    self.send_search(search, kind, args, cursor, params)
+                case "/metadata":
+                    catalog = self.server.run(movie_db.catalog)
+                    self.send_json(200, {"genres": catalog.genre_counts,
+                                         "year_min": catalog.year_min,
+                                         "year_max": catalog.year_max})
+                case "/top-queries":
+                    top = self.server.run(mongo_log.get_top_queries, int(params.get("n", 5)),
+                                          params.get("window", "all"))
+                    self.send_json(200, {"queries": top})
+                case "/metrics":
+                    self.send_text(200, metrics.registry.to_prometheus())
+                case "/health":
+                    self.send_json(200, {"status": "ok"})
+                case _:
+                    self.send_json(404, {"error": f"Unknown path: {url.path}"})
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+        except FutureTimeout:
+            logger.warning("Request timed out after %.1f s: %s",
+                           self.server.request_timeout, self.path)
+            self.send_json(504, {"error": "Request timed out"})
+        except Exception:
+            # e.g. MySQL or MongoDB unreachable; answer instead of dropping the connection
+            logger.exception("Request failed: %s", self.path)
+            self.send_json(500, {"error": "Internal error"})
+
+    def send_search(self, search: Callable[..., Page], kind: str, args: Tuple[Any, ...],
+                    cursor: Optional[str], params: Dict[str, Any]) -> None:
+        """
+        Run a search and send its page, with its total when asked.
+
+        Args:
+            search: MovieDB search method.
+            kind: Search kind of MovieDB.count_matches and page_cursor.
+            args: Search arguments excluding the cursor.
+            cursor: Cursor of the requested page.
+            params: Query string parameters; "total" and "page" are used.
+
+        Raises:
+            ValueError: If total or page is set for a search kind without
+                counts, or page is not an existing page number.
+        """
+        movie_db = self.server.movie_db
+        if params.get("page"):
+            cursor = self.server.run(movie_db.page_cursor, kind, args, int(params["page"]))
+        body = page_response(self.server.run(search, *args, cursor))
+        if params.get("total") in ("1", "true", "yes"):
+            total = self.server.run(movie_db.count_matches, kind, args)
+            body["total"] = total
+            body["pages"] = None if total is None else pagination.page_count(total, movie_db.limit)
+        self.send_json(200, body)
+
+    def send_json(self, status: int, body: Dict[str, Any]) -> None:
+        """Send a JSON response."""
+        self.send_text(status, json.dumps(body, default=str), "application/json; charset=utf-8")
+
+    def send_text(self, status: int, text: str,
+                  content_type: str = "text/plain; version=0.0.4; charset=utf-8") -> None:
+        """Send a UTF-8 text response."""
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Send access logs to the application log instead of stderr."""
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_service(host: str = settings.HTTP_HOST, port: int = settings.HTTP_PORT,
+                   workers: int = settings.HTTP_WORKERS,
+                   db_connections: int = settings.HTTP_DB_CONNECTIONS,
+                   request_timeout: float = settings.HTTP_REQUEST_TIMEOUT,
+                   log_searches: bool = True) -> SearchService:
+    """
+    Create the HTTP service over a dedicated MySQL connection pool.
+
+    Args:
+        host: Address to listen on.
+        port: Port to listen on; 0 picks a free port.
+        workers: Number of request worker threads.
+        db_connections: Number of pooled MySQL connections and concurrent database calls.
+        request_timeout: Seconds before a request is answered with 504.
+        log_searches: Log first-page searches to MongoDB.
+
+    Returns:
+        SearchService: Bound server; call serve_forever() to start it.
+    """
+    mysql_pool = registry.create_mysql_pool(max_size=db_connections)
+    movie_db = db.create_movie_db(mysql_pool, log_searches=log_searches)
+    return SearchService((host, port), movie_db, workers, db_connections, request_timeout)
+
+
+def serve(host: str = settings.HTTP_HOST, port: int = settings.HTTP_PORT,
+          workers: int = settings.HTTP_WORKERS) -> None:
+    """
+    Run the HTTP service until interrupted.
+
+    Args:
+        host: Address to listen on.
+        port: Port to listen on.
+        workers: Number of request worker threads.
+    """
+    service = create_service(host, port, workers)
+    logger.info("Serving on http://%s:%d with %d workers", host, service.server_port, workers)
+    print(f"Serving on http://{host}:{service.server_port} (Ctrl+C to stop)")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server_close()
+        service.movie_db.pool.close()
+        mongo_log.close()
+        registry.close()
@@ -1,8 +1,11 @@
 """
 Configuration settings for the application:
-- MySQL and MongoDB connection parameters
+- MySQL and MongoDB connection parameters and timeouts
+- Connection factories (used lazily by connections.ConnectionRegistry)
 - Movie search result limit
 - Other global settings
+
+Importing this module never opens a connection.
 """
 
 
@@ -27,9 +30,22 @@ DATABASE_MYSQL = {
     'user': os.getenv('MYSQL_USER'),
     'password': os.getenv('MYSQL_PASSWORD'),
     'database': 'sakila',
-    'charset': 'utf8mb4'
+    'charset': 'utf8mb4',
+    # pooled connections are reused across queries: never keep a stale snapshot
+    'autocommit': True,
+    # explicit timeouts (seconds) so an unreachable server never hangs the UI
+    'connect_timeout': 5,
+    'read_timeout': 30,
+    'write_timeout': 30
 }
 
+# MySQL connection pool: connections are opened lazily and borrowed per query
+MYSQL_POOL_MIN_SIZE = 1
+MYSQL_POOL_MAX_SIZE = 5
+MYSQL_POOL_IDLE_TIMEOUT = 300      # seconds before extra idle connections are closed
+MYSQL_POOL_MAX_LIFETIME = 3600     # seconds before a connection is recycled
+MYSQL_POOL_CHECKOUT_TIMEOUT = 10   # seconds to wait for a free connection
+
 
 MONGO_USER = os.getenv('MONGO_USER')
 MONGO_PASSWORD = os.getenv('MONGO_PASSWORD')
@@ -41,10 +57,109 @@ DATABASE_MONGO = (
     f"?readPreference=primary&ssl=false&authMechanism=DEFAULT&authSource={MONGO_DB}"
 )
 
+# MongoDB timeouts in milliseconds; pymongo waits 30 s for a server by default
+MONGO_TIMEOUTS = {
+    'serverSelectionTimeoutMS': 3000,
+    'connectTimeoutMS': 3000,
+    'socketTimeoutMS': 10000
+}
+# Seconds to wait before retrying a MongoDB connection that failed
+MONGO_RETRY_INTERVAL = 30
+
+# File receiving query metrics on exit: Prometheus text for *.prom, JSON otherwise
+METRICS_DUMP_PATH = os.getenv('METRICS_DUMP_PATH')
+
+# Startup to first menu render is logged; a warning is logged above this budget
+STARTUP_BUDGET_MS = 200
+
 
 # Limit for the number of movies returned per query
 MOVIE_RESULT_LIMIT = 10
 
+# Result pages fetched in the background ahead of the displayed one (0 disables)
+PREFETCH_DEPTH = int(os.getenv("PREFETCH_DEPTH", "1"))
+
+# Rows fetched per round trip when streaming results with a server-side cursor
+STREAM_BATCH_SIZE = 500
+
+# Worker threads (and pooled MySQL connections) of the batch search mode
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+
+# HTTP service mode: listen address, request worker threads, MySQL connections
+# used by the searches, and seconds after which a request is answered with 504
+HTTP_HOST = os.getenv("HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.getenv("HTTP_PORT", "8000"))
+HTTP_WORKERS = int(os.getenv("HTTP_WORKERS", "16"))
+HTTP_DB_CONNECTIONS = int(os.getenv("HTTP_DB_CONNECTIONS", "8"))
+HTTP_REQUEST_TIMEOUT = float(os.getenv("HTTP_REQUEST_TIMEOUT", "10"))
+
+# Engine for title/description substring search:
+# "mysql" runs LIKE '%...%' queries, "trigram" answers them from an in-memory
+# trigram index built at startup and only hydrates matching films from MySQL,
+# "snapshot" answers every search and the catalog metadata from the
+# memory-mapped catalog snapshot file CATALOG_FILE_PATH (built from MySQL when
+# missing, rebuilt when the catalog changes; see CATALOG_CHECK_INTERVAL)
+SEARCH_ENGINE = os.getenv('SEARCH_ENGINE', 'mysql')
+CATALOG_FILE_PATH = os.getenv('CATALOG_FILE_PATH', 'catalog.snapshot')
+
+# Description search: "like" matches the exact substring with LIKE '%...%';
+# "natural" and "boolean" rank films by relevance with MATCH ... AGAINST over
+# the FULLTEXT index of sakila's film_text (title and description), falling
+# back to LIKE when nothing matches (e.g. words shorter than the FULLTEXT
+# minimum token size) or film_text is unavailable
+DESCRIPTION_SEARCH_MODE = os.getenv('DESCRIPTION_SEARCH_MODE', 'like')
+
+# Write-behind search log: documents are queued in-process and written to
+# MongoDB with insert_many by a background thread
+MONGO_LOG_BATCH_SIZE = 100         # flush when this many documents are queued
+MONGO_LOG_FLUSH_INTERVAL = 2.0     # ... or when the oldest one waited this many seconds
+MONGO_LOG_QUEUE_SIZE = 10000       # max queued documents
+# What to do when the queue is full: "drop" the document, "block" the caller,
+# or "spill" it to MONGO_LOG_SPILL_PATH and replay it once MongoDB accepts writes again
+MONGO_LOG_OVERFLOW = os.getenv('MONGO_LOG_OVERFLOW', 'drop')
+MONGO_LOG_SPILL_PATH = "search_log.spill.jsonl"
+
+# Search log retention: raw log documents expire after MONGO_LOG_RETENTION_DAYS
+# (TTL index on timestamp; 0 keeps them). Their counts per query live on in
+# hourly and daily rollup buckets; hourly buckets, only needed for the last
+# hour and day top queries, expire after MONGO_HOURLY_RETENTION_DAYS, daily
+# buckets are kept
+MONGO_LOG_RETENTION_DAYS = int(os.getenv('MONGO_LOG_RETENTION_DAYS', '30'))
+MONGO_HOURLY_RETENTION_DAYS = 7
+
+# Search result cache (LRU + TTL) in front of MySQL; SEARCH_CACHE_TTL = 0 disables it
+SEARCH_CACHE_TTL = 600                         # seconds a cached page stays valid
+SEARCH_CACHE_MAX_ENTRIES = 1024
+SEARCH_CACHE_MAX_BYTES = 16 * 1024 * 1024      # estimated size of all cached pages
+
+# Fuzzy title search: number of closest films returned, and largest edit
+# distance accepted (lowered to a third of the query length for short queries)
+FUZZY_TOP_K = 10
+FUZZY_MAX_DISTANCE = 3
+
+# Seconds after which the cached actor-name index is reloaded from MySQL
+ACTOR_INDEX_TTL = 3600
+
+# Seconds after which the catalog snapshot (genres, year bounds) is reloaded,
+# and seconds between checks of category/film last_update for earlier changes
+CATALOG_TTL = 3600
+CATALOG_CHECK_INTERVAL = 60
+
+# Application log: records are queued by the calling thread and formatted and
+# written by a background listener thread (see logger.py)
+LOG_FILE = os.getenv('LOG_FILE', 'app.log')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')          # "text" or "json" (one object per line)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+# Per-module levels overriding LOG_LEVEL, e.g. "db=DEBUG,pool=WARNING"
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+# Rotation of LOG_FILE: "size" (LOG_MAX_BYTES), "time" (LOG_ROTATE_WHEN) or "none"
+LOG_ROTATION = os.getenv('LOG_ROTATION', 'size')
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_ROTATE_WHEN = 'midnight'
+LOG_BACKUP_COUNT = 5
+# Only every n-th DEBUG record of the same call site is kept (1 keeps all)
+LOG_DEBUG_SAMPLE_EVERY = int(os.getenv('LOG_DEBUG_SAMPLE_EVERY', '10'))
+
 
 def connect_mysql() -> Connection:
     """
@@ -78,7 +193,7 @@ def connect_mongo() -> MongoClient:
         ConnectionError: if connection cannot be established.
     """
     try:
-        client = pymongo.MongoClient(DATABASE_MONGO)
+        client = pymongo.MongoClient(DATABASE_MONGO, **MONGO_TIMEOUTS)
         client.admin.command("ping")
         return client
     except Exception as e:
@@ -103,17 +218,41 @@ def get_mongo_collection(client: MongoClient) -> Collection | None:
     return None
 
 
-# establish connections on module import
-try:
-    mysql_connection = connect_mysql()
-except ConnectionError as e:
-    logger.error(e)
-    mysql_connection = None
-
-try:
-    mongo_client = connect_mongo()
-    mongo_collection = get_mongo_collection(mongo_client)
-except ConnectionError as e:
-    logger.error(e)
-    mongo_client = None
-    mongo_collection = None
+def get_mongo_rollup_collection(client: MongoClient, unit: str) -> Collection | None:
+    """
+    Return MongoDB collection with the hourly or daily search count buckets,
+    collection 'final_project_100125_hiunter_hourly' or '..._daily' in database 'ich_edit'.
+
+    Args:
+        client: pymongo.MongoClient instance or None
+        unit: "hour" or "day"
+
+    Returns:
+        pymongo.collection.Collection if client is valid,
+        None otherwise.
+    """
+    if client:
+        suffix = {"hour": "hourly", "day": "daily"}[unit]
+        return client["ich_edit"][f"final_project_100125_hiunter_{suffix}"]
+
+    logger.warning("MongoDB: client is None — cannot get rollup collection")
+    return None
+
+
+def get_mongo_counters_collection(client: MongoClient) -> Collection | None:
+    """
+    Return MongoDB collection with maintained search popularity counters,
+    collection 'final_project_100125_hiunter_counters' in database 'ich_edit'.
+
+    Args:
+        client: pymongo.MongoClient instance or None
+
+    Returns:
+        pymongo.collection.Collection if client is valid,
+        None otherwise.
+    """
+    if client:
+        return client["ich_edit"]["final_project_100125_hiunter_counters"]
+
+    logger.warning("MongoDB: client is None — cannot get counters collection")
+    return None
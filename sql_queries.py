@@ -4,9 +4,20 @@ such as title, actor name, description, genre, and release year.
 
 Each query uses placeholders (%s) for parameter substitution to ensure security
 against SQL injection when used with parameterized query execution.
+
+Search queries are paginated with a keyset (seek) predicate: results are
+ordered by (title, film_id) and each page starts strictly after the
+(title, film_id) of the last row of the previous page, so every page costs
+the same no matter how deep it is. The trailing parameters of every search
+query are therefore: last title, last title, last film_id, limit.
 """
 
 
+# LIMIT value meaning "all rows": MySQL has no such keyword, its documentation
+# recommends the largest BIGINT UNSIGNED
+NO_LIMIT = 18446744073709551615
+
+
 # Query: Retrieve films by part of the title
 QUERY_FILM_BY_NAME = """
 SELECT f.film_id, f.title, f.release_year, c.name AS genre,
@@ -18,12 +29,15 @@ LEFT JOIN category AS c ON fc.category_id = c.category_id
 LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
 LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
 WHERE f.title LIKE %s
+    AND (f.title > %s OR (f.title = %s AND f.film_id > %s))
 GROUP BY f.film_id, f.title, f.release_year, c.name, f.rental_rate, f.description
-LIMIT %s OFFSET %s
+ORDER BY f.title, f.film_id
+LIMIT %s
 """
 
 
-# Query: Retrieve films by actor full name or part of name
+# Query: Retrieve films featuring any of the given actors, with their full cast;
+# {ids} is replaced with one %s placeholder per actor id
 QUERY_FILM_BY_ACTOR = """
 SELECT f.film_id, f.title, f.release_year, c.name AS genre,
     GROUP_CONCAT(CONCAT(a.first_name, ' ', a.last_name) ORDER BY a.first_name, a.last_name SEPARATOR ', ') AS actors,
@@ -33,9 +47,11 @@ LEFT JOIN film_category AS fc ON f.film_id = fc.film_id
 LEFT JOIN category AS c ON fc.category_id = c.category_id
 LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
 LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
-WHERE CONCAT(a.first_name, ' ', a.last_name) LIKE %s
+WHERE f.film_id IN (SELECT film_id FROM film_actor WHERE actor_id IN ({ids}))
+    AND (f.title > %s OR (f.title = %s AND f.film_id > %s))
 GROUP BY f.film_id, f.title, f.release_year, c.name, f.rental_rate, f.description
-LIMIT %s OFFSET %s
+ORDER BY f.title, f.film_id
+LIMIT %s
 """
 
 
@@ -50,8 +66,37 @@ LEFT JOIN category AS c ON fc.category_id = c.category_id
 LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
 LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
 WHERE f.description LIKE %s
+    AND (f.title > %s OR (f.title = %s AND f.film_id > %s))
 GROUP BY f.film_id, f.title, f.release_year, c.name, f.rental_rate, f.description
-LIMIT %s OFFSET %s
+ORDER BY f.title, f.film_id
+LIMIT %s
+"""
+
+
+# Query: Retrieve films whose title or description match a FULLTEXT search of
+# sakila's film_text table, most relevant first; {mode} is "IN NATURAL LANGUAGE
+# MODE" or "IN BOOLEAN MODE". The score is rounded so that it survives the
+# round trip through the cursor unchanged. Keyset on (score DESC, film_id):
+# the parameters are search text, search text, last score, last score,
+# last film_id, limit.
+QUERY_FILM_BY_DESCRIPTION_FULLTEXT = """
+SELECT f.film_id, f.title, f.release_year, c.name AS genre,
+    GROUP_CONCAT(CONCAT(a.first_name, ' ', a.last_name) ORDER BY a.first_name, a.last_name SEPARATOR ', ') AS actors,
+    f.rental_rate, f.description, ft.score
+FROM (
+    SELECT film_id, ROUND(MATCH(title, description) AGAINST (%s {mode}), 6) AS score
+    FROM film_text
+    WHERE MATCH(title, description) AGAINST (%s {mode})
+) AS ft
+JOIN film AS f ON f.film_id = ft.film_id
+LEFT JOIN film_category AS fc ON f.film_id = fc.film_id
+LEFT JOIN category AS c ON fc.category_id = c.category_id
+LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
+LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
+WHERE ft.score < %s OR (ft.score = %s AND f.film_id > %s)
+GROUP BY f.film_id, f.title, f.release_year, c.name, f.rental_rate, f.description, ft.score
+ORDER BY ft.score DESC, f.film_id
+LIMIT %s
 """
 
 
@@ -66,13 +111,142 @@ LEFT JOIN category AS c ON fc.category_id = c.category_id
 LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
 LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
 WHERE c.name LIKE %s AND f.release_year BETWEEN %s AND %s
+    AND (f.title > %s OR (f.title = %s AND f.film_id > %s))
 GROUP BY f.film_id, f.title, f.release_year, c.name, f.rental_rate, f.description
-LIMIT %s OFFSET %s
+ORDER BY f.title, f.film_id
+LIMIT %s
+"""
+
+
+# Query: Retrieve films matching any combination of filters (query_builder);
+# {filters} is replaced with "<predicate>\n    AND " for every set filter
+QUERY_FILM_SEARCH = """
+SELECT f.film_id, f.title, f.release_year, c.name AS genre,
+    GROUP_CONCAT(CONCAT(a.first_name, ' ', a.last_name) ORDER BY a.first_name, a.last_name SEPARATOR ', ') AS actors,
+    f.rental_rate, f.description
+FROM film AS f
+LEFT JOIN film_category AS fc ON f.film_id = fc.film_id
+LEFT JOIN category AS c ON fc.category_id = c.category_id
+LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
+LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
+WHERE {filters}(f.title > %s OR (f.title = %s AND f.film_id > %s))
+GROUP BY f.film_id, f.title, f.release_year, c.name, f.rental_rate, f.description
+ORDER BY f.title, f.film_id
+LIMIT %s
+"""
+
+# Query: Count the films matching any combination of filters (query_builder),
+# reading only the filtered tables; {joins} adds category when the genre is
+# filtered and {filters} is "<predicate> AND ..." or TRUE
+QUERY_FILM_COUNT = """
+SELECT COUNT(*)
+FROM film AS f
+{joins}WHERE {filters}
+"""
+
+
+# Query: Retrieve the (title, film_id) keys of the rows at an offset of a
+# filtered search and after it, to jump to the page starting after the first
+# one without fetching the pages before it (a second row tells that the page
+# is not empty); {joins} and {filters} as in QUERY_FILM_COUNT, the parameter
+# after the filter parameters is the offset
+QUERY_FILM_KEYS_AT = """
+SELECT f.title, f.film_id
+FROM film AS f
+{joins}WHERE {filters}
+ORDER BY f.title, f.film_id
+LIMIT 2 OFFSET %s
+"""
+
+
+# Query: Count the FULLTEXT matches of a description search; {mode} as in
+# QUERY_FILM_BY_DESCRIPTION_FULLTEXT
+QUERY_FULLTEXT_COUNT = """
+SELECT COUNT(*)
+FROM film_text
+WHERE MATCH(title, description) AGAINST (%s {mode})
+"""
+
+
+# Query: Retrieve the (score, film_id) keys of the FULLTEXT matches at an
+# offset and after it, in the order of QUERY_FILM_BY_DESCRIPTION_FULLTEXT
+# (see QUERY_FILM_KEYS_AT); the parameters are search text, search text, offset
+QUERY_FULLTEXT_KEYS_AT = """
+SELECT ROUND(MATCH(title, description) AGAINST (%s {mode}), 6) AS score, film_id
+FROM film_text
+WHERE MATCH(title, description) AGAINST (%s {mode})
+ORDER BY score DESC, film_id
+LIMIT 2 OFFSET %s
 """
 
 # Query: Retrieve all unique film genres
 QUERY_ALL_GENRES = "SELECT DISTINCT name FROM category"
 
 
+# Query: Retrieve all actor names (actor index source)
+QUERY_ALL_ACTORS = "SELECT actor_id, first_name, last_name FROM actor"
+
+
 # Query: Retrieve minimum and maximum film release year
 QUERY_MIN_MAX_YEAR = "SELECT MIN(release_year), MAX(release_year) FROM film"
+
+
+# Query: Retrieve every genre with its number of films (catalog snapshot)
+QUERY_GENRE_COUNTS = """
+SELECT c.name, COUNT(fc.film_id)
+FROM category AS c
+LEFT JOIN film_category AS fc ON c.category_id = fc.category_id
+GROUP BY c.category_id, c.name
+ORDER BY c.name
+"""
+
+
+# Query: Retrieve the latest change of genres and films (catalog snapshot version)
+QUERY_CATALOG_VERSION = """
+SELECT (SELECT MAX(last_update) FROM category), (SELECT MAX(last_update) FROM film)
+"""
+
+
+# Query: Retrieve the searchable text of every film (trigram index source)
+QUERY_FILM_TEXTS = "SELECT film_id, title, description FROM film"
+
+
+# Query: Retrieve the title of every film (fuzzy title index source)
+QUERY_FILM_TITLES = "SELECT film_id, title FROM film"
+
+
+# Query: Retrieve films by id; {ids} is replaced with one %s placeholder per id
+QUERY_FILMS_BY_IDS = """
+SELECT f.film_id, f.title, f.release_year, c.name AS genre,
+    GROUP_CONCAT(CONCAT(a.first_name, ' ', a.last_name) ORDER BY a.first_name, a.last_name SEPARATOR ', ') AS actors,
+    f.rental_rate, f.description
+FROM film AS f
+LEFT JOIN film_category AS fc ON f.film_id = fc.film_id
+LEFT JOIN category AS c ON fc.category_id = c.category_id
+LEFT JOIN film_actor AS fa ON f.film_id = fa.film_id
+LEFT JOIN actor AS a ON fa.actor_id = a.actor_id
+WHERE f.film_id IN ({ids})
+GROUP BY f.film_id, f.title, f.release_year, c.name, f.rental_rate, f.description
+"""
+
+
+# Queries: Retrieve the flattened tables of the catalog snapshot file (catalog_file.py)
+QUERY_SNAPSHOT_FILMS = "SELECT film_id, title, release_year, rental_rate, description FROM film"
+
+QUERY_SNAPSHOT_FILM_GENRES = """
+SELECT fc.film_id, c.name
+FROM film_category AS fc
+LEFT JOIN category AS c ON fc.category_id = c.category_id
+"""
+
+QUERY_SNAPSHOT_FILM_ACTORS = "SELECT film_id, actor_id FROM film_actor"
+
+
+# Query: Retrieve the latest change and the row counts of the tables of the
+# catalog snapshot file; counts catch deletions, which leave last_update unchanged
+QUERY_SNAPSHOT_VERSION = """
+SELECT (SELECT MAX(last_update) FROM category), (SELECT MAX(last_update) FROM film),
+    (SELECT MAX(last_update) FROM film_category), (SELECT MAX(last_update) FROM actor),
+    (SELECT MAX(last_update) FROM film_actor), (SELECT COUNT(*) FROM film),
+    (SELECT COUNT(*) FROM film_category), (SELECT COUNT(*) FROM film_actor)
+"""
@@ -0,0 +1,657 @@
+"""
+Local stand-ins for MySQL and MongoDB used by benchmarks and load tests.
+
+- SQLite plays MySQL: a seeded, sakila-shaped dataset is generated into a
+  shared in-memory SQLite database, and StandInConnection translates the
+  MySQL dialect of sql_queries on the fly, so the real MovieDB code runs
+  unchanged on top of a ConnectionPool of stand-in connections.
+- FakeMongoClient plays MongoDB: an in-process client whose collections
+  support the subset of the pymongo API used by mongo_log.
+
+Classes:
+    StandInConnection -- pymysql-like connection over sqlite3.
+    FakeCollection -- in-memory pymongo collection.
+    FakeMongoClient -- in-memory pymongo client.
+
+Functions:
+- generate_dataset(scale, seed) -> str
+- connection_factory(uri) -> Callable[[], StandInConnection]
+"""
+
+
+import itertools
+import random
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pymysql
+from pymongo.errors import BulkWriteError
+
+from connections import registry
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Sizes of the original sakila database (scale factor 1)
+SAKILA_FILMS = 1000
+SAKILA_ACTORS = 200
+SAKILA_CATEGORIES = [
+    "Action", "Animation", "Children", "Classics", "Comedy", "Documentary",
+    "Drama", "Family", "Foreign", "Games", "Horror", "Music", "New",
+    "Sci-Fi", "Sports", "Travel",
+]
+
+TITLE_WORDS = [
+    "ACADEMY", "DINOSAUR", "ACE", "GOLDFINGER", "ADAPTATION", "HOLES", "AFFAIR",
+    "PREJUDICE", "AFRICAN", "EGG", "AGENT", "TRUMAN", "AIRPLANE", "SIERRA",
+    "AIRPORT", "POLLOCK", "ALABAMA", "DEVIL", "ALADDIN", "CALENDAR", "ALAMO",
+    "VIDEOTAPE", "ALASKA", "PHANTOM", "ALI", "FOREVER", "ALICE", "FANTASIA",
+    "ALIEN", "CENTER", "ALLEY", "EVOLUTION", "ALONE", "TRIP", "ALTER",
+    "VICTORY", "AMADEUS", "HOLY", "AMELIE", "HELLFIGHTERS", "AMERICAN",
+    "CIRCUS", "AMISTAD", "MIDSUMMER", "ANACONDA", "CONFESSIONS", "ANALYZE",
+    "HOOSIERS", "ANGELS", "LIFE", "ANNIE", "IDENTITY", "ANONYMOUS", "HUMAN",
+    "ANTHEM", "LUKE", "ANTITRUST", "TOMATOES", "ANYTHING", "SAVANNAH",
+]
+ADJECTIVES = [
+    "Epic", "Astounding", "Fanciful", "Beautiful", "Awe-Inspiring",
+    "Thrilling", "Touching", "Intrepid", "Insightful", "Boring", "Lacklusture",
+    "Emotional", "Fateful", "Unbelieveable", "Amazing", "Brilliant", "Stunning",
+]
+GENRES = [
+    "Drama", "Epistle", "Reflection", "Story", "Documentary", "Saga", "Tale",
+    "Panorama", "Character Study", "Yarn", "Display", "Mystery Story",
+]
+NOUNS = [
+    "Feminist", "Dentist", "Squirrel", "Explorer", "Moose", "Composer", "Monkey",
+    "Robot", "Pastry Chef", "Boat", "Technical Writer", "Hunter", "Car", "Cat",
+    "Dog", "Lumberjack", "Database Administrator", "Teacher", "Sumo Wrestler",
+    "Frisbee", "Shark", "Crocodile", "Student", "Mad Scientist", "Butler",
+]
+VERBS = [
+    "Chase", "Battle", "Defeat", "Kill", "Outgun", "Outrace", "Overcome",
+    "Pursue", "Reach", "Redeem", "Sink", "Succumb", "Face", "Find", "Meet",
+]
+PLACES = [
+    "The Canadian Rockies", "A Manhattan Penthouse", "The Gulf of Mexico",
+    "A Shark Tank", "The Outback", "Ancient India", "A Jet Boat", "Nigeria",
+    "Soviet Georgia", "An Abandoned Amusement Park", "The First Manned Space Station",
+    "A Baloon Factory", "Berlin", "A MySQL Convention", "The Sahara Desert",
+]
+FIRST_NAMES = [
+    "PENELOPE", "NICK", "ED", "JENNIFER", "JOHNNY", "BETTE", "GRACE", "MATTHEW",
+    "JOE", "CHRISTIAN", "ZERO", "KARL", "UMA", "VIVIEN", "CUBA", "FRED", "HELEN",
+    "DAN", "BOB", "LUCILLE", "KIRSTEN", "ELVIS", "SANDRA", "CAMERON", "KEVIN",
+    "RIP", "JULIA", "WOODY", "ALEC", "SISSY", "TIM", "MILLA", "AUDREY", "JUDY",
+]
+LAST_NAMES = [
+    "GUINESS", "WAHLBERG", "CHASE", "DAVIS", "LOLLOBRIGIDA", "NICHOLSON", "MOSTEL",
+    "JOHANSSON", "SWANK", "GABLE", "CAGE", "BERRY", "WOOD", "BERGEN", "OLIVIER",
+    "COSTNER", "VOIGHT", "TORN", "FAWCETT", "TRACY", "PALTROW", "MARX", "KILMER",
+    "STREEP", "BLOOM", "CRAWFORD", "MCQUEEN", "HOFFMAN", "WAYNE", "PECK", "SOBIESKI",
+]
+
+SCHEMA = """
+CREATE TABLE film (
+    film_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    release_year INTEGER,
+    rental_rate REAL NOT NULL,
+    last_update TEXT NOT NULL
+);
+CREATE INDEX idx_title ON film (title);
+CREATE TABLE category (
+    category_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    last_update TEXT NOT NULL
+);
+CREATE TABLE film_category (
+    film_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    last_update TEXT NOT NULL,
+    PRIMARY KEY (film_id, category_id)
+);
+CREATE INDEX fk_film_category_category ON film_category (category_id);
+CREATE TABLE actor (
+    actor_id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    last_update TEXT NOT NULL
+);
+CREATE INDEX idx_actor_last_name ON actor (last_name);
+CREATE TABLE film_actor (
+    actor_id INTEGER NOT NULL,
+    film_id INTEGER NOT NULL,
+    last_update TEXT NOT NULL,
+    PRIMARY KEY (actor_id, film_id)
+);
+CREATE INDEX idx_fk_film_id ON film_actor (film_id);
+CREATE TABLE film_text (
+    film_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT
+);
+"""
+
+# Keeps each generated in-memory database alive while the process runs
+_keepalive: Dict[str, sqlite3.Connection] = {}
+_uri_counter = itertools.count(1)
+
+
+def _concat(*parts: Any) -> Optional[str]:
+    """MySQL CONCAT(): NULL if any part is NULL."""
+    if any(part is None for part in parts):
+        return None
+    return "".join(str(part) for part in parts)
+
+
+# InnoDB FULLTEXT ignores words shorter than innodb_ft_min_token_size
+FT_MIN_TOKEN_SIZE = 3
+
+_WORD = re.compile(r"[\w']+")
+
+
+def _ft_score(title: Optional[str], description: Optional[str], against: str,
+              mode: str) -> float:
+    """
+    Rough MySQL MATCH(title, description) AGAINST (...) relevance.
+
+    Counts occurrences of the searched words; in boolean mode "+word" is
+    required and "-word" excluded. 0 means no match.
+    """
+    words = _WORD.findall(f"{title or ''} {description or ''}".lower())
+    score = 0.0
+    for term in against.lower().split():
+        operator = term[0] if mode == "BOOLEAN" and term[0] in "+-" else ""
+        word = term.lstrip("+-~<>(").rstrip(")*\"")
+        if len(word) < FT_MIN_TOKEN_SIZE:
+            continue
+        count = words.count(word)
+        if (operator == "+" and not count) or (operator == "-" and count):
+            return 0.0
+        if operator != "-":
+            score += count / len(words)
+    return score
+
+
+def _connect(uri: str) -> sqlite3.Connection:
+    """Open a SQLite connection with the MySQL helper functions registered."""
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.create_function("CONCAT", -1, _concat, deterministic=True)
+    conn.create_function("FT_SCORE", 4, _ft_score, deterministic=True)
+    return conn
+
+
+def generate_dataset(scale: int = 1, seed: int = 42) -> str:
+    """
+    Generate a seeded sakila-shaped dataset in a shared in-memory database.
+
+    Scale factor 1 has the size of sakila (1000 films, 200 actors, 16 genres);
+    films and actors grow linearly with the scale factor.
+
+    Args:
+        scale (int): Scale factor.
+        seed (int): Random seed; the same seed gives the same dataset.
+
+    Returns:
+        str: SQLite URI of the database, for connection_factory().
+    """
+    rng = random.Random(seed)
+    uri = f"file:standin_{next(_uri_counter)}_x{scale}?mode=memory&cache=shared"
+    conn = _connect(uri)
+    _keepalive[uri] = conn
+    conn.executescript(SCHEMA)
+
+    now = datetime(2006, 2, 15, 5, 3, 42)
+    stamp = now.isoformat(sep=" ")
+    films = scale * SAKILA_FILMS
+    actors = scale * SAKILA_ACTORS
+
+    conn.executemany(
+        "INSERT INTO category VALUES (?, ?, ?)",
+        [(i, name, stamp) for i, name in enumerate(SAKILA_CATEGORIES, start=1)],
+    )
+    conn.executemany(
+        "INSERT INTO actor VALUES (?, ?, ?, ?)",
+        [(i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), stamp)
+         for i in range(1, actors + 1)],
+    )
+
+    def film_rows() -> Iterator[Tuple]:
+        for film_id in range(1, films + 1):
+            title = f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)}"
+            description = (
+                f"A {rng.choice(ADJECTIVES)} {rng.choice(GENRES)} of a {rng.choice(NOUNS)} "
+                f"And a {rng.choice(NOUNS)} who must {rng.choice(VERBS)} "
+                f"a {rng.choice(NOUNS)} in {rng.choice(PLACES)}"
+            )
+            yield (film_id, title, description, rng.randint(1990, 2010),
+                   rng.choice((0.99, 2.99, 4.99)), stamp)
+
+    conn.executemany("INSERT INTO film VALUES (?, ?, ?, ?, ?, ?)", film_rows())
+    conn.execute("INSERT INTO film_text SELECT film_id, title, description FROM film")
+    conn.executemany(
+        "INSERT INTO film_category VALUES (?, ?, ?)",
+        ((film_id, rng.randint(1, len(SAKILA_CATEGORIES)), stamp)
+         for film_id in range(1, films + 1)),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO film_actor VALUES (?, ?, ?)",
+        ((rng.randint(1, actors), film_id, stamp)
+         for film_id in range(1, films + 1) for _ in range(rng.randint(1, 10))),
+    )
+    conn.commit()
+    logger.info("Stand-in dataset generated: scale=%d, films=%d, uri=%s", scale, films, uri)
+    return uri
+
+
+_GROUP_CONCAT = re.compile(r"GROUP_CONCAT\((.*?) ORDER BY .*? SEPARATOR ('.*?')\)")
+_MATCH_AGAINST = re.compile(
+    r"MATCH\((\w+), (\w+)\) AGAINST \((%s) IN (NATURAL LANGUAGE|BOOLEAN) MODE\)"
+)
+
+
+def translate(query: str) -> str:
+    """
+    Translate a MySQL query from sql_queries to the SQLite dialect.
+
+    Args:
+        query (str): MySQL query with %s placeholders.
+
+    Returns:
+        str: Equivalent SQLite query with ? placeholders.
+    """
+    query = _GROUP_CONCAT.sub(r"GROUP_CONCAT(\1, \2)", query)
+    query = _MATCH_AGAINST.sub(r"FT_SCORE(\1, \2, \3, '\4')", query)
+    # MySQL escapes LIKE wildcards with a backslash by default, SQLite only when told
+    query = query.replace("LIKE %s", "LIKE %s ESCAPE '\\'")
+    return query.replace("%s", "?")
+
+
+class StandInCursor:
+    """pymysql-like cursor over a sqlite3 cursor."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """Open a cursor on the given SQLite connection."""
+        self._cursor = conn.cursor()
+
+    def __enter__(self) -> "StandInCursor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def rowcount(self) -> int:
+        """Number of rows affected by the last statement."""
+        return self._cursor.rowcount
+
+    def execute(self, query: str, params: Optional[Sequence[Any]] = None) -> int:
+        """Execute a MySQL-dialect query."""
+        # SQLite integers are signed 64-bit: sql_queries.NO_LIMIT becomes LIMIT -1
+        params = tuple(-1 if isinstance(p, int) and p > 2 ** 63 - 1 else p
+                       for p in params or ())
+        try:
+            self._cursor.execute(translate(query), params)
+        except sqlite3.Error as e:
+            raise pymysql.err.OperationalError(str(e)) from e
+        return self._cursor.rowcount
+
+    def fetchall(self) -> Tuple[Tuple, ...]:
+        """Fetch all remaining rows."""
+        return tuple(self._cursor.fetchall())
+
+    def fetchmany(self, size: int = 1) -> Tuple[Tuple, ...]:
+        """Fetch up to size rows."""
+        return tuple(self._cursor.fetchmany(size))
+
+    def fetchone(self) -> Optional[Tuple]:
+        """Fetch the next row."""
+        return self._cursor.fetchone()
+
+    def close(self) -> None:
+        """Close the cursor."""
+        self._cursor.close()
+
+
+class StandInConnection:
+    """
+    pymysql-like connection over sqlite3, usable with pool.ConnectionPool.
+
+    Attributes:
+        open (bool): False once the connection is closed.
+    """
+
+    def __init__(self, uri: str) -> None:
+        """Connect to a database created by generate_dataset()."""
+        self._conn = _connect(uri)
+        self.open = True
+
+    def cursor(self, cursor_class: Any = None) -> StandInCursor:
+        """Return a new cursor; the pymysql cursor class is ignored."""
+        return StandInCursor(self._conn)
+
+    def ping(self, reconnect: bool = False) -> None:
+        """Check that the connection is usable."""
+        self._conn.execute("SELECT 1")
+
+    def commit(self) -> None:
+        """Commit the current transaction."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._conn.close()
+        self.open = False
+
+
+def connection_factory(uri: str) -> Callable[[], StandInConnection]:
+    """
+    Return a connection factory for pool.ConnectionPool.
+
+    Args:
+        uri (str): URI returned by generate_dataset().
+
+    Returns:
+        Callable[[], StandInConnection]: Function opening a new stand-in connection.
+    """
+    return lambda: StandInConnection(uri)
+
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    """Read a dotted field path from a document."""
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _evaluate(doc: Dict[str, Any], expr: Any) -> Any:
+    """Evaluate an aggregation expression: "$field", $dateTrunc, {...} of expressions or a literal."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _get(doc, expr[1:])
+    if isinstance(expr, dict) and "$dateTrunc" in expr:
+        date = _evaluate(doc, expr["$dateTrunc"]["date"])
+        if expr["$dateTrunc"]["unit"] == "day":
+            return date.replace(hour=0, minute=0, second=0, microsecond=0)
+        return date.replace(minute=0, second=0, microsecond=0)
+    if isinstance(expr, dict):
+        return {key: _evaluate(doc, value) for key, value in expr.items()}
+    return expr
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Tell whether a document matches a find()/$match filter."""
+    for path, cond in query.items():
+        value = _get(doc, path)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            for op, arg in cond.items():
+                if value is None and op != "$in":
+                    return False
+                if op == "$gte" and not value >= arg:
+                    return False
+                if op == "$gt" and not value > arg:
+                    return False
+                if op == "$lte" and not value <= arg:
+                    return False
+                if op == "$lt" and not value < arg:
+                    return False
+                if op == "$in" and value not in arg:
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _sort(docs: List[Dict[str, Any]], keys: Sequence[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    """Sort documents by (field, direction) keys, like a MongoDB sort."""
+    for path, direction in reversed(list(keys)):
+        docs = sorted(docs, key=lambda d, p=path: (_get(d, p) is not None, _get(d, p)),
+                      reverse=direction < 0)
+    return docs
+
+
+class FakeCursor:
+    """Result of FakeCollection.find(), supporting sort() and limit()."""
+
+    def __init__(self, docs: List[Dict[str, Any]]) -> None:
+        self._docs = docs
+
+    def sort(self, keys: Sequence[Tuple[str, int]]) -> "FakeCursor":
+        """Sort by (field, direction) pairs."""
+        self._docs = _sort(self._docs, keys)
+        return self
+
+    def limit(self, n: int) -> "FakeCursor":
+        """Keep the first n documents."""
+        if n:
+            self._docs = self._docs[:n]
+        return self
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._docs)
+
+
+class FakeCollection:
+    """
+    In-memory collection implementing the pymongo calls used by mongo_log.
+
+    Attributes:
+        name (str): Collection name.
+        indexes (List): Keys of created indexes.
+    """
+
+    def __init__(self, database: "FakeDatabase", name: str) -> None:
+        self.database = database
+        self.name = name
+        self.indexes: List[Any] = []
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _key(self, _id: Any) -> Any:
+        """Hashable key of an _id value."""
+        return repr(_id) if isinstance(_id, dict) else _id
+
+    def insert_one(self, doc: Dict[str, Any]) -> None:
+        """Insert one document."""
+        self.insert_many([doc])
+
+    def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True) -> None:
+        """
+        Insert documents, assigning an _id to those without one.
+
+        Documents whose _id already exists are rejected with BulkWriteError,
+        after the other documents with ordered=False.
+        """
+        errors = []
+        inserted = 0
+        with self._lock:
+            for index, doc in enumerate(docs):
+                doc.setdefault("_id", next(self._ids))
+                key = self._key(doc["_id"])
+                if key in self._docs:
+                    errors.append({"index": index, "code": 11000,
+                                   "errmsg": f"E11000 duplicate key error: {doc['_id']}"})
+                    if ordered:
+                        break
+                    continue
+                self._docs[key] = dict(doc)
+                inserted += 1
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted})
+
+    def find(self, query: Optional[Dict[str, Any]] = None) -> FakeCursor:
+        """Return documents matching a filter."""
+        with self._lock:
+            docs = [dict(d) for d in self._docs.values() if _matches(d, query or {})]
+        return FakeCursor(docs)
+
+    def count_documents(self, query: Dict[str, Any]) -> int:
+        """Count documents matching a filter."""
+        return len(list(self.find(query)))
+
+    def create_index(self, keys: Any, **kwargs: Any) -> str:
+        """Record an index definition."""
+        self.indexes.append((keys, kwargs))
+        return str(keys)
+
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any],
+                   upsert: bool = False) -> None:
+        """Apply $inc/$max/$set to the first matching document, inserting it on upsert."""
+        with self._lock:
+            doc = next((d for d in self._docs.values() if _matches(d, query)), None)
+            if doc is None:
+                if not upsert:
+                    return
+                doc = {k: v for k, v in query.items() if not isinstance(v, dict)
+                       or not any(key.startswith("$") for key in v)}
+                doc.setdefault("_id", next(self._ids))
+                self._docs[self._key(doc["_id"])] = doc
+            for field, amount in update.get("$inc", {}).items():
+                doc[field] = doc.get(field, 0) + amount
+            for field, value in update.get("$max", {}).items():
+                if doc.get(field) is None or value > doc[field]:
+                    doc[field] = value
+            for field, value in update.get("$set", {}).items():
+                doc[field] = value
+
+    def bulk_write(self, requests: List[Any], ordered: bool = True) -> None:
+        """Apply pymongo UpdateOne requests."""
+        for request in requests:
+            self.update_one(request._filter, request._doc, upsert=request._upsert)
+
+    def delete_many(self, query: Dict[str, Any]) -> None:
+        """Delete documents matching a filter."""
+        with self._lock:
+            for key in [k for k, d in self._docs.items() if _matches(d, query)]:
+                del self._docs[key]
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run a pipeline of $match, $group ($sum/$max), $sort, $limit, $project, $out and $merge stages."""
+        docs = list(self.find())
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if _matches(d, arg)]
+            elif op == "$group":
+                groups: Dict[str, Dict[str, Any]] = {}
+                for doc in docs:
+                    _id = _evaluate(doc, arg["_id"])
+                    group = groups.setdefault(repr(_id), {"_id": _id})
+                    for field, acc in arg.items():
+                        if field == "_id":
+                            continue
+                        (acc_op, expr), = acc.items()
+                        value = _evaluate(doc, expr)
+                        if acc_op == "$sum":
+                            group[field] = group.get(field, 0) + value
+                        elif acc_op == "$max":
+                            if group.get(field) is None or value > group[field]:
+                                group[field] = value
+                docs = list(groups.values())
+            elif op == "$sort":
+                docs = _sort(docs, list(arg.items()))
+            elif op == "$limit":
+                docs = docs[:arg]
+            elif op == "$project":
+                docs = [
+                    {**({"_id": doc["_id"]} if arg.get("_id", 1) else {}),
+                     **{field: doc.get(field) if expr == 1 else _evaluate(doc, expr)
+                        for field, expr in arg.items() if field != "_id"}}
+                    for doc in docs
+                ]
+            elif op == "$out":
+                target = self.database[arg]
+                with target._lock:
+                    target._docs = {target._key(d["_id"]): dict(d) for d in docs}
+                return []
+            elif op == "$merge":
+                # Only whenMatched "replace" and whenNotMatched "insert"
+                target = self.database[arg["into"]]
+                with target._lock:
+                    keys = {tuple(d.get(field) for field in arg["on"]): key
+                            for key, d in target._docs.items()}
+                    for doc in docs:
+                        on = tuple(doc.get(field) for field in arg["on"])
+                        key = keys.get(on)
+                        if key is None:
+                            doc = dict(doc, _id=next(target._ids))
+                            key = keys[on] = target._key(doc["_id"])
+                        else:
+                            doc = dict(doc, _id=target._docs[key]["_id"])
+                        target._docs[key] = doc
+                return []
+            else:
+                raise NotImplementedError(f"Stand-in aggregation stage {op}")
+        return docs
+
+
+class FakeDatabase:
+    """In-memory database creating collections on access."""
+
+    def __init__(self) -> None:
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self._collections.setdefault(name, FakeCollection(self, name))
+
+
+class FakeMongoClient:
+    """In-memory stand-in for pymongo.MongoClient."""
+
+    def __init__(self) -> None:
+        self._databases: Dict[str, FakeDatabase] = {}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        return self._databases.setdefault(name, FakeDatabase())
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def seed_search_log(collection: FakeCollection, events: int, seed: int = 42) -> None:
+    """
+    Fill a fake search log with raw events spread over the last 30 days.
+
+    Args:
+        collection (FakeCollection): Search log collection.
+        events (int): Number of events.
+        seed (int): Random seed.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    types = ["search_by_name", "search_by_actor", "search_by_description",
+             "search_by_genre_and_year"]
+    words = [w.lower() for w in TITLE_WORDS]
+    collection.insert_many([
+        {
+            "query_type": rng.choice(types),
+            "query_str": rng.choice(words),
+            "timestamp": now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600)),
+        }
+        for _ in range(events)
+    ])
+
+
+@contextmanager
+def installed(uri: str, mongo_client: Optional[FakeMongoClient] = None) -> Iterator[None]:
+    """
+    Install stand-ins into connections.registry for the duration of a with block.
+
+    Args:
+        uri (str): Stand-in MySQL database URI from generate_dataset().
+        mongo_client (Optional[FakeMongoClient]): Fake MongoDB client, a new one if None.
+    """
+    registry.install(mysql_factory=connection_factory(uri),
+                     mongo_client=mongo_client or FakeMongoClient())
+    try:
+        yield
+    finally:
+        registry.close()
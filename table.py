@@ -2,51 +2,169 @@
 Module for displaying formatted tabular data and printing search query statistics.
 
 Functions:
-- show_results(data: List[List[Any]]) -> None:
-    Displays tabular data with automatic text wrapping inside table cells.
+- show_results(data: List[List[Any]], out: Optional[IO[str]] = None) -> None:
+    Displays tabular data with automatic text wrapping inside table cells,
+    writing the whole page at once.
+
+- stream_results(rows: Iterable[Sequence[Any]], out: Optional[IO[str]] = None) -> int:
+    Renders rows as they arrive, one write per row.
 
 - print_top_searches(data: List[Dict[str, Any]]) -> None:
     Prints a ranked list of the most frequent search queries from given data.
 
+- print_stats(stats: Dict[str, Any]) -> None:
+    Prints per-template query timings, row counts, errors and cache gauges.
+
 This module is useful for formatting console output when working with
 search results, reports, or logs that require readable multi-line columns.
 """
 
 
+import shutil
+import sys
 import textwrap
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, IO, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+
+HEADERS = ["ID", "Title", "Year", "Genre", "Actors", "Price", "Description"]
+
+# Column widths for a 127 columns wide terminal (and for piped output)
+WIDTHS = [5, 20, 7, 12, 30, 8, 38]
+
+# Columns sharing the space left by the others: Actors and Description
+FLEXIBLE_COLUMNS = (4, 6)
+MIN_FLEXIBLE_WIDTH = 12
+
+DEFAULT_COLUMNS = sum(WIDTHS) + len(WIDTHS)
 
 
-def show_results(data: List[List[Any]]) -> None:
+class TableLayout(NamedTuple):
+    """
+    Precomputed layout of the results table for one terminal width.
+
+    Attributes:
+        widths (Tuple[int, ...]): Width of each column.
+        row_format (str): Format string of one physical line.
+        header (str): Header line.
+        separator (str): Line below the header.
+    """
+    widths: Tuple[int, ...]
+    row_format: str
+    header: str
+    separator: str
+
+
+@lru_cache(maxsize=16)
+def layout(columns: int = DEFAULT_COLUMNS) -> TableLayout:
+    """
+    Compute the table layout fitting a terminal width.
+
+    Fixed columns keep their width; Actors and Description share the rest
+    in proportion to their default widths.
+
+    Args:
+        columns (int): Terminal width in characters.
+
+    Returns:
+        TableLayout: Column widths, line format and header lines.
+    """
+    fixed = sum(w for i, w in enumerate(WIDTHS) if i not in FLEXIBLE_COLUMNS) + len(WIDTHS)
+    flexible = sum(WIDTHS[i] for i in FLEXIBLE_COLUMNS)
+    room = max(columns - fixed, MIN_FLEXIBLE_WIDTH * len(FLEXIBLE_COLUMNS))
+    widths = list(WIDTHS)
+    for i in FLEXIBLE_COLUMNS:
+        widths[i] = max(MIN_FLEXIBLE_WIDTH, room * WIDTHS[i] // flexible)
+    row_format = "".join(f"{{:<{w}}} " for w in widths)
+    header = row_format.format(*HEADERS)
+    return TableLayout(tuple(widths), row_format, header, "-" * len(header))
+
+
+def current_layout() -> TableLayout:
+    """Return the layout for the current terminal size (default width when piped)."""
+    return layout(shutil.get_terminal_size((DEFAULT_COLUMNS, 24)).columns)
+
+
+@lru_cache(maxsize=8192)
+def wrap_cell(text: str, width: int) -> Tuple[str, ...]:
+    """
+    Wrap cell text to a column width.
+
+    Cached by text and width, so the actors and description of a film are
+    wrapped once however many times the film is shown, and an edited film
+    is never shown with stale text.
+
+    Args:
+        text (str): Cell text.
+        width (int): Column width.
+
+    Returns:
+        Tuple[str, ...]: Physical lines of the cell, at least one.
+    """
+    return tuple(textwrap.wrap(text, width=width)) or ("",)
+
+
+def render_row(row: Sequence[Any], table_layout: TableLayout) -> List[str]:
+    """
+    Render one row as its physical lines.
+
+    Args:
+        row (Sequence[Any]): Cell values.
+        table_layout (TableLayout): Layout to render with.
+
+    Returns:
+        List[str]: Lines of the row, without line breaks.
+    """
+    wrapped = [wrap_cell(str(value), width) for value, width in zip(row, table_layout.widths)]
+    height = max(len(col) for col in wrapped)
+    if height == 1:
+        return [table_layout.row_format.format(*(col[0] for col in wrapped))]
+    return [
+        table_layout.row_format.format(*(col[i] if i < len(col) else "" for col in wrapped))
+        for i in range(height)
+    ]
+
+
+def show_results(data: List[List[Any]], out: Optional[IO[str]] = None) -> None:
     """
     Display tabular data with wrapped text inside cells.
 
-    Each row is printed with columns aligned and wrapped to the specified width.
+    Each row is printed with columns aligned and wrapped to widths adapted to
+    the terminal size; the whole page is written with a single write() call.
 
     Args:
         data (List[List[Any]]): List of rows, where each row is a list of cell values.
+        out (Optional[IO[str]]): Target stream, sys.stdout by default.
     """
-    headers = ["ID", "Title", "Year", "Genre", "Actors", "Price", "Description"]
-    widths = [5, 20, 7, 12, 30, 8, 38]
-    header_line = ""
-    for h, w in zip(headers, widths):
-        header_line += h.ljust(w) + " "
-    print(header_line)
-    print("-" * len(header_line))
-
+    table_layout = current_layout()
+    lines = [table_layout.header, table_layout.separator]
     for row in data:
-        wrapped_cols = [
-            textwrap.wrap(str(row[i]), width=w) or [''] for i, w in enumerate(widths)
-        ]
+        lines.extend(render_row(row, table_layout))
+    lines.append("")
+    (out or sys.stdout).write("\n".join(lines))
+
+
+def stream_results(rows: Iterable[Sequence[Any]], out: Optional[IO[str]] = None) -> int:
+    """
+    Display rows as they arrive, e.g. from MovieDB.stream_search.
 
-        max_lines = max(len(col) for col in wrapped_cols)
+    Args:
+        rows (Iterable[Sequence[Any]]): Rows to display.
+        out (Optional[IO[str]]): Target stream, sys.stdout by default.
 
-        for i in range(max_lines):
-            line = ""
-            for col, w in zip(wrapped_cols, widths):
-                cell = col[i] if i < len(col) else ''
-                line += cell.ljust(w) + " "
-            print(line)
+    Returns:
+        int: Number of rows displayed.
+    """
+    out = out or sys.stdout
+    table_layout = current_layout()
+    out.write(f"{table_layout.header}\n{table_layout.separator}\n")
+    count = 0
+    for row in rows:
+        lines = render_row(row, table_layout)
+        lines.append("")
+        out.write("\n".join(lines))
+        count += 1
+    return count
 
 
 def print_top_searches(data: List[Dict[str, Any]]) -> None:
@@ -71,3 +189,41 @@ def print_top_searches(data: List[Dict[str, Any]]) -> None:
         count = item.get('count', 0)
         time_word = 'times' if count != 1 else 'time'
         print(f"{i}. Query - {query_type} by keyword: {query_str} - {count} {time_word}")
+
+
+def print_stats(stats: Dict[str, Any]) -> None:
+    """
+    Print per-template query statistics from a metrics snapshot.
+
+    Args:
+        stats (Dict[str, Any]): Snapshot returned by metrics.registry.snapshot().
+    """
+    executes = stats["histograms"].get("query_execute_seconds", {})
+    fetches = stats["histograms"].get("query_fetch_seconds", {})
+    rows = stats["counters"].get("query_rows_total", {})
+    errors = stats["counters"].get("query_errors_total", {})
+    templates = sorted(set(executes) | set(errors))
+    if not templates:
+        print("No queries yet.")
+    else:
+        headers = ["Template", "Count", "Errors", "Rows", "Exec avg ms", "Exec p95 ms",
+                   "Fetch avg ms"]
+        widths = [30, 7, 7, 8, 12, 12, 12]
+        print(" ".join(h.ljust(w) for h, w in zip(headers, widths)))
+        print("-" * (sum(widths) + len(widths) - 1))
+        for name in templates:
+            execute = executes.get(name, {})
+            fetch = fetches.get(name, {})
+            cells = [
+                name,
+                execute.get("count", 0),
+                errors.get(name, 0),
+                rows.get(name, 0),
+                f"{execute.get('mean', 0) * 1000:.2f}",
+                f"<={execute.get('p95', 0) * 1000:.1f}",
+                f"{fetch.get('mean', 0) * 1000:.2f}",
+            ]
+            print(" ".join(str(c).ljust(w) for c, w in zip(cells, widths)))
+    for name, value in sorted(stats["gauges"].items()):
+        shown = f"{value:.2%}" if name.endswith("ratio") else value
+        print(f"{name}: {shown}")
@@ -0,0 +1,32 @@
+"""
+Shared fixtures: the tests run the application modules against the local
+stand-ins of standins.py (SQLite playing MySQL, an in-memory MongoDB).
+"""
+
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# keep the application log out of the working tree
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "moviedb-tests.log"))
+
+import pytest
+
+from connections import registry
+import db
+import standins
+
+
+@pytest.fixture(scope="session")
+def dataset_uri() -> str:
+    """Seeded sakila-sized stand-in dataset, shared by the tests."""
+    return standins.generate_dataset(1)
+
+
+@pytest.fixture
+def movie_db(dataset_uri: str):
+    """MovieDB over the stand-ins, without result cache or search logging."""
+    with standins.installed(dataset_uri):
+        yield db.MovieDB(registry.mysql_pool(), log_searches=False)
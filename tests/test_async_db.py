@@ -0,0 +1,140 @@
+"""Tests of the asyncio interface against the blocking MovieDB."""
+
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from async_db import AsyncMovieDB
+from exceptions import InvalidCursor
+from query_builder import SearchCriteria
+import async_db
+import mongo_log
+import settings
+
+
+def run(coro):
+    """Run a coroutine on a new event loop."""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def search_log():
+    """Stop the process-wide search log writer after the test."""
+    yield
+    mongo_log.close()
+
+
+@pytest.mark.parametrize("method, args", [
+    ("search_film_by_name", ("a",)),
+    ("search_film_by_fuzzy_name", ("acadmy alien",)),
+    ("search_film_by_actor", ("ed",)),
+    ("search_film_by_description", ("boat",)),
+    ("search_film_by_genre_and_year", ("dra", 1990, 2010)),
+    ("search", (SearchCriteria(title="a", rate_min=2.99),)),
+])
+def test_searches_match_blocking_movie_db(movie_db, method, args):
+    adb = AsyncMovieDB(movie_db)
+
+    async def pages():
+        first = await getattr(adb, method)(*args)
+        second = await getattr(adb, method)(*args, first.next_cursor) if first.next_cursor else None
+        return first, second
+
+    first, second = run(pages())
+    expected = getattr(movie_db, method)(*args)
+    assert first == expected
+    assert first.rows
+    if expected.next_cursor:
+        assert second == getattr(movie_db, method)(*args, expected.next_cursor)
+
+
+def test_counts_and_page_cursors_match_blocking_movie_db(movie_db):
+    adb = AsyncMovieDB(movie_db)
+    assert run(adb.count_matches("name", ("a",))) == movie_db.count_matches("name", ("a",))
+    assert run(adb.page_cursor("name", ("a",), 3)) == movie_db.page_cursor("name", ("a",), 3)
+
+
+def test_metadata_matches_blocking_movie_db(movie_db):
+    adb = AsyncMovieDB(movie_db)
+
+    async def metadata():
+        return await asyncio.gather(adb.catalog(), adb.query_all_genres(),
+                                    adb.query_min_max_year())
+
+    catalog, genres, years = run(metadata())
+    assert catalog.genre_counts == movie_db.catalog().genre_counts
+    assert genres == movie_db.query_all_genres()
+    assert years == movie_db.query_min_max_year()
+
+
+def test_search_everything_runs_the_three_searches(movie_db):
+    pages = run(AsyncMovieDB(movie_db).search_everything("ed"))
+    assert pages == {"name": movie_db.search_film_by_name("ed"),
+                     "actor": movie_db.search_film_by_actor("ed"),
+                     "description": movie_db.search_film_by_description("ed")}
+
+
+def test_concurrency_is_limited(movie_db):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    search = movie_db.search_film_by_name
+
+    def slow_search(film_name, cursor=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return search(film_name, cursor)
+
+    movie_db.search_film_by_name = slow_search
+    adb = AsyncMovieDB(movie_db, max_concurrency=2)
+
+    async def searches():
+        return await asyncio.gather(*(adb.search_film_by_name("a") for _ in range(8)))
+
+    assert len(run(searches())) == 8
+    assert peak == 2
+
+
+def test_concurrency_defaults_to_pool_size(movie_db):
+    assert AsyncMovieDB(movie_db).max_concurrency == movie_db.pool.max_size
+
+
+def test_errors_propagate_and_release_the_limit(movie_db):
+    adb = AsyncMovieDB(movie_db, max_concurrency=1)
+
+    async def searches():
+        for _ in range(3):
+            with pytest.raises(InvalidCursor):
+                await adb.search_film_by_name("a", "not a cursor")
+        return await adb.search_film_by_name("a")
+
+    assert run(searches()).rows
+
+
+@pytest.mark.parametrize("overflow", ["drop", "block"])
+def test_log_create_and_top_queries(movie_db, search_log, monkeypatch, overflow):
+    monkeypatch.setattr(settings, "MONGO_LOG_OVERFLOW", overflow)
+
+    async def log_and_read():
+        for text in ("alien", "alien", "alien", "boat"):
+            await async_db.log_create("search_by_name", text)
+        await async_db.flush()
+        return await async_db.get_top_queries(2), await async_db.get_top_queries(2, "hour")
+
+    top_all, top_hour = run(log_and_read())
+    expected = [("alien", 3), ("boat", 1)]
+    assert [(d["_id"]["query_str"], d["count"]) for d in top_all] == expected
+    assert [(d["_id"]["query_str"], d["count"]) for d in top_hour] == expected
+
+
+def test_top_queries_unknown_window_raises(movie_db, search_log):
+    with pytest.raises(ValueError):
+        run(async_db.get_top_queries(5, "year"))
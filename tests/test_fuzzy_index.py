@@ -0,0 +1,96 @@
+"""Tests of the fuzzy title index against a brute-force scan."""
+
+
+import random
+
+import pytest
+
+from connections import registry
+from fuzzy_index import FuzzyTitleIndex, levenshtein, split_pieces
+import db
+import sql_queries
+import standins
+
+
+def naive_levenshtein(a: str, b: str) -> int:
+    """Textbook dynamic programming edit distance."""
+    row = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        previous, row[0] = row[0], i
+        for j, char_b in enumerate(b, start=1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1,
+                                           previous + (char_a != char_b))
+    return row[-1]
+
+
+def brute_force(rows, text, k, max_distance):
+    """Closest films by scanning every title (and every word for one-word queries)."""
+    query = " ".join(text.lower().split())
+    ranked = []
+    for film_id, title in rows:
+        title = title.lower()
+        distance = levenshtein(query, title)
+        if " " not in query:
+            distance = min([distance] + [levenshtein(query, w) for w in title.split()])
+        if distance <= max_distance:
+            ranked.append((distance, title, film_id))
+    return [(distance, film_id) for distance, _, film_id in sorted(ranked)[:k]]
+
+
+def typo(rng: random.Random, text: str, edits: int) -> str:
+    """Apply random substitutions, insertions and deletions, spaces included."""
+    chars = list(text)
+    for _ in range(edits):
+        op = rng.randrange(3)
+        if op == 1 or not chars:
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice("abcdefghijklmnopqrstuvwxyz "))
+        elif op == 0:
+            chars[rng.randrange(len(chars))] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+        else:
+            del chars[rng.randrange(len(chars))]
+    return "".join(chars)
+
+
+@pytest.fixture(scope="module")
+def titles(dataset_uri):
+    """(film_id, title) rows of the stand-in dataset."""
+    with standins.installed(dataset_uri):
+        return db.MovieDB(registry.mysql_pool(), log_searches=False).query(
+            sql_queries.QUERY_FILM_TITLES)
+
+
+def test_edit_distance_matches_dynamic_programming():
+    rng = random.Random(1)
+    for _ in range(500):
+        a = "".join(rng.choice("abc ") for _ in range(rng.randrange(12)))
+        b = "".join(rng.choice("abc ") for _ in range(rng.randrange(12)))
+        assert levenshtein(a, b) == naive_levenshtein(a, b)
+
+
+def test_split_pieces():
+    assert split_pieces("devil annie", 3) == ["dev", "il a", "nnie"]
+    assert "".join(split_pieces("ab", 4)) == "ab"
+
+
+@pytest.mark.parametrize("text, distance", [
+    ("d vileannie", 2),     # space moved
+    ("devilannie", 1),      # space dropped, one-word query
+    ("dev il annie", 1),    # space added
+    ("devil annie", 0),
+])
+def test_edits_of_spaces_are_found(text, distance):
+    index = FuzzyTitleIndex([(1, "DEVIL ANNIE"), (2, "ALASKA FRIEND"), (3, "ANNIE IDENTITY")])
+    assert index.closest(text, 3, 3)[0] == (distance, 1)
+
+
+@pytest.mark.parametrize("max_distance", [1, 2, 3, 5])
+def test_closest_matches_brute_force(titles, max_distance):
+    index = FuzzyTitleIndex(titles)
+    rng = random.Random(max_distance)
+    for _ in range(60):
+        title = rng.choice(titles)[1].lower()
+        text = typo(rng, title, rng.randint(1, max_distance))
+        if not text.strip():
+            continue
+        assert index.closest(text, 10, max_distance) == \
+            brute_force(titles, text, 10, max_distance), text
@@ -0,0 +1,49 @@
+"""Tests of the per-template query metrics labels."""
+
+
+import pytest
+
+from query_builder import SearchCriteria
+import metrics
+import sql_queries
+
+
+def execute_counts() -> dict:
+    """Return the number of executions per template label."""
+    histograms = metrics.registry.snapshot()["histograms"]
+    return {label: h["count"] for label, h in histograms.get("query_execute_seconds", {}).items()}
+
+
+def test_template_name_of_formatted_template():
+    query = sql_queries.QUERY_FILM_BY_ACTOR.format(ids="%s, %s")
+    assert metrics.template_name(query) == "QUERY_FILM_BY_ACTOR"
+    assert metrics.template_name(sql_queries.QUERY_FILM_BY_NAME) == "QUERY_FILM_BY_NAME"
+    assert metrics.template_name("SELECT 1") == "other"
+
+
+@pytest.mark.parametrize("criteria", [
+    SearchCriteria(title="a"),
+    SearchCriteria(description="boat"),
+    SearchCriteria(actor="ed", year_min=2000),
+    SearchCriteria(genre="dra", year_min=1990, year_max=2010),
+    SearchCriteria(title="a", rate_min=2.99),
+    SearchCriteria(),
+])
+def test_combined_search_is_labelled_film_search(movie_db, criteria):
+    movie_db.resolve_actor_ids("ed")
+    metrics.registry.reset()
+    movie_db.search(criteria)
+    assert execute_counts() == {"QUERY_FILM_SEARCH": 1}
+
+
+@pytest.mark.parametrize("kind, args, template", [
+    ("name", ("a",), "QUERY_FILM_BY_NAME"),
+    ("actor", ("ed",), "QUERY_FILM_BY_ACTOR"),
+    ("description", ("boat",), "QUERY_FILM_BY_DESCRIPTION"),
+    ("genre_and_year", ("dra", 1990, 2010), "QUERY_FILM_BY_GENRE_AND_YEAR"),
+])
+def test_single_search_keeps_its_template(movie_db, kind, args, template):
+    movie_db.resolve_actor_ids("ed")
+    metrics.registry.reset()
+    getattr(movie_db, f"search_film_by_{kind}")(*args)
+    assert execute_counts() == {template: 1}
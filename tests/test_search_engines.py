@@ -0,0 +1,137 @@
+"""Tests that every search engine matches search text as a literal substring."""
+
+
+import pytest
+
+from connections import registry
+from exceptions import InvalidCursor
+from query_builder import SearchCriteria
+import db
+import pagination
+import standins
+
+
+# Films whose text holds the LIKE wildcards and escape character:
+# (film_id, title, description, release_year, genre)
+SPECIAL_FILMS = [
+    (5001, "100% PURE_ACTION", "A Story of a \\ Backslash and 50% of a_b", 2006, "Sci_Fi%"),
+    (5002, "PURE ACTION", "A Story of a Backslash", 2006, "Sci Fi"),
+]
+
+CASES = [
+    ("name", ("a_e",)),
+    ("name", ("%",)),
+    ("name", ("0% pure_a",)),
+    ("name", ("pure_",)),
+    ("description", ("\\",)),
+    ("description", ("50% of a_b",)),
+    ("genre_and_year", ("%", 1900, 2100)),
+    ("genre_and_year", ("sci_fi", 1900, 2100)),
+    ("criteria", (SearchCriteria(title="_"),)),
+    ("criteria", (SearchCriteria(genre="_", description="\\"),)),
+]
+
+QUERY_FILMS = """
+SELECT f.film_id, f.title, f.description, f.release_year, c.name
+FROM film AS f
+LEFT JOIN film_category AS fc ON f.film_id = fc.film_id
+LEFT JOIN category AS c ON fc.category_id = c.category_id
+"""
+
+
+@pytest.fixture(scope="module")
+def special_uri():
+    """Stand-in dataset with the SPECIAL_FILMS added."""
+    uri = standins.generate_dataset(1, seed=7)
+    conn = standins.connection_factory(uri)()
+    with conn.cursor() as cursor:
+        for film_id, title, description, year, genre in SPECIAL_FILMS:
+            cursor.execute("INSERT INTO film VALUES (%s, %s, %s, %s, 0.99, '2006-02-15 05:03:42')",
+                           (film_id, title, description, year))
+            cursor.execute("INSERT INTO film_text VALUES (%s, %s, %s)",
+                           (film_id, title, description))
+            cursor.execute("INSERT INTO category VALUES (%s, %s, '2006-02-15 05:03:42')",
+                           (film_id, genre))
+            cursor.execute("INSERT INTO film_category VALUES (%s, %s, '2006-02-15 05:03:42')",
+                           (film_id, film_id))
+    conn.commit()
+    conn.close()
+    return uri
+
+
+@pytest.fixture(params=["mysql", "trigram", "snapshot"])
+def engine_db(request, special_uri, tmp_path):
+    """MovieDB answering searches with each settings.SEARCH_ENGINE."""
+    with standins.installed(special_uri):
+        movie_db = db.MovieDB(registry.mysql_pool(), log_searches=False)
+        if request.param == "trigram":
+            movie_db.enable_text_index()
+        elif request.param == "snapshot":
+            movie_db.enable_catalog_file(str(tmp_path / "catalog.snapshot"))
+        yield movie_db
+
+
+def expected_ids(films, kind, args):
+    """Ids of the films containing the search text, found without SQL LIKE."""
+    if kind == "criteria":
+        criteria = args[0]
+    elif kind == "name":
+        criteria = SearchCriteria(title=args[0])
+    elif kind == "description":
+        criteria = SearchCriteria(description=args[0])
+    else:
+        criteria = SearchCriteria(genre=args[0], year_min=args[1], year_max=args[2])
+    found = []
+    for film_id, title, description, year, genre in films:
+        texts = {"title": title, "description": description, "genre": genre}
+        if all(getattr(criteria, name) is None
+               or getattr(criteria, name).lower() in (texts[name] or "").lower()
+               for name in texts) \
+                and (criteria.year_min is None or year >= criteria.year_min) \
+                and (criteria.year_max is None or year <= criteria.year_max):
+            found.append(film_id)
+    return sorted(found)
+
+
+def all_ids(movie_db, kind, args):
+    """Ids of every film of a search, following the cursors."""
+    search = movie_db.search if kind == "criteria" else getattr(movie_db, f"search_film_by_{kind}")
+    ids, cursor = [], None
+    while True:
+        page = search(*args, cursor)
+        ids.extend(row[0] for row in page.rows)
+        cursor = page.next_cursor
+        if cursor is None:
+            return sorted(ids)
+
+
+@pytest.mark.parametrize("kind, args", CASES)
+def test_search_text_is_literal(engine_db, kind, args):
+    films = engine_db.query(QUERY_FILMS)
+    expected = expected_ids(films, kind, args)
+    assert all_ids(engine_db, kind, args) == expected
+    assert engine_db.count_matches(kind, args) == len(expected)
+
+
+def test_special_films_are_found(engine_db):
+    assert all_ids(engine_db, "name", ("0% pure_a",)) == [5001]
+    assert all_ids(engine_db, "genre_and_year", ("sci_fi%", 2006, 2006)) == [5001]
+
+
+@pytest.mark.parametrize("key", [
+    [1, 2], [None, 1], [{"x": 1}, 1], ["ACE", "1"], ["ACE", True], ["ACE", 1.5], ["ACE"],
+])
+def test_forged_cursor_is_rejected(engine_db, key):
+    cursor = pagination.encode_cursor(*key)
+    for search, args in ((engine_db.search_film_by_name, ("a",)),
+                         (engine_db.search_film_by_description, ("a",)),
+                         (engine_db.search, (SearchCriteria(),))):
+        with pytest.raises(InvalidCursor):
+            search(*args, cursor)
+
+
+def test_relevance_cursor_accepts_scores():
+    assert pagination.decode_cursor(pagination.encode_cursor(1.5, 3),
+                                    sort_types=(str, int, float)) == (1.5, 3)
+    with pytest.raises(InvalidCursor):
+        pagination.decode_cursor(pagination.encode_cursor(1.5, 3))
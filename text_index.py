@@ -0,0 +1,156 @@
+"""
+In-memory trigram index for substring search over film titles and descriptions.
+
+The index keeps, for every field, an inverted map from each lowercase
+trigram to the set of film ids containing it. A substring query is answered
+by intersecting the posting sets of the query trigrams (smallest first) and
+verifying the surviving candidates against the stored text, so MySQL only
+has to hydrate the ids of the requested page.
+
+Classes:
+    TrigramIndex -- trigram inverted index over film.title and film.description.
+"""
+
+
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+FIELDS = ("title", "description")
+
+N = 3
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Return the set of trigrams of a lowercase string.
+
+    Args:
+        text (str): Lowercase text.
+
+    Returns:
+        Set[str]: All substrings of length 3 of the text.
+    """
+    return {text[i:i + N] for i in range(len(text) - N + 1)}
+
+
+class TrigramIndex:
+    """
+    Trigram inverted index answering substring queries with film ids.
+
+    Attributes:
+        texts (Dict[str, Dict[int, str]]): Lowercase text per field and film id.
+        postings (Dict[str, Dict[str, Set[int]]]): Film ids per field and trigram.
+        order (List[Tuple[str, int]]): All (title, film_id) keys in search order.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index."""
+        self.texts: Dict[str, Dict[int, str]] = {field: {} for field in FIELDS}
+        self.postings: Dict[str, Dict[str, Set[int]]] = {
+            field: defaultdict(set) for field in FIELDS
+        }
+        self.order: List[Tuple[str, int]] = []
+        self._keys: Dict[int, Tuple[str, int]] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, str, Optional[str]]]) -> "TrigramIndex":
+        """
+        Build an index from (film_id, title, description) rows.
+
+        Args:
+            rows: Rows as returned by sql_queries.QUERY_FILM_TEXTS.
+
+        Returns:
+            TrigramIndex: Populated index.
+        """
+        index = cls()
+        for film_id, title, description in rows:
+            index.add(film_id, title or "", description or "")
+        index.order.sort()
+        logger.info("Trigram index built for %d films", len(index.order))
+        return index
+
+    def add(self, film_id: int, title: str, description: str) -> None:
+        """
+        Add one film to the index.
+
+        Call order.sort() after adding films outside of from_rows.
+
+        Args:
+            film_id (int): Film id.
+            title (str): Film title.
+            description (str): Film description.
+        """
+        for field, text in zip(FIELDS, (title, description)):
+            text = text.lower()
+            self.texts[field][film_id] = text
+            for gram in trigrams(text):
+                self.postings[field][gram].add(film_id)
+        key = (title, film_id)
+        self._keys[film_id] = key
+        self.order.append(key)
+
+    def search(self, field: str, needle: str) -> Set[int]:
+        """
+        Return ids of films whose field contains the needle (case-insensitive).
+
+        Args:
+            field (str): "title" or "description".
+            needle (str): Substring to look for.
+
+        Returns:
+            Set[int]: Matching film ids.
+        """
+        needle = needle.lower()
+        texts = self.texts[field]
+        grams = trigrams(needle)
+        if not grams:
+            # Too short to use the index: the catalog is small, check every text
+            return {film_id for film_id, text in texts.items() if needle in text}
+
+        postings = self.postings[field]
+        candidates: Optional[Set[int]] = None
+        for posting in sorted((postings.get(g, set()) for g in grams), key=len):
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return set()
+        # Trigram hits are only candidates, confirm the real substring
+        return {film_id for film_id in candidates if needle in texts[film_id]}
+
+    def page_ids(self, film_ids: Set[int], after: Tuple[str, int], size: int) -> List[int]:
+        """
+        Return up to size matching ids ordered by (title, film_id) after a key.
+
+        Args:
+            film_ids (Set[int]): Matching film ids.
+            after (Tuple[str, int]): (title, film_id) of the last seen row.
+            size (int): Max number of ids to return.
+
+        Returns:
+            List[int]: Film ids of the requested page in search order.
+        """
+        keys = sorted(self._keys[film_id] for film_id in film_ids)
+        start = bisect_right(keys, tuple(after))
+        return [film_id for _, film_id in keys[start:start + size]]
+
+    def key_before(self, film_ids: Set[int], start: int) -> Optional[Tuple[str, int]]:
+        """
+        Return the (title, film_id) key of the matching film before a start index.
+
+        Args:
+            film_ids (Set[int]): Matching film ids.
+            start (int): 0-based index of the first result of the page.
+
+        Returns:
+            Optional[Tuple[str, int]]: Key after which the films from start
+                follow, or None if no film matches at start.
+        """
+        if not 0 < start < len(film_ids):
+            return None
+        return sorted(self._keys[film_id] for film_id in film_ids)[start - 1]
@@ -4,10 +4,15 @@ Module ui.py
 User interface functions for movie search application.
 """
 
-from typing import List, Callable, Any
+from concurrent.futures import Future
+from typing import List, Callable, Any, Optional, Dict, Tuple
 
 import settings # application configuration and DB connection settings
+import pagination
 import table
+from pagination import Page
+from prefetch import PagePrefetcher
+from query_builder import SearchCriteria
 from logger import get_logger # custom logging utility
 from exceptions import UserExit
 
@@ -19,8 +24,10 @@ def show_menu() -> int:
     """
     Display the main menu and get user choice.
 
+    Option 9 (query statistics) is accepted but not listed.
+
     Returns:
-        int: Selected menu option (0, 1, or 2).
+        int: Selected menu option (0, 1, 2 or 9).
     """
     prompt = """
         MENU:
@@ -29,7 +36,29 @@ def show_menu() -> int:
         0. Exit
         Select a menu option (1, 2, or 0):
     """
-    return get_choice(prompt, [0, 1, 2])
+    return get_choice(prompt, [0, 1, 2], hidden=[9])
+
+
+# Top queries windows of prompt_top_window, and their display names
+TOP_WINDOW_LABELS = {"hour": "last hour", "day": "last day", "week": "last week", "all": "all time"}
+
+
+def prompt_top_window() -> str:
+    """
+    Ask over which period the top queries are counted.
+
+    Returns:
+        str: "hour", "day", "week" or "all" (see mongo_log.get_top_queries).
+    """
+    prompt = """
+        Top 5 most popular queries of:
+        1. The last hour
+        2. The last day
+        3. The last week
+        4. All time
+        Select a period (1, 2, 3 or 4):
+    """
+    return list(TOP_WINDOW_LABELS)[get_choice(prompt, [1, 2, 3, 4]) - 1]
 
 
 def show_menu_movies() -> int:
@@ -37,7 +66,7 @@ def show_menu_movies() -> int:
     Display the movie search menu and get user choice.
 
     Returns:
-        int: Selected menu option (0, 1, 2, 3, or 4).
+        int: Selected menu option (0, 1, 2, 3, 4 or 5).
     """
     prompt = """
         MENU:
@@ -45,19 +74,21 @@ def show_menu_movies() -> int:
         2. Search movie by actors
         3. Search movie by description
         4. Search movie by genre and release year
+        5. Combined search (title, actor, description, genre, year, rental rate)
         0. Exit
-        Select a menu option (1, 2, 3, 4 or 0): 
+        Select a menu option (1, 2, 3, 4, 5 or 0): 
     """
-    return get_choice(prompt, [0, 1, 2, 3, 4])
+    return get_choice(prompt, [0, 1, 2, 3, 4, 5])
 
 
-def get_choice(prompt: str, choices: List[int]) -> int:
+def get_choice(prompt: str, choices: List[int], hidden: Optional[List[int]] = None) -> int:
     """
     Prompt the user to enter a valid choice from a list of options.
 
     Args:
         prompt (str): The input prompt message.
         choices (List[int]): List of valid integer choices.
+        hidden (Optional[List[int]]): Valid choices not mentioned in error messages.
 
     Returns:
         int: The user's validated choice.
@@ -65,7 +96,7 @@ def get_choice(prompt: str, choices: List[int]) -> int:
     while True:
         try:
             choice = int(input(prompt))
-            if choice in choices:
+            if choice in choices or choice in (hidden or []):
                 logger.info("User selected menu option: %s", choice)
                 return choice
             print(f"Please enter one of the following numbers: {', '.join(map(str, choices))}")
@@ -153,45 +184,173 @@ def prompt_year_range(year_min: int, year_max: int) -> tuple[int, int]:
         invalid_year_range_message(year_min, year_max)
 
 
-def paginate_query(search_func: Callable[..., List[Any]], *args: Any) -> None:
+def optional_input(prompt: str, convert: Callable[[str], Any] = str) -> Any:
+    """
+    Prompt for an optional filter value.
+
+    Args:
+        prompt (str): The input prompt message.
+        convert (Callable[[str], Any]): Conversion of the entered text, e.g. int.
+
+    Raises:
+        UserExit: If the user inputs '0'.
+
+    Returns:
+        Any: Converted value, or None if the input was left empty.
+    """
+    while True:
+        value = input(f"{prompt} (Enter to skip, 0 for back to previous menu): ").strip().lower()
+        if value == '0':
+            raise UserExit()
+        if not value:
+            return None
+        try:
+            result = convert(value)
+            logger.info("User entered filter: '%s' for prompt: '%s'", value, prompt)
+            return result
+        except ValueError:
+            print("Invalid input. Please try again.")
+
+
+def prompt_criteria() -> SearchCriteria:
+    """
+    Prompt for the filters of a combined search; every filter is optional.
+
+    Raises:
+        UserExit: If the user inputs '0'.
+
+    Returns:
+        SearchCriteria: The entered filters.
+    """
+    return SearchCriteria(
+        title=optional_input("Title or part of it"),
+        actor=optional_input("Actor or actress name or part of it"),
+        description=optional_input("Keyword from description"),
+        genre=optional_input("Genre"),
+        year_min=optional_input("Minimum release year", int),
+        year_max=optional_input("Maximum release year", int),
+        rate_min=optional_input("Minimum rental rate", float),
+        rate_max=optional_input("Maximum rental rate", float),
+    )
+
+
+def paginate_query(search_func: Callable[..., Page], *args: Any,
+                   count: Optional[Callable[[], Optional[int]]] = None,
+                   seek: Optional[Callable[[int], Optional[str]]] = None) -> bool:
     """
     Perform paginated querying and show results in chunks.
 
     Args:
-        search_func (callable): Search function that accepts arguments and an offset.
-        *args: Arguments for the search function excluding offset.
+        search_func (callable): Search function that accepts arguments and a cursor
+            and returns a pagination.Page.
+        *args: Arguments for the search function excluding cursor.
+        count (Optional[callable]): Function returning the number of results,
+            or None if unknown; shows "Page X of Y" once it returns.
+        seek (Optional[callable]): Function returning the cursor of a page
+            number; lets the user jump to a page when the count is known.
+
+    Returns:
+        bool: False if the search found nothing.
 
     Behavior:
-        Fetches results in batches defined by settings.MOVIE_RESULT_LIMIT,
+        Fetches results in pages of settings.MOVIE_RESULT_LIMIT rows,
         displays them, and asks the user whether to fetch more results.
+        Each next page is requested with the cursor returned by the previous one;
+        settings.PREFETCH_DEPTH pages are fetched in the background meanwhile
+        and discarded when the user leaves. The count runs in the background
+        too, from the start, and is only waited for to check a page number or
+        at the last page.
     """
-    offset = 0
-    while True:
-        data = search_func(*args, offset)
-        if not data:
-            print("No results")
-            break
-
-        table.show_results(data)
-        if len(data) < settings.MOVIE_RESULT_LIMIT:
-            print("End of results.")
-            break
-        more = input("Show next 10? (yes or to return to menu no or 0): ").strip().lower()
-        if more == 'yes':
-            offset += settings.MOVIE_RESULT_LIMIT
-        elif more in ('no', '0'):
-            print("Returning to the main menu.")
-            break
-        else:
-            print("Invalid input. Returning to the main menu.")
-            break
+    total = pages = None
+    cursor = None
+    number = 1
+    with PagePrefetcher(search_func, args, settings.PREFETCH_DEPTH) as prefetcher:
+        counting = prefetcher.submit(count) if count is not None else None
+        while True:
+            page = prefetcher.get(cursor)
+            if not page.rows:
+                print("No results")
+                return cursor is not None
+
+            table.show_results(page.rows)
+            if counting is not None and (counting.done() or page.next_cursor is None):
+                total, pages = _page_total(counting)
+                counting = None
+            if pages is not None:
+                print(f"Page {number} of {pages} ({total} results)")
+            # Page numbers are accepted while counting, and checked once the count is known
+            can_jump = seek is not None and (counting is not None or (pages or 0) > 1)
+            if page.next_cursor is None:
+                print("End of results.")
+                if not can_jump:
+                    break
+            if not can_jump:
+                prompt = f"Show next {settings.MOVIE_RESULT_LIMIT}? (yes or to return to menu no or 0): "
+            elif page.next_cursor is not None:
+                page_range = "" if pages is None else f" from 1 to {pages}"
+                prompt = (f"Show next {settings.MOVIE_RESULT_LIMIT}? (yes, a page number{page_range}, "
+                          f"or to return to menu no or 0): ")
+            else:
+                prompt = f"Go to page? (a page number from 1 to {pages}, or to return to menu no or 0): "
+            answer = input(prompt).strip().lower()
+            if can_jump and answer.isdigit() and counting is not None:
+                total, pages = _page_total(counting)
+                counting = None
+            if answer == 'yes' and page.next_cursor is not None:
+                cursor = page.next_cursor
+                number += 1
+            elif answer in ('no', '0'):
+                print("Returning to the main menu.")
+                break
+            elif can_jump and answer.isdigit() and pages is not None and 1 <= int(answer) <= pages:
+                number = int(answer)
+                try:
+                    cursor = seek(number)
+                except ValueError as e:
+                    logger.warning("Cannot jump to page %d: %s", number, e)
+                    print("This page is no longer available. Returning to the main menu.")
+                    break
+            else:
+                print("Invalid input. Returning to the main menu.")
+                break
+    return True
+
+
+def _page_total(counting: Future) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Wait for the count of a search.
 
-def prompt_genre_choice(genres: dict) -> str:
+    Args:
+        counting (Future): Future of the number of results, None if unknown.
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: Number of results and of pages,
+            both None if unknown.
+    """
+    total = counting.result()
+    if total is None:
+        return None, None
+    return total, pagination.page_count(total, settings.MOVIE_RESULT_LIMIT)
+
+def show_suggestions(rows: List[Tuple]) -> None:
+    """
+    Display the films closest to a title that found nothing.
+
+    Args:
+        rows (List[Tuple]): Film rows, closest first.
+    """
+    if rows:
+        print("Did you mean:")
+        table.show_results(rows)
+
+def prompt_genre_choice(genres: dict, counts: Optional[Dict[str, int]] = None) -> str:
     """
     Prompt user to enter a genre from the available list.
 
     Args:
         genres (dict): Dictionary of available genres with {genre_name: id}.
+        counts (Optional[Dict[str, int]]): Number of films per genre id, shown
+            next to each genre.
 
     Raises:
         UserExit: If the user inputs '0'.
@@ -200,23 +359,27 @@ def prompt_genre_choice(genres: dict) -> str:
         str: The selected genre ID.
     """
     while True:
-        show_available_genres(genres)
+        show_available_genres(genres, counts)
         genre_input = input_text("Enter the genre (or 0 for back to previous menu): ")
         if genre_input in genres:
             return genres[genre_input]
         invalid_genre_message()
 
 
-def show_available_genres(genres: dict) -> None:
+def show_available_genres(genres: dict, counts: Optional[Dict[str, int]] = None) -> None:
     """
     Print available genres from dict {genre_name: id}.
 
     Args:
         genres (dict): Dictionary of available genres..
+        counts (Optional[Dict[str, int]]): Number of films per genre id.
     """
     print("Available genres:")
-    for g in genres:
-        print(f" - {g}")
+    for g, genre_id in genres.items():
+        if counts is not None and genre_id in counts:
+            print(f" - {g} ({counts[genre_id]} films)")
+        else:
+            print(f" - {g}")
 
 
 def show_year_range(year_min: int, year_max: int) -> None:
@@ -230,20 +393,32 @@ def show_year_range(year_min: int, year_max: int) -> None:
     print(f"Available release years: from {year_min} to {year_max}")
 
 
-def show_top_searches(data) -> None:
+def show_top_searches(data, period: str = "all time") -> None:
     """
     Display top 5 most popular queries.
 
     Args:
         data: Data containing top search queries.
+        period (str): Period the queries were counted over, e.g. "last day".
     """
-    print("\nTop 5 most popular queries:")
+    print(f"\nTop 5 most popular queries ({period}):")
     if not data:
         print("No queries yet.")
     else:
         table.print_top_searches(data)
 
 
+def show_stats(stats: Dict[str, Any]) -> None:
+    """
+    Display query statistics (hidden menu entry).
+
+    Args:
+        stats (Dict[str, Any]): Snapshot of metrics.registry.
+    """
+    print("\nQuery statistics:")
+    table.print_stats(stats)
+
+
 def invalid_genre_message() -> None:
     """
     Print invalid genre message.